@@ -1,10 +1,19 @@
 #!/usr/bin/env python3
 """
 Script para limpiar imágenes inválidas y de prueba.
+
+Un artículo puede reutilizar la imagen de otro slug (misma foto de Commons o
+imagen generada repetida), así que no se borra nada que enlace algún .mdx.
 """
 
 from pathlib import Path
 import shutil
+import sys
+
+# Añadir el directorio tools al path
+sys.path.insert(0, str(Path(__file__).parent / "tools"))
+
+import image_dedup
 
 def cleanup_invalid_images():
     """Elimina imágenes inválidas (muy pequeñas) y directorios de prueba."""
@@ -21,19 +30,31 @@ def cleanup_invalid_images():
         "test-placeholder"
     ]
     
+    removed_dirs = 0
     for test_dir in test_dirs:
         test_path = images_dir / test_dir
         if test_path.exists():
+            posts = image_dedup.referencing_posts(test_path)
+            if posts:
+                print(f"⚠️  Se conserva {test_dir}: lo usa {', '.join(p.name for p in posts)}")
+                continue
             shutil.rmtree(test_path)
             print(f"🗑️  Eliminado directorio de prueba: {test_dir}")
+            removed_dirs += 1
     
     # Buscar y eliminar imágenes inválidas
+    refs = image_dedup.referenced_urls()
     invalid_count = 0
     for img_path in images_dir.rglob("*"):
         if img_path.is_file():
             try:
                 size = img_path.stat().st_size
                 if size < 1000:  # Menos de 1KB
+                    posts = refs.get(image_dedup.public_url(img_path))
+                    if posts:
+                        print(f"⚠️  Imagen inválida en uso, no se borra: {img_path.name} "
+                              f"({', '.join(p.name for p in posts)})")
+                        continue
                     img_path.unlink()
                     print(f"🗑️  Eliminada imagen inválida: {img_path.name} ({size} bytes)")
                     invalid_count += 1
@@ -55,7 +76,7 @@ def cleanup_invalid_images():
     print(f"\n✅ Limpieza completada:")
     print(f"   - Imágenes inválidas eliminadas: {invalid_count}")
     print(f"   - Directorios vacíos eliminados: {empty_dirs}")
-    print(f"   - Directorios de prueba eliminados: {len(test_dirs)}")
+    print(f"   - Directorios de prueba eliminados: {removed_dirs}")
 
 def list_valid_images():
     """Lista las imágenes válidas restantes."""
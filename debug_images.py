@@ -3,6 +3,7 @@
 Script de diagnóstico para probar la generación de imágenes.
 """
 
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -10,7 +11,7 @@ from pathlib import Path
 # Añadir el directorio tools al path
 sys.path.insert(0, str(Path(__file__).parent / "tools"))
 
-from generate_article import gen_images_with_gemini, gen_images_with_openai, convert_to_webp
+from article_pipeline import gen_images_with_gemini, gen_images_with_openai, convert_to_webp
 
 def test_image_generation():
     """Prueba la generación de imágenes con diferentes métodos."""
@@ -40,7 +41,7 @@ def test_image_generation():
     if gemini_key:
         print("\n🧪 Probando Gemini...")
         try:
-            images = gen_images_with_gemini(test_prompt, test_slug, how_many=1)
+            images = asyncio.run(gen_images_with_gemini(test_prompt, test_slug, how_many=1))
             if images:
                 print(f"✅ Gemini generó {len(images)} imagen(es)")
                 for img in images:
@@ -57,7 +58,7 @@ def test_image_generation():
     if openai_key:
         print("\n🧪 Probando OpenAI...")
         try:
-            images = gen_images_with_openai(test_prompt, test_slug, how_many=1)
+            images = asyncio.run(gen_images_with_openai(test_prompt, test_slug, how_many=1))
             if images:
                 print(f"✅ OpenAI generó {len(images)} imagen(es)")
                 for img in images:
@@ -1,3 +1,5 @@
+import { readFileSync } from 'node:fs';
+
 /** @type {import('next').NextConfig} */
 const nextConfig = {
   // Configuración de imágenes
@@ -53,9 +55,13 @@ const nextConfig = {
     ];
   },
 
-  // Configuración de redirecciones
+  // Configuración de redirecciones (slugs migrados por tools/migrate_slugs.py)
   async redirects() {
-    return [];
+    try {
+      return JSON.parse(readFileSync(new URL('./content/redirects.json', import.meta.url), 'utf8'));
+    } catch {
+      return [];
+    }
   },
 
   // Configuración de rewrites
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Pruebas del diario de lotes (tools/batch_journal.py): retomar un lote
+interrumpido, saltar los temas terminados y empezar de cero con --fresh.
+"""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+
+from batch_journal import BatchJournal  # noqa: E402
+
+SPEC = {"topic": "Redes WiFi", "style": "fotográfico", "images": 1}
+
+
+def test_resume():
+    """Un diario nuevo sobre el mismo fichero recupera las etapas de cada tema."""
+    print("🧪 Probando retomar un lote...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "lote.jsonl"
+        journal = BatchJournal(path)
+        progress = journal.topic(SPEC)
+        progress.mark("text", title="Redes WiFi", body="cuerpo")
+        progress.mark("images", paths=["public/images/blog/redes-wifi/redes-wifi-hero-001.png"])
+        journal.topic({"topic": "Otro tema", "images": 1}).mark("text", title="Otro", body="b")
+        # Un corte a mitad de escritura deja la última línea truncada
+        with path.open("a", encoding="utf-8") as f:
+            f.write('{"key": "abc", "stage": "mdx", "da')
+
+        resumed = BatchJournal(path).topic(SPEC)
+        assert resumed.get("text") == {"title": "Redes WiFi", "body": "cuerpo"}
+        assert resumed.get("images")["paths"][0].endswith("hero-001.png")
+        assert resumed.get("mdx") is None, "una etapa no registrada no se da por hecha"
+        edited = BatchJournal(path).topic({**SPEC, "style": "ilustración"})
+        assert edited.get("text") is None, "editar el tema invalida su progreso"
+    print("✅ Lote retomado")
+
+
+def test_fresh():
+    """reset() (--fresh) olvida el progreso y borra el fichero."""
+    print("🧪 Probando --fresh...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "lote.jsonl"
+        journal = BatchJournal(path)
+        journal.topic(SPEC).mark("text", title="t", body="b")
+        journal.reset()
+        assert not path.exists()
+        assert journal.topic(SPEC).get("text") is None
+        assert BatchJournal(path).topic(SPEC).get("text") is None
+    print("✅ --fresh")
+
+
+def test_run_batch_skips_finished():
+    """run_batch salta los temas con MDX completo y no los que quedaron con placeholder."""
+    print("🧪 Probando que el lote salta los temas terminados...")
+    import article_pipeline
+
+    post = next(article_pipeline.CONTENT_DIR.glob("*.mdx")).relative_to(article_pipeline.ROOT).as_posix()
+    with tempfile.TemporaryDirectory() as tmp:
+        topics = Path(tmp) / "topics.yml"
+        topics.write_text('- topic: "Redes WiFi"\n  style: "fotográfico"\n', encoding="utf-8")
+        journal = BatchJournal(Path(tmp) / "lote.jsonl")
+        journal.topic(SPEC).mark("mdx", path=post)
+
+        generated = []
+
+        async def fake_generate_post(topic, **kwargs):
+            generated.append(topic)
+            return article_pipeline.ROOT / post
+
+        original = article_pipeline.generate_post
+        article_pipeline.generate_post = fake_generate_post
+        try:
+            failed = asyncio.run(article_pipeline.run_batch(topics, journal=journal))
+            assert failed == 0 and generated == [], "un tema terminado no se vuelve a generar"
+
+            journal.topic(SPEC).mark("mdx", path=post, fallback=["image"])
+            asyncio.run(article_pipeline.run_batch(topics, journal=BatchJournal(journal.path)))
+            assert generated == ["Redes WiFi"], "un tema con placeholder se regenera"
+        finally:
+            article_pipeline.generate_post = original
+    print("✅ Temas terminados saltados")
+
+
+def main():
+    """Ejecuta todas las pruebas."""
+    tests = [
+        ("Retomar un lote", test_resume),
+        ("--fresh", test_fresh),
+        ("Saltar temas terminados", test_run_batch_skips_finished),
+    ]
+    failed = 0
+    for name, func in tests:
+        try:
+            func()
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            failed += 1
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} pruebas pasaron")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
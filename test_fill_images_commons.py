@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la selección de imágenes de Commons (tools/fill_images_commons.py):
+orden de los candidatos por resolución y proporción, URL de la miniatura y
+lectura en streaming de la descarga con límite de tamaño y firma.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+
+from fill_images_commons import ImageRejected, rank_candidates, read_image_body, thumb_url  # noqa: E402
+
+LICENSE = {"LicenseShortName": {"value": "Public domain"}, "Artist": {"value": "Autor"}}
+BASE = "https://upload.wikimedia.org/wikipedia/commons"
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+
+
+class FakeResponse:
+    """Respuesta en streaming que cuenta los bloques leídos y si se cerró."""
+
+    def __init__(self, chunks, headers=None):
+        self.chunks = list(chunks)
+        self.headers = headers or {}
+        self.read = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size=1):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+def page(index, name, width, height, mime="image/jpeg", extmetadata=LICENSE):
+    """Página de la respuesta de la API con su imageinfo."""
+    return {
+        "index": index,
+        "title": f"File:{name}",
+        "imageinfo": [{
+            "url": f"{BASE}/a/ab/{name}",
+            "thumburl": f"{BASE}/thumb/a/ab/{name}/1920px-{name}",
+            "thumbwidth": 1920,
+            "width": width,
+            "height": height,
+            "mime": mime,
+            "descriptionurl": f"https://commons.wikimedia.org/wiki/File:{name}",
+            "extmetadata": extmetadata,
+        }],
+    }
+
+
+def response(*pages):
+    """Respuesta de la API con las páginas indexadas por un id cualquiera."""
+    return {"query": {"pages": {str(100 + i): p for i, p in enumerate(pages)}}}
+
+
+def test_rank_candidates():
+    """Gana la imagen que cubre 1920x1080 en 16:9; se descartan licencias NC y lo que no es imagen."""
+    print("🧪 Probando el orden de candidatos...")
+    resp = response(
+        page(1, "pequena.jpg", 640, 360),
+        page(2, "vertical.jpg", 3000, 4000),
+        page(3, "panoramica.jpg", 4000, 2250),
+        page(4, "nc.jpg", 4000, 2250, extmetadata={
+            "LicenseShortName": {"value": "CC BY-NC 4.0"},
+            "UsageTerms": {"value": "Creative Commons Attribution-NonCommercial"}}),
+        page(5, "video.webm", 1920, 1080, mime="video/webm"),
+        page(6, "copia.jpg", 4000, 2250),
+    )
+    ranked = rank_candidates(resp)
+    assert [c["title"] for c in ranked] == [
+        "File:panoramica.jpg", "File:copia.jpg", "File:vertical.jpg", "File:pequena.jpg"], ranked
+    best = ranked[0]
+    assert best["license"] == "Public domain" and best["artist"] == "Autor"
+    assert best["descriptionurl"].endswith("File:panoramica.jpg")
+    assert rank_candidates({}) == [] and rank_candidates({"query": {"pages": None}}) == []
+    print("✅ Orden de candidatos")
+
+
+def test_thumb_url():
+    """La miniatura pide justo el ancho necesario y el original solo si no es mayor."""
+    print("🧪 Probando la URL de la miniatura...")
+    info = page(1, "foto.jpg", 4000, 2250)["imageinfo"][0]
+    assert thumb_url(info) == f"{BASE}/thumb/a/ab/foto.jpg/1920px-foto.jpg"
+
+    wide = page(1, "ancha.jpg", 6000, 2000)["imageinfo"][0]
+    assert thumb_url(wide) == f"{BASE}/thumb/a/ab/ancha.jpg/3240px-ancha.jpg", "más ancho para llegar a 1080 de alto"
+
+    small = page(1, "peque.jpg", 1600, 900)["imageinfo"][0]
+    assert thumb_url(small) == f"{BASE}/a/ab/peque.jpg", "original si no hay nada que reducir"
+
+    svg = page(1, "logo.svg", 800, 450, mime="image/svg+xml")["imageinfo"][0]
+    assert thumb_url(svg) == svg["thumburl"], "un SVG se pide siempre rasterizado"
+
+    no_size = {"url": f"{BASE}/a/ab/x.jpg"}
+    assert thumb_url(no_size) == no_size["url"]
+    print("✅ URL de la miniatura")
+
+
+def rejected(resp, **kwargs):
+    """Mensaje de ImageRejected al leer ``resp`` (falla si se acepta)."""
+    try:
+        read_image_body(resp, **kwargs)
+    except ImageRejected as e:
+        return str(e)
+    raise AssertionError("la descarga debía rechazarse")
+
+
+def test_read_image_body():
+    """Se acepta una imagen en bloques y se corta al superar el límite sin leer el resto."""
+    print("🧪 Probando el límite de tamaño de la descarga...")
+    resp = FakeResponse([PNG[:50], PNG[50:]], {"Content-Type": "image/png"})
+    assert read_image_body(resp, max_bytes=len(PNG)) == PNG and resp.closed
+
+    resp = FakeResponse([PNG] * 10, {"Content-Type": "image/png"})
+    assert "límite" in rejected(resp, max_bytes=250)
+    assert resp.read == 3 and resp.closed, "se deja de leer en cuanto se pasa del límite"
+
+    resp = FakeResponse([PNG], {"Content-Type": "image/png", "Content-Length": "5000"})
+    assert "5000 bytes" in rejected(resp, max_bytes=1000)
+    assert resp.read == 0 and resp.closed, "Content-Length excesivo: no se lee nada"
+
+    resp = FakeResponse([PNG] * 3)
+    assert read_image_body(resp, max_bytes=0) == PNG * 3, "max_bytes=0 desactiva el límite"
+    print("✅ Límite de tamaño")
+
+
+def test_read_image_body_sniff():
+    """Se rechaza por Content-Type o por la firma del primer bloque, sin seguir descargando."""
+    print("🧪 Probando el rechazo por tipo y firma...")
+    resp = FakeResponse([PNG], {"Content-Type": "text/html; charset=utf-8"})
+    assert "text/html" in rejected(resp)
+    assert resp.read == 0 and resp.closed
+
+    html = FakeResponse([b"<!DOCTYPE html><html>", b"..." * 100], {"Content-Type": "application/octet-stream"})
+    assert "firma" in rejected(html)
+    assert html.read == 1 and html.closed, "basta el primer bloque para rechazar"
+
+    webp = b"RIFF\x10\x00\x00\x00WEBPVP8 " + b"\x00" * 20
+    assert read_image_body(FakeResponse([webp], {"Content-Type": "image/webp"})) == webp
+    print("✅ Rechazo por tipo y firma")
+
+
+def main():
+    """Ejecuta todas las pruebas."""
+    tests = [
+        ("Orden de candidatos", test_rank_candidates),
+        ("URL de la miniatura", test_thumb_url),
+        ("Límite de tamaño", test_read_image_body),
+        ("Rechazo por tipo y firma", test_read_image_body_sniff),
+    ]
+    failed = 0
+    for name, func in tests:
+        try:
+            func()
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            failed += 1
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} pruebas pasaron")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Pruebas del front matter (tools/frontmatter.py): ``update`` cambia solo la
+cabecera y deja el cuerpo idéntico byte a byte, y un fallo no toca el original.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+
+import frontmatter  # noqa: E402
+import yaml  # noqa: E402
+
+HEADER = "---\ntitle: Cómo elegir\nslug: como-elegir\nimage: /images/blog/viejo.webp\ndate: '2024-01-01'\n---\n"
+# CRLF, espacios finales, otro "---" y un byte que no es UTF-8: nada de eso debe cambiar
+BODY = (b"\n# C\xc3\xb3mo elegir  \r\n\r\nTexto con tabla:\r\n\n---\n\n| a | b |\n"
+        b"Byte suelto: \xe9 fin sin salto")
+
+
+def test_update_keeps_body():
+    """update reescribe la cabecera y copia el cuerpo tal cual."""
+    print("🧪 Probando update con cuerpo idéntico...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "post.mdx"
+        path.write_bytes(HEADER.encode("utf-8") + BODY)
+        path.chmod(0o640)
+
+        assert frontmatter.read(path)["title"] == "Cómo elegir", "read no decodifica el cuerpo"
+        data = frontmatter.update(path, {"image": "/images/blog/nuevo.webp", "credit": "Wikimedia"},
+                                  remove=["date"])
+        raw = path.read_bytes()
+        assert raw.endswith(BODY), "el cuerpo debe quedar idéntico byte a byte"
+        header = raw[:len(raw) - len(BODY)].decode("utf-8")
+        assert header.startswith("---\n") and header.endswith("---\n")
+        assert list(data) == ["title", "slug", "image", "credit"], "se conserva el orden de las claves"
+        assert frontmatter.read(path) == data
+        assert path.stat().st_mode & 0o777 == 0o640, "se conservan los permisos"
+        assert [p.name for p in Path(tmp).iterdir()] == ["post.mdx"], "no deben quedar temporales"
+    print("✅ Cuerpo idéntico")
+
+
+def test_update_without_header():
+    """Un fichero sin cabecera la recibe delante del contenido original."""
+    print("🧪 Probando update sin cabecera...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "post.mdx"
+        path.write_bytes(BODY)
+        frontmatter.update(path, {"title": "Nuevo"})
+        raw = path.read_bytes()
+        assert raw.startswith(b"---\ntitle: Nuevo\n---\n") and raw.endswith(BODY)
+    print("✅ Cabecera añadida")
+
+
+def test_failed_write_keeps_original():
+    """Si la escritura falla, el artículo original sigue intacto y no quedan temporales."""
+    print("🧪 Probando una escritura fallida...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "post.mdx"
+        original = HEADER.encode("utf-8") + BODY
+        path.write_bytes(original)
+        try:
+            # Un valor que YAML no sabe volcar falla a mitad de la escritura
+            frontmatter.update(path, {"image": object()})
+            raise AssertionError("el volcado debía fallar")
+        except yaml.YAMLError:
+            pass
+        assert path.read_bytes() == original
+        assert [p.name for p in Path(tmp).iterdir()] == ["post.mdx"]
+    print("✅ Original intacto")
+
+
+def main():
+    """Ejecuta todas las pruebas."""
+    tests = [
+        ("Cuerpo idéntico", test_update_keeps_body),
+        ("Sin cabecera", test_update_without_header),
+        ("Escritura fallida", test_failed_write_keeps_original),
+    ]
+    failed = 0
+    for name, func in tests:
+        try:
+            func()
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            failed += 1
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} pruebas pasaron")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la caché de respuestas (tools/gen_cache.py): aciertos, caducidad
+por TTL y expulsión LRU al superar el umbral de bytes escritos.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+
+from gen_cache import ResponseCache, cache_key  # noqa: E402
+
+
+def cache_size(root: Path) -> int:
+    return sum(f.stat().st_size for f in root.glob("*/*/*"))
+
+
+def test_hit():
+    """Lo guardado se sirve tal cual; otra clave u otro tipo es un fallo."""
+    print("🧪 Probando aciertos de la caché...")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(Path(tmp))
+        key = cache_key("openai", "gpt", "prompt", temperature=0.7)
+        assert key == cache_key("openai", "gpt", "prompt", temperature=0.7)
+        assert key != cache_key("openai", "gpt", "prompt", temperature=0.8)
+        assert cache.get_text(key) is None
+
+        cache.put_text(key, "Título", "# Título\n\nCuerpo con acentos: ñ, á.")
+        assert cache.get_text(key) == ("Título", "# Título\n\nCuerpo con acentos: ñ, á.")
+        assert cache.get_images(key) is None, "una entrada de texto no es de imágenes"
+
+        img_key = cache_key("gemini", "img", "prompt")
+        cache.put_images(img_key, [("image/png", b"\x89PNG uno"), ("image/jpeg", b"\xff\xd8 dos")])
+        assert cache.get_images(img_key) == [("image/png", b"\x89PNG uno"), ("image/jpeg", b"\xff\xd8 dos")]
+        assert not list(Path(tmp).glob("*/.*")), "no deben quedar temporales"
+    print("✅ Aciertos")
+
+
+def test_ttl():
+    """Una entrada caducada es un fallo y se borra al leerla."""
+    print("🧪 Probando la caducidad por TTL...")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(Path(tmp), ttl=0.05)
+        cache.put_text("ab" * 32, "t", "cuerpo")
+        assert cache.get_text("ab" * 32) == ("t", "cuerpo")
+        time.sleep(0.1)
+        assert cache.get_text("ab" * 32) is None
+        assert not cache._entry("ab" * 32).exists()
+    print("✅ Caducidad por TTL")
+
+
+def test_eviction_threshold():
+    """La expulsión corre en la primera escritura y luego cada max_bytes / EVICT_FRACTION bytes."""
+    print("🧪 Probando la expulsión por umbral de bytes...")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        filler = ResponseCache(root, max_bytes=0, ttl=0)  # sin límite: llena la caché
+        keys = [f"{i:02x}" * 32 for i in range(30)]
+        now = time.time()
+        for i, key in enumerate(keys):
+            filler.put_text(key, "", "x" * 800)
+            os.utime(filler._entry(key), (now - 100 + i, now - 100 + i))
+        assert cache_size(root) > 20_000
+
+        cache = ResponseCache(root, max_bytes=20_000, ttl=0)
+        assert cache.get_text(keys[0]) is not None  # el acierto lo marca como reciente
+        cache.put_text("f0" * 32, "", "nuevo")
+        assert cache_size(root) <= 20_000, "la primera escritura aplica el límite"
+        assert cache.get_text(keys[0]) is not None, "la entrada usada hace poco se conserva"
+        assert cache.get_text(keys[1]) is None, "se expulsan primero las menos usadas"
+        assert cache.get_text(keys[-1]) is not None
+
+        for key in ("e0" * 32, "e1" * 32, "e2" * 32):
+            filler.put_text(key, "", "x" * 800)
+        over = cache_size(root)
+        assert over > 20_000
+        cache.put_text("f1" * 32, "", "y" * 100)
+        assert cache_size(root) > 20_000, "por debajo del umbral no se recorre la caché"
+        cache.put_text("f2" * 32, "", "z" * 1000)
+        assert cache_size(root) <= 20_000, "al pasar el umbral se vuelve a expulsar"
+    print("✅ Expulsión por umbral de bytes")
+
+
+def main():
+    """Ejecuta todas las pruebas."""
+    tests = [
+        ("Aciertos", test_hit),
+        ("Caducidad por TTL", test_ttl),
+        ("Expulsión por umbral", test_eviction_threshold),
+    ]
+    failed = 0
+    for name, func in tests:
+        try:
+            func()
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            failed += 1
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} pruebas pasaron")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la cobertura entre proveedores (tools/hedging.py): gana el primero
+válido, el siguiente se lanza al fallar o tras el umbral, y los perdedores se
+cancelan.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+
+from hedging import race  # noqa: E402
+
+
+class Attempt:
+    """Intento simulado que registra cuándo empieza y si lo cancelan."""
+
+    def __init__(self, name, delay, result=None, error=None):
+        self.name = name
+        self.delay = delay
+        self.result = result
+        self.error = error
+        self.started = None
+        self.cancelled = False
+
+    def entry(self, t0):
+        async def run():
+            self.started = time.monotonic() - t0
+            try:
+                await asyncio.sleep(self.delay)
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+            if self.error:
+                raise self.error
+            return self.result
+        return (self.name, f"{self.name}:modelo", run)
+
+
+def race_with(attempts, **kwargs):
+    async def run():
+        t0 = time.monotonic()
+        return await race([a.entry(t0) for a in attempts], **kwargs)
+    return asyncio.run(run())
+
+
+def test_first_wins():
+    """Si el primero responde antes del umbral, el segundo ni se lanza."""
+    print("🧪 Probando que gana el primero...")
+    a, b = Attempt("openai", 0.01, "texto a"), Attempt("gemini", 0.01, "texto b")
+    assert race_with([a, b], hedge_after=0.5) == "texto a"
+    assert b.started is None
+    print("✅ Gana el primero")
+
+
+def test_hedge_after_threshold():
+    """Pasado el umbral se lanza el siguiente sin cancelar el primero; gana el más rápido."""
+    print("🧪 Probando la cobertura tras el umbral...")
+    slow, fast = Attempt("openai", 1.0, "lento"), Attempt("gemini", 0.02, "rápido")
+    start = time.monotonic()
+    assert race_with([slow, fast], hedge_after=0.05) == "rápido"
+    assert time.monotonic() - start < 0.5, "no espera al intento lento"
+    assert 0.04 <= fast.started < 0.3, "la cobertura sale tras hedge_after"
+    assert slow.cancelled, "el perdedor se cancela"
+    print("✅ Cobertura tras el umbral")
+
+
+def test_failure_launches_next():
+    """Un fallo o un resultado no válido lanzan el siguiente al momento; sin umbral no hay cobertura."""
+    print("🧪 Probando el fallback al fallar...")
+    a = Attempt("openai", 0.01, error=RuntimeError("HTTP 500"))
+    b = Attempt("gemini", 0.01, "")
+    c = Attempt("gemini", 0.01, "bueno")
+    assert race_with([a, b, c], hedge_after=None) == "bueno"
+    assert b.started < 0.1 and c.started < 0.1
+
+    try:
+        race_with([Attempt("openai", 0.01, error=RuntimeError("HTTP 500")), Attempt("gemini", 0.01, "")])
+        raise AssertionError("sin resultados válidos debía fallar")
+    except RuntimeError as e:
+        assert "HTTP 500" in str(e) and "no válido" in str(e)
+    print("✅ Fallback al fallar")
+
+
+def test_timeout_and_outer_cancel():
+    """El timeout por proveedor cuenta como fallo y cancelar la carrera cancela los intentos."""
+    print("🧪 Probando timeouts y cancelación...")
+    slow, backup = Attempt("openai", 1.0, "tarde"), Attempt("gemini", 0.01, "a tiempo")
+    assert race_with([slow, backup], timeouts={"openai": 0.05}) == "a tiempo"
+    assert slow.cancelled
+
+    a, b = Attempt("openai", 1.0, "a"), Attempt("gemini", 1.0, "b")
+
+    async def run():
+        t0 = time.monotonic()
+        task = asyncio.ensure_future(race([a.entry(t0), b.entry(t0)], hedge_after=0.01))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+    assert a.cancelled and b.cancelled, "no deben quedar intentos huérfanos"
+    print("✅ Timeouts y cancelación")
+
+
+def main():
+    """Ejecuta todas las pruebas."""
+    tests = [
+        ("Gana el primero", test_first_wins),
+        ("Cobertura tras el umbral", test_hedge_after_threshold),
+        ("Fallback al fallar", test_failure_launches_next),
+        ("Timeouts y cancelación", test_timeout_and_outer_cancel),
+    ]
+    failed = 0
+    for name, func in tests:
+        try:
+            func()
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            failed += 1
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} pruebas pasaron")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
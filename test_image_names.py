@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Pruebas del reparto de nombres de imágenes (tools/image_names.py): reservas
+concurrentes sin repetir índices y liberación de la reserva si algo falla.
+"""
+
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+
+from image_names import ImageNameAllocator, reserved_image_path  # noqa: E402
+
+
+def test_concurrent_reservations():
+    """Muchos hilos y dos asignadores (como dos procesos) nunca repiten un nombre."""
+    print("🧪 Probando reservas concurrentes...")
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp) / "post"
+        base.mkdir()
+        (base / "post-hero-003.png").write_bytes(b"x")
+        allocators = [ImageNameAllocator(), ImageNameAllocator()]
+        start = threading.Barrier(16)
+
+        def reserve(i: int) -> Path:
+            start.wait()
+            return allocators[i % 2].reserve(base, "post", "hero")
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            stems = list(pool.map(reserve, range(64)))
+        names = [s.name for s in stems]
+        assert len(set(names)) == 64, "hay nombres repetidos"
+        assert min(names) == "post-hero-004", "debe empezar tras el mayor índice existente"
+        assert all(s.with_suffix(".webp").exists() for s in stems)
+    print("✅ 64 nombres distintos")
+
+
+def test_reserved_path_released():
+    """La reserva se borra si el bloque falla o no escribe nada, y se queda si escribe."""
+    print("🧪 Probando la liberación de reservas...")
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        try:
+            with reserved_image_path(base, "post") as stem:
+                assert stem.with_suffix(".webp").exists()
+                stem.with_suffix(".webp").write_bytes(b"a medias")
+                raise RuntimeError("fallo al codificar")
+        except RuntimeError:
+            pass
+        assert not stem.with_suffix(".webp").exists()
+
+        with reserved_image_path(base, "post") as stem:
+            stem.with_suffix(".png").write_bytes(b"png")
+        assert not stem.with_suffix(".webp").exists() and stem.with_suffix(".png").exists()
+
+        with reserved_image_path(base, "post") as stem:
+            stem.with_suffix(".webp").write_bytes(b"webp")
+        assert stem.with_suffix(".webp").read_bytes() == b"webp"
+        assert stem.with_suffix(".webp").stat().st_mode & 0o111 == 0, "la imagen no debe ser ejecutable"
+    print("✅ Reservas liberadas")
+
+
+def main():
+    """Ejecuta todas las pruebas."""
+    tests = [
+        ("Reservas concurrentes", test_concurrent_reservations),
+        ("Liberación de reservas", test_reserved_path_released),
+    ]
+    failed = 0
+    for name, func in tests:
+        try:
+            func()
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            failed += 1
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} pruebas pasaron")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
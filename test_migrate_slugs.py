@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la migración de slugs (tools/migrate_slugs.py) sobre un blog de
+prueba en un directorio temporal: plan, imágenes compartidas que no se borran,
+renombrado de un slug roto con el título ya reparado y redirecciones.
+"""
+
+import json
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+
+import frontmatter  # noqa: E402
+import image_dedup  # noqa: E402
+import migrate_slugs  # noqa: E402
+
+# slug -> (título, imagen, cuerpo)
+POSTS = {
+    # Duplicado con mojibake de guia-wifi; su imagen la reutiliza "redes"
+    "guaa-wifi": ("GuÃ­a WiFi", "/images/blog/guaa-wifi/guaa-wifi-hero-001.webp", "Texto corto."),
+    "guia-wifi": ("Guía WiFi", "/images/blog/guia-wifi/guia-wifi-hero-001.webp", "Texto más largo. " * 20),
+    "redes": ("Redes", "/images/blog/guaa-wifi/guaa-wifi-hero-001.webp",
+              "Ver [la guía](/blog/guaa-wifi).\n\n![](/images/blog/guaa-wifi/guaa-wifi-hero-001.webp)"),
+    # Título ya reparado, slug todavía roto
+    "implementacia3n-de-ia": ("Implementación de IA",
+                              "/images/blog/implementacia3n-de-ia/implementacia3n-de-ia-hero-001.webp", "Cuerpo."),
+    # Slug corto elegido a mano: no se toca
+    "wifi-corto": ("Configuración de redes WiFi", "", "Cuerpo."),
+}
+
+
+@contextmanager
+def temp_blog():
+    """Blog de prueba en un temporal; los módulos apuntan a él mientras dura el bloque."""
+    saved = [(m, m.ROOT, m.IMG_BASE, m.BLOG_DIR) for m in (migrate_slugs, image_dedup)]
+    saved_redirects = migrate_slugs.REDIRECTS
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            yield make_blog(Path(tmp))
+    finally:
+        for module, root, images, blog in saved:
+            module.ROOT, module.IMG_BASE, module.BLOG_DIR = root, images, blog
+        migrate_slugs.REDIRECTS = saved_redirects
+
+
+def make_blog(root: Path):
+    """Escribe los artículos de POSTS con sus imágenes y devuelve las filas del inventario."""
+    blog = root / "content" / "blog"
+    images = root / "public" / "images" / "blog"
+    blog.mkdir(parents=True)
+    for slug, (title, image, body) in POSTS.items():
+        fm = {"title": title, "slug": slug}
+        if image:
+            fm["image"] = image
+            path = root / "public" / image.lstrip("/")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"RIFF imagen " + slug.encode())
+        frontmatter.write(blog / f"{slug}.mdx", fm, body + "\n")
+    for module in (migrate_slugs, image_dedup):
+        module.ROOT, module.IMG_BASE, module.BLOG_DIR = root, images, blog
+    migrate_slugs.REDIRECTS = root / "content" / "redirects.json"
+    rows = []
+    for path in sorted(blog.glob("*.mdx")):
+        fm = frontmatter.read(path)
+        rows.append({"path": path.relative_to(root).as_posix(), "abspath": path, "title": fm["title"],
+                     "slug": fm["slug"], "image": fm.get("image"), "size": path.stat().st_size})
+    return root, blog, images, rows
+
+
+def test_build_plan():
+    """El plan fusiona el duplicado, renombra el slug roto y deja los slugs hechos a mano."""
+    print("🧪 Probando el plan de migración...")
+    with temp_blog() as (_, _, _, rows):
+        plan = {migrate_slugs.article_slug(s["keep"]): s for s in migrate_slugs.build_plan(rows)}
+        assert set(plan) == {"guia-wifi", "implementacia3n-de-ia"}, sorted(plan)
+        assert plan["guia-wifi"]["slug"] == "guia-wifi"
+        assert [migrate_slugs.article_slug(r) for r in plan["guia-wifi"]["drop"]] == ["guaa-wifi"]
+        assert plan["implementacia3n-de-ia"]["slug"] == "implementacion-de-ia"
+        assert plan["implementacia3n-de-ia"]["drop"] == []
+    print("✅ Plan de migración")
+
+
+def test_apply_keeps_shared_image():
+    """Al borrar el duplicado se conserva la imagen que usa otro artículo y se reescriben los enlaces."""
+    print("🧪 Probando la migración con una imagen compartida...")
+    with temp_blog() as (root, blog, images, rows):
+        redirects, moved = {}, {}
+        for step in migrate_slugs.build_plan(rows):
+            migrate_slugs.apply_step(step, redirects, moved)
+        migrate_slugs.rewrite_links(redirects, moved)
+        migrate_slugs.save_redirects(redirects)
+
+        assert sorted(p.stem for p in blog.glob("*.mdx")) == [
+            "guia-wifi", "implementacion-de-ia", "redes", "wifi-corto"]
+        shared = images / "guaa-wifi" / "guaa-wifi-hero-001.webp"
+        assert shared.exists(), "la imagen del duplicado la sigue usando redes.mdx"
+        redes = (blog / "redes.mdx").read_text(encoding="utf-8")
+        assert "(/blog/guia-wifi)" in redes, "el enlace al duplicado apunta al que queda"
+        assert "/images/blog/guaa-wifi/guaa-wifi-hero-001.webp" in redes, "la ruta de la imagen no cambia"
+
+        renamed = frontmatter.read(blog / "implementacion-de-ia.mdx")
+        assert renamed["slug"] == "implementacion-de-ia"
+        assert renamed["image"] == "/images/blog/implementacion-de-ia/implementacion-de-ia-hero-001.webp"
+        assert (root / "public" / renamed["image"].lstrip("/")).exists()
+        assert not (images / "implementacia3n-de-ia").exists()
+
+        entries = json.loads(migrate_slugs.REDIRECTS.read_text(encoding="utf-8"))
+        assert {e["source"]: e["destination"] for e in entries} == {
+            "/blog/guaa-wifi": "/blog/guia-wifi",
+            "/blog/implementacia3n-de-ia": "/blog/implementacion-de-ia",
+        }
+    print("✅ Imagen compartida conservada")
+
+
+def main():
+    """Ejecuta todas las pruebas."""
+    tests = [
+        ("Plan de migración", test_build_plan),
+        ("Imagen compartida", test_apply_keeps_shared_image),
+    ]
+    failed = 0
+    for name, func in tests:
+        try:
+            func()
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            failed += 1
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} pruebas pasaron")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Pruebas del índice de casi-duplicados (tools/near_duplicates.py): estimación
+de Jaccard con MinHash, cubetas LSH, grupos de posts reescritos y recálculo
+incremental de las firmas.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+
+import frontmatter  # noqa: E402
+import near_duplicates  # noqa: E402
+from near_duplicates import DuplicateIndex, LSHIndex, char_shingles, minhash, similarity, word_shingles  # noqa: E402
+
+BODY = (
+    "Una red WiFi empresarial necesita planificar la cobertura de cada planta, separar a los "
+    "invitados en su propia VLAN y elegir puntos de acceso con gestión centralizada. Antes de "
+    "instalar conviene medir interferencias, revisar el cableado y decidir el cifrado WPA3. "
+    "Después hay que documentar la configuración y vigilar el rendimiento durante las primeras "
+    "semanas para ajustar la potencia de los equipos."
+)
+OTHER = (
+    "Las cámaras de videovigilancia con analítica detectan intrusos en tiempo real y envían "
+    "avisos al móvil. La grabación en la nube evita perder las imágenes si roban el grabador, "
+    "y el almacenamiento local reduce el consumo de ancho de banda del negocio."
+)
+
+
+def test_minhash_estimate():
+    """La similitud estimada sigue al Jaccard real y no depende de acentos ni mojibake."""
+    print("🧪 Probando la estimación MinHash...")
+    a = word_shingles(BODY)
+    b = word_shingles(BODY.replace("semanas", "días").replace("WPA3", "WPA2"))
+    exact = len(a & b) / len(a | b)
+    estimate = similarity(minhash(a), minhash(b))
+    assert abs(estimate - exact) < 0.15, (estimate, exact)
+    assert similarity(minhash(a), minhash(a)) == 1.0
+    assert similarity(minhash(a), minhash(word_shingles(OTHER))) < 0.1
+    assert minhash(char_shingles("Guía WiFi")) == minhash(char_shingles("GuÃ­a wifi")), \
+        "el mojibake y las mayúsculas no cambian la firma"
+    assert minhash([]) == minhash(set()), "un texto vacío tiene una firma fija"
+    print("✅ Estimación MinHash")
+
+
+def test_lsh_query():
+    """La consulta encuentra el casi-duplicado en sus cubetas y filtra por umbral."""
+    print("🧪 Probando las cubetas LSH...")
+    lsh = LSHIndex()
+    lsh.add("wifi", minhash(word_shingles(BODY)))
+    lsh.add("camaras", minhash(word_shingles(OTHER)))
+    matches = lsh.query(minhash(word_shingles(BODY + " Fin del artículo.")), threshold=0.8)
+    assert [key for key, _ in matches] == ["wifi"], matches
+    assert lsh.query(minhash(word_shingles("texto que no se parece a nada")), threshold=0.1) == []
+    print("✅ Cubetas LSH")
+
+
+def write_post(blog: Path, slug: str, title: str, body: str) -> Path:
+    """Escribe un artículo de prueba en ``blog``."""
+    path = blog / f"{slug}.mdx"
+    frontmatter.write(path, {"title": title, "slug": slug}, body + "\n")
+    return path
+
+
+def test_clusters_and_incremental_load():
+    """Un post reescrito se agrupa con el original y al recargar solo se recalcula lo que cambió."""
+    print("🧪 Probando grupos y recálculo incremental...")
+    with tempfile.TemporaryDirectory() as tmp:
+        blog = Path(tmp) / "blog"
+        blog.mkdir()
+        write_post(blog, "guia-wifi", "Guía de redes WiFi para empresas", BODY)
+        write_post(blog, "wifi-empresas", "Guía de redes WiFi para empresas", BODY + " Nada más.")
+        cameras = write_post(blog, "camaras", "Cámaras con analítica", OTHER)
+        store, index_path = Path(tmp) / "near.json", Path(tmp) / "index.sqlite"
+
+        index = DuplicateIndex.load(store, index_path, blog)
+        groups = index.clusters(threshold=0.8)
+        assert len(groups) == 1, groups
+        assert sorted(Path(key).stem for key, _ in groups[0]) == ["guia-wifi", "wifi-empresas"]
+        topic = index.similar_to_topic("Guía de redes WiFi para las empresas")
+        assert {Path(key).stem for key, _ in topic} == {"guia-wifi", "wifi-empresas"}, topic
+        assert [Path(k).stem for k in index.keys_for_slug("camaras")] == ["camaras"]
+
+        calls = []
+        original = near_duplicates.minhash
+
+        def counting_minhash(shingles):
+            calls.append(1)
+            return original(shingles)
+
+        near_duplicates.minhash = counting_minhash
+        try:
+            DuplicateIndex.load(store, index_path, blog)
+            assert calls == [], "sin cambios no se recalcula ninguna firma"
+            write_post(blog, "camaras", "Cámaras con analítica de vídeo", OTHER)
+            reloaded = DuplicateIndex.load(store, index_path, blog)
+            assert len(calls) == 2, "solo se recalculan las dos firmas del post editado"
+        finally:
+            near_duplicates.minhash = original
+        key = next(k for k in reloaded.docs if Path(k).stem == "camaras")
+        assert reloaded.docs[key]["title"] == "Cámaras con analítica de vídeo"
+        cameras.unlink()
+        assert len(DuplicateIndex.load(store, index_path, blog).docs) == 2, "un post borrado sale del índice"
+    print("✅ Grupos y recálculo incremental")
+
+
+def main():
+    """Ejecuta todas las pruebas."""
+    tests = [
+        ("Estimación MinHash", test_minhash_estimate),
+        ("Cubetas LSH", test_lsh_query),
+        ("Grupos y recálculo incremental", test_clusters_and_incremental_load),
+    ]
+    failed = 0
+    for name, func in tests:
+        try:
+            func()
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            failed += 1
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} pruebas pasaron")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
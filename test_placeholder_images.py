@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Pruebas de los placeholders (tools/generate_placeholder_image.py): reparto de
+nombres sin pisar heroes existentes y generación en lote.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+
+import webp_encoder  # noqa: E402
+from generate_placeholder_image import create_placeholder_image, create_placeholder_images  # noqa: E402
+
+
+def test_keeps_existing_hero():
+    """El placeholder usa el siguiente <slug>-hero-NNN libre, sin pisar el hero existente."""
+    print("🧪 Probando un placeholder junto a un hero existente...")
+    webp_encoder.configure(workers=0)
+    with tempfile.TemporaryDirectory() as tmp:
+        hero = Path(tmp) / "post" / "post-hero-001.png"
+        hero.parent.mkdir()
+        hero.write_bytes(b"original")
+        [out] = create_placeholder_images([{"slug": "post", "topic": "Un título"}], base_dir=Path(tmp))
+        assert out.name == "post-hero-002.webp" and out.stat().st_size > 1000
+        assert hero.read_bytes() == b"original"
+        assert create_placeholder_image("post", "Otro", image_path=out.with_name("otro.webp")).exists()
+    print("✅ El hero existente no se toca")
+
+
+def test_batch():
+    """El lote reserva todos los nombres y dibuja cada imagen en el pool."""
+    print("🧪 Probando placeholders en lote...")
+    webp_encoder.configure(workers=2)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            items = [
+                {"slug": "uno", "topic": "Primer artículo"},
+                {"slug": "dos", "topic": "Segundo artículo", "accent": "verde", "style": "ilustración"},
+                {"slug": "uno", "topic": "Primer artículo, otra vez"},
+            ]
+            paths = create_placeholder_images(items, base_dir=base)
+            names = sorted(p.relative_to(base).as_posix() for p in paths)
+            assert names == ["dos/dos-hero-001.webp", "uno/uno-hero-001.webp", "uno/uno-hero-002.webp"], names
+            assert all(p.stat().st_size > 1000 for p in paths)
+    finally:
+        webp_encoder.shutdown()
+    print("✅ Tres placeholders con nombres distintos")
+
+
+def test_batch_failure_releases_name():
+    """Si un placeholder falla, su reserva vacía no se queda en disco."""
+    print("🧪 Probando un placeholder fallido en lote...")
+    webp_encoder.configure(workers=0)
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        paths = create_placeholder_images([
+            {"slug": "bien", "topic": "Correcto"},
+            {"slug": "mal", "topic": None},
+        ], base_dir=base)
+        assert [p.name for p in paths] == ["bien-hero-001.webp"]
+        assert list((base / "mal").iterdir()) == []
+    print("✅ Reserva liberada")
+
+
+def main():
+    """Ejecuta todas las pruebas."""
+    tests = [
+        ("Placeholder junto a un hero", test_keeps_existing_hero),
+        ("Placeholders en lote", test_batch),
+        ("Placeholder fallido", test_batch_failure_releases_name),
+    ]
+    failed = 0
+    for name, func in tests:
+        try:
+            func()
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            failed += 1
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} pruebas pasaron")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Pruebas del regulador de llamadas a proveedores (tools/provider_governor.py):
+cubeta de tokens, estados del circuit breaker y la llamada de prueba de un
+carril medio abierto.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+
+from provider_governor import MIN_RATE, CircuitBreaker, CircuitOpen, ProviderGovernor, TokenBucket  # noqa: E402
+
+
+class FakeHTTPError(Exception):
+    """Error con código HTTP, como los de los SDK."""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def test_token_bucket():
+    """La cubeta limita el ritmo y se adapta con penalize()/reward()."""
+    print("🧪 Probando la cubeta de tokens...")
+
+    async def run():
+        bucket = TokenBucket(rate=20.0, capacity=1)
+        start = time.monotonic()
+        await bucket.acquire()
+        assert time.monotonic() - start < 0.02, "el primer token debe estar disponible al momento"
+        start = time.monotonic()
+        await bucket.acquire()
+        assert time.monotonic() - start >= 0.04, "sin tokens hay que esperar ~1/rate"
+
+        bucket.penalize()
+        assert bucket.rate == 10.0 and bucket.tokens <= 0
+        for _ in range(20):
+            bucket.penalize()
+        assert bucket.rate == MIN_RATE, "el ritmo nunca baja de MIN_RATE"
+
+        bucket.rate = 1000.0
+        bucket.penalize(pause=0.1)
+        start = time.monotonic()
+        await bucket.acquire()
+        assert time.monotonic() - start >= 0.09, "un Retry-After pausa la cubeta"
+
+        bucket.rate = bucket.max_rate
+        bucket.reward()
+        assert bucket.rate == bucket.max_rate, "reward() no supera el máximo"
+
+    asyncio.run(run())
+    print("✅ Cubeta de tokens")
+
+
+def test_circuit_breaker_states():
+    """Cerrado -> abierto -> medio abierto (una sola prueba) -> cerrado o abierto."""
+    print("🧪 Probando los estados del circuit breaker...")
+
+    breaker = CircuitBreaker(threshold=2, cooldown=0.05)
+    assert breaker.allow() and not breaker.is_open()
+    assert breaker.failure() is False, "por debajo del umbral sigue cerrado"
+    assert breaker.failure() is True, "al llegar al umbral se abre"
+    assert breaker.is_open() and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow() and breaker.probing, "pasado el cooldown sale una llamada de prueba"
+    assert not breaker.allow(), "solo una prueba a la vez"
+    breaker.release()
+    assert not breaker.probing and breaker.allow(), "una prueba cancelada deja pasar otra"
+
+    assert breaker.failure() is True, "si la prueba falla se vuelve a abrir"
+    assert breaker.is_open() and not breaker.probing
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.success()
+    assert not breaker.is_open() and breaker.failures == 0 and breaker.allow()
+    print("✅ Estados del circuit breaker")
+
+
+def test_probe_rate_limited():
+    """Un 429 en la llamada de prueba reabre el carril sin dejarlo bloqueado para siempre."""
+    print("🧪 Probando un 429 en la llamada de prueba...")
+
+    async def fail(status):
+        raise FakeHTTPError(status)
+
+    async def ok():
+        return "ok"
+
+    async def run():
+        governor = ProviderGovernor(max_retries=2, threshold=1, cooldown=0.1)
+        try:
+            await governor.call("openai", "m", lambda: fail(503))
+            raise AssertionError("el 503 debía abrir el carril")
+        except CircuitOpen:
+            pass
+        assert not governor.available("openai", "m")
+
+        await asyncio.sleep(0.12)
+        try:
+            await governor.call("openai", "m", lambda: fail(429))
+            raise AssertionError("el 429 de la prueba debía reabrir el carril")
+        except CircuitOpen:
+            pass
+        lane = governor.lane("openai", "m")
+        assert not lane.breaker.probing, "la prueba no puede quedarse en vuelo"
+        assert not governor.available("openai", "m"), "tras el 429 el carril vuelve a pausa"
+
+        await asyncio.sleep(0.12)
+        lane.bucket.rate = lane.bucket.max_rate  # sin la penalización del 429, para no esperar
+        lane.bucket._paused_until = 0.0
+        assert governor.available("openai", "m"), "pasado el cooldown se puede volver a probar"
+        assert await governor.call("openai", "m", ok) == "ok"
+        assert governor.available("openai", "m") and not lane.breaker.is_open()
+
+    asyncio.run(run())
+    print("✅ 429 en la llamada de prueba")
+
+
+def test_probe_cancelled():
+    """Una prueba cancelada (ganó otro proveedor) no deja el carril medio abierto."""
+    print("🧪 Probando una llamada de prueba cancelada...")
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def run():
+        governor = ProviderGovernor(threshold=1, cooldown=0.05)
+        governor.lane("gemini", "m").breaker.trip()
+        await asyncio.sleep(0.06)
+        task = asyncio.create_task(governor.call("gemini", "m", slow))
+        await asyncio.sleep(0.02)
+        assert governor.lane("gemini", "m").breaker.probing
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        assert not governor.lane("gemini", "m").breaker.probing
+        assert governor.available("gemini", "m")
+
+    asyncio.run(run())
+    print("✅ Prueba cancelada")
+
+
+def test_dead_key_trips_new_models():
+    """Un 401 deshabilita también los modelos del proveedor que aún no tienen carril."""
+    print("🧪 Probando un 401 con modelos sin carril...")
+
+    async def fail(status):
+        raise FakeHTTPError(status)
+
+    async def ok():
+        return "ok"
+
+    async def run():
+        governor = ProviderGovernor(max_retries=0, threshold=3, cooldown=0.1)
+        try:
+            await governor.call("openai", "texto", lambda: fail(401))
+            raise AssertionError("el 401 debía propagarse")
+        except FakeHTTPError:
+            pass
+        assert not governor.available("openai", "texto")
+        assert not governor.available("openai", "imagen"), "el carril nuevo debe nacer en pausa"
+        assert governor.available("gemini", "imagen"), "otro proveedor no se ve afectado"
+        try:
+            await governor.call("openai", "otro", ok)
+            raise AssertionError("un modelo nuevo no debía llamar al proveedor deshabilitado")
+        except CircuitOpen:
+            pass
+
+        await asyncio.sleep(0.12)
+        assert await governor.call("openai", "imagen", ok) == "ok", "pasado el cooldown sale la prueba"
+        assert governor.available("openai", "nuevo"), "tras un éxito los carriles nuevos nacen cerrados"
+
+    asyncio.run(run())
+    print("✅ 401 con modelos sin carril")
+
+
+def main():
+    """Ejecuta todas las pruebas."""
+    tests = [
+        ("Cubeta de tokens", test_token_bucket),
+        ("Estados del circuit breaker", test_circuit_breaker_states),
+        ("429 en la llamada de prueba", test_probe_rate_limited),
+        ("Prueba cancelada", test_probe_cancelled),
+        ("401 con modelos sin carril", test_dead_key_trips_new_models),
+    ]
+    failed = 0
+    for name, func in tests:
+        try:
+            func()
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            failed += 1
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} pruebas pasaron")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Pruebas del slug canónico (tools/slugs.py) con los títulos con mojibake que
+hay en content/blog ("ca3mo", "tecnologaas", "implementacia3n").
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+
+from slugs import MAX_LENGTH, canonical_slug, mojibake_slug, repair_mojibake  # noqa: E402
+
+# (título tal como está en el front matter, título reparado, slug roto que produjo)
+CASES = [
+    ("CÃ³mo elegir el sistema de videovigilancia ideal para tu negocio",
+     "Cómo elegir el sistema de videovigilancia ideal para tu negocio",
+     "ca3mo-elegir-el-sistema-de-videovigilancia-ideal-para-tu-negocio"),
+    ("TecnologÃ­as Emergentes en Videovigilancia: IA, 5G y el Futuro de la Seguridad",
+     "Tecnologías Emergentes en Videovigilancia: IA, 5G y el Futuro de la Seguridad",
+     "tecnologaas-emergentes-en-videovigilancia-ia-5g-y-el-futuro-de-la-seguridad"),
+    ("Sistemas de Audio Profesional: DiseÃ±o e InstalaciÃ³n para Diferentes Aplicaciones",
+     "Sistemas de Audio Profesional: Diseño e Instalación para Diferentes Aplicaciones",
+     "sistemas-de-audio-profesional-disea-o-e-instalacia3n-para-diferentes-aplicacione"),
+]
+
+
+def test_repair_mojibake():
+    """Se repara el mojibake (también doble) y el texto correcto no cambia."""
+    print("🧪 Probando la reparación de mojibake...")
+    for broken, fixed, _ in CASES:
+        assert repair_mojibake(broken) == fixed, broken
+        assert repair_mojibake(fixed) == fixed, "un texto correcto no se toca"
+    twice = "Cómo".encode("utf-8").decode("cp1252").encode("utf-8").decode("cp1252")
+    assert repair_mojibake(twice) == "Cómo", "codificado dos veces"
+    for text in ("Año 2025: ¿qué €?", "Ã solo no es mojibake", "¡Hola!"):
+        assert repair_mojibake(text) == text, text
+    print("✅ Reparación de mojibake")
+
+
+def test_canonical_slug():
+    """El título roto y el reparado dan el mismo slug, y el slug roto se reconoce."""
+    print("🧪 Probando el slug canónico...")
+    for broken, fixed, broken_slug in CASES:
+        assert canonical_slug(broken) == canonical_slug(fixed)
+        assert "a3" not in canonical_slug(broken) and "aas-" not in canonical_slug(broken)
+        assert mojibake_slug(fixed) == broken_slug, "mismo slug que generó la herramienta rota"
+        assert len(broken_slug) <= MAX_LENGTH
+    assert canonical_slug(CASES[0][0]) == "como-elegir-el-sistema-de-videovigilancia-ideal-para-tu-negocio"
+    assert canonical_slug(CASES[1][0]).startswith("tecnologias-emergentes-")
+    # Mismo recorte que el original: a 80 caracteres, sin quitar el guion final
+    long_slug = canonical_slug("palabra " * 20)
+    assert len(long_slug) == MAX_LENGTH and long_slug.endswith("-")
+    print("✅ Slug canónico")
+
+
+def main():
+    """Ejecuta todas las pruebas."""
+    tests = [
+        ("Reparación de mojibake", test_repair_mojibake),
+        ("Slug canónico", test_canonical_slug),
+    ]
+    failed = 0
+    for name, func in tests:
+        try:
+            func()
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            failed += 1
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} pruebas pasaron")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
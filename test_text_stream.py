@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Pruebas del texto en streaming (tools/article_pipeline.py, ``TextStream``): el
+temporal de .cache/spool se borra si la respuesta se corta, se cancela o no es
+un artículo, y se conserva solo cuando el texto es válido.
+"""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+
+import article_pipeline  # noqa: E402
+from article_pipeline import MalformedText, TextStream  # noqa: E402
+
+ARTICLE = "# Redes WiFi para empresas\n\n## Cobertura\n\n" + "Texto del artículo. " * 20
+
+
+def with_spool_dir(func):
+    """Ejecuta ``func(spool_dir)`` con SPOOL_DIR apuntando a un temporal."""
+    original = article_pipeline.SPOOL_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        article_pipeline.SPOOL_DIR = Path(tmp) / "spool"
+        try:
+            return func(article_pipeline.SPOOL_DIR)
+        finally:
+            article_pipeline.SPOOL_DIR = original
+
+
+def spools(spool_dir: Path):
+    """Nombres de los temporales que hay en ``spool_dir``."""
+    return sorted(p.name for p in spool_dir.glob("*.part")) if spool_dir.exists() else []
+
+
+def test_close_keeps_spool():
+    """Un artículo válido deja el cuerpo en el temporal; uno sin encabezados lo rechaza."""
+    print("🧪 Probando el temporal de un texto válido...")
+
+    def run(spool_dir):
+        text = TextStream("Redes WiFi", "openai", "modelo")
+        for i in range(0, len(ARTICLE), 7):
+            text.feed(ARTICLE[i:i + 7])
+        title, body = result = text.close()
+        assert title == "Redes WiFi para empresas"
+        assert result.spool.read_text(encoding="utf-8") == body == ARTICLE
+        assert result.spool.name.startswith(".redes-wifi.")
+
+        plain = TextStream("Redes WiFi", "openai", "modelo")
+        try:
+            plain.feed("Lo siento, no puedo escribir ese artículo. " * 60)
+            raise AssertionError("debía cortarse sin encabezados")
+        except MalformedText:
+            plain.discard()
+        assert spools(spool_dir) == [result.spool.name], "solo queda el del texto válido"
+
+    with_spool_dir(run)
+    print("✅ Temporal de un texto válido")
+
+
+class FakeStream:
+    """Stream de chat.completions que entrega los fragmentos y luego ``then`` (excepción o espera)."""
+
+    def __init__(self, deltas, then=None):
+        self.deltas = deltas
+        self.then = then
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        for delta in self.deltas:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))], usage=None)
+        if self.then == "hang":
+            await asyncio.sleep(10)
+        elif self.then:
+            raise self.then
+
+
+def fake_clients(stream):
+    """ProviderClients mínimo cuyo cliente OpenAI devuelve ``stream``."""
+    async def create(**kwargs):
+        return stream
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return SimpleNamespace(openai=lambda: client, stream=True)
+
+
+def test_abort_discards_spool():
+    """Un corte de conexión o una cancelación (intento perdedor de ``race``) borran el temporal."""
+    print("🧪 Probando el borrado del temporal al abortar...")
+
+    def run(spool_dir):
+        broken = FakeStream(["# Título\n\n", "Texto a medias"], then=ConnectionError("conexión cortada"))
+        try:
+            asyncio.run(article_pipeline.gen_article_with_openai("Redes WiFi", None, fake_clients(broken)))
+            raise AssertionError("el corte debía propagarse")
+        except ConnectionError:
+            pass
+        assert broken.closed and spools(spool_dir) == [], spools(spool_dir)
+
+        hanging = FakeStream(["# Título\n\n", "Texto a medias"], then="hang")
+
+        async def cancel_midway():
+            task = asyncio.ensure_future(
+                article_pipeline.gen_article_with_openai("Redes WiFi", None, fake_clients(hanging)))
+            await asyncio.sleep(0.05)
+            assert len(spools(spool_dir)) == 1, "el temporal existe mientras llega el texto"
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        asyncio.run(cancel_midway())
+        assert hanging.closed and spools(spool_dir) == [], spools(spool_dir)
+
+    with_spool_dir(run)
+    print("✅ Temporal borrado al abortar")
+
+
+def test_generate_post_sweeps_leftovers():
+    """generate_post borra los temporales de su tema que queden aunque falle, y no los de otros."""
+    print("🧪 Probando la limpieza de temporales de generate_post...")
+
+    def run(spool_dir):
+        spool_dir.mkdir(parents=True)
+        (spool_dir / ".redes-wifi.abc123.part").write_text("huérfano", encoding="utf-8")
+        (spool_dir / ".otro-tema.def456.part").write_text("de otro lote", encoding="utf-8")
+
+        async def failing_build(*args):
+            raise RuntimeError("fallo del proveedor")
+
+        original = article_pipeline._build_post
+        article_pipeline._build_post = failing_build
+        try:
+            asyncio.run(article_pipeline.generate_post("Redes WiFi", clients=SimpleNamespace()))
+            raise AssertionError("el fallo debía propagarse")
+        except RuntimeError as e:
+            assert "proveedor" in str(e)
+        finally:
+            article_pipeline._build_post = original
+        assert spools(spool_dir) == [".otro-tema.def456.part"]
+
+    with_spool_dir(run)
+    print("✅ Limpieza de temporales")
+
+
+def main():
+    """Ejecuta todas las pruebas."""
+    tests = [
+        ("Temporal de un texto válido", test_close_keeps_spool),
+        ("Temporal borrado al abortar", test_abort_discards_spool),
+        ("Limpieza de temporales", test_generate_post_sweeps_leftovers),
+    ]
+    failed = 0
+    for name, func in tests:
+        try:
+            func()
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            failed += 1
+    print(f"\nTotal: {len(tests) - failed}/{len(tests)} pruebas pasaron")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
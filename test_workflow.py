@@ -108,6 +108,25 @@ def test_generate_script():
         print(f"❌ Error al ejecutar script: {e}")
         return False
 
+def test_lazy_imports():
+    """Comprueba que importar el pipeline no carga los SDK ni lo que solo se usa con claves."""
+    print("\n🧪 Probando importación diferida de los SDK...")
+
+    code = (
+        "import sys; sys.path.insert(0, 'tools'); import article_pipeline; "
+        "print(sorted(m for m in ('openai', 'google.genai', 'yaml', 'image_dedup', 'near_duplicates', "
+        "'provider_governor') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        print(f"❌ Error al importar el pipeline: {result.stderr}")
+        return False
+    if result.stdout.strip() != "[]":
+        print(f"❌ Módulos importados al cargar el pipeline: {result.stdout.strip()}")
+        return False
+    print("✅ Los SDK, los índices y PyYAML se cargan solo al usarse")
+    return True
+
 def main():
     """Ejecuta todas las pruebas."""
     print("🚀 Iniciando pruebas del workflow de generación de artículos\n")
@@ -116,7 +135,8 @@ def main():
         ("Dependencias", test_dependencies),
         ("Directorios", test_directories),
         ("Variables de entorno", test_environment),
-        ("Script de generación", test_generate_script)
+        ("Script de generación", test_generate_script),
+        ("Importación diferida", test_lazy_imports)
     ]
     
     results = []
@@ -0,0 +1,1002 @@
+#!/usr/bin/env python3
+"""
+Pipeline de generación de artículos + imágenes para el blog.
+
+La línea de comandos está en generate_article.py, que lee las opciones y solo
+entonces importa este módulo (``run(args)``); aquí no se hace nada al importar
+y los SDK de los proveedores se cargan al crear el primer cliente. Lo que solo
+hace falta con claves o en lote (índices de duplicados, regulador, YAML) se
+importa también al usarse, y una ejecución sin claves no abre índices ni pool.
+
+Las llamadas a proveedores son asíncronas: el texto y las imágenes de un mismo
+tema se piden a la vez y todos los temas del lote comparten un único event loop.
+
+Produce:
+  - content/blog/<slug>.mdx
+  - public/images/blog/<slug>/<slug>-hero-001.<ext> (y más si procede)
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import datetime as dt
+import functools
+import mimetypes
+import os
+import tempfile
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from batch_journal import BatchJournal, TopicProgress
+import frontmatter
+from gen_cache import DEFAULT_CACHE_DIR, ResponseCache, cache_key
+from hedging import HedgePolicy, race
+from image_names import reserved_image_path
+from slugs import canonical_slug
+import telemetry
+import webp_encoder
+
+if TYPE_CHECKING:
+    from near_duplicates import DuplicateIndex
+    from provider_governor import ProviderGovernor
+
+ROOT = Path(__file__).resolve().parents[1]
+CONTENT_DIR = ROOT / "content" / "blog"
+IMAGES_DIR = ROOT / "public" / "images" / "blog"
+# Texto en streaming a medio recibir: fuera de content/ (ignorado por git) por si el proceso muere
+SPOOL_DIR = ROOT / ".cache" / "spool"
+
+
+# Los SDK de los proveedores tardan ~0.5 s cada uno en importarse: se cargan al
+# crear el primer cliente, no al importar el módulo, para que el placeholder
+# sin claves y los scripts que solo usan utilidades no lo paguen.
+@functools.lru_cache(maxsize=None)
+def gemini_sdk():
+    """(genai, types) de google-genai, o (None, None) si no está instalado."""
+    try:
+        from google import genai
+        from google.genai import types
+    except Exception:  # pragma: no cover
+        return None, None
+    return genai, types
+
+
+@functools.lru_cache(maxsize=None)
+def openai_sdk():
+    """Clase AsyncOpenAI, o None si el paquete openai no está instalado."""
+    try:
+        from openai import AsyncOpenAI
+    except Exception:  # pragma: no cover
+        return None
+    return AsyncOpenAI
+
+
+class ProviderClients:
+    """Clientes asíncronos de API creados una sola vez y compartidos entre temas.
+
+    En modo lote evita reconstruir un cliente OpenAI/Gemini por artículo. Debe
+    usarse dentro de un único event loop y cerrarse con ``aclose()`` al terminar.
+    ``governor`` regula las llamadas (ritmo, reintentos, circuit breaker) y se
+    comparte igual que los clientes, así un 429 o una caída afecta a todo el lote.
+    Con ``stream`` el texto se pide en streaming (ver ``TextStream``).
+    """
+
+    def __init__(self, governor: ProviderGovernor | None = None, stream: bool = True):
+        self._openai = None
+        self._gemini = None
+        if governor is None:
+            from provider_governor import ProviderGovernor
+            governor = ProviderGovernor()
+        self.governor = governor
+        self.stream = stream
+
+    def openai(self):
+        api = os.environ.get("OPENAI_API_KEY")
+        if not api:
+            raise RuntimeError("Falta OPENAI_API_KEY en el entorno")
+        AsyncOpenAI = openai_sdk()
+        if AsyncOpenAI is None:
+            raise RuntimeError("Falta dependencia: openai. Ejecuta: pip install openai")
+        if self._openai is None:
+            self._openai = AsyncOpenAI(api_key=api)
+        return self._openai
+
+    def gemini(self):
+        api = os.environ.get("GEMINI_API_KEY")
+        if not api:
+            raise RuntimeError("Falta GEMINI_API_KEY en el entorno")
+        genai, _ = gemini_sdk()
+        if genai is None:
+            raise RuntimeError("Falta dependencia: google-genai. Ejecuta: pip install google-genai")
+        if self._gemini is None:
+            self._gemini = genai.Client(api_key=api).aio
+        return self._gemini
+
+    async def aclose(self):
+        for client, method in ((self._openai, "close"), (self._gemini, "aclose")):
+            close = getattr(client, method, None)
+            if close is None:
+                continue
+            try:
+                await close()
+            except Exception:
+                pass
+        self._openai = None
+        self._gemini = None
+
+
+def save_inline_image(target_stem: Path, mime: str, data: bytes | str) -> Path:
+    """Guarda una imagen; acepta bytes crudos o una cadena base64."""
+    ext = mimetypes.guess_extension(mime or "") or ".png"
+    out_path = target_stem.with_suffix(ext)
+    out_path.write_bytes(base64.b64decode(data) if isinstance(data, str) else data)
+    return out_path
+
+
+def write_images(slug: str, blobs: List[Tuple[str, bytes | str]]) -> List[Path]:
+    """Escribe en disco las imágenes (mime, datos) devueltas por un proveedor.
+
+    Se validan y codifican directamente a WEBP desde memoria en el pool de
+    webp_encoder (todas a la vez); sin Pillow se guarda el original tal cual.
+    Si el índice de imágenes ya tiene una igual (misma respuesta o mismo hash
+    perceptual) se reutiliza esa en lugar de escribir otra copia.
+    """
+    import image_dedup
+
+    target_dir = IMAGES_DIR / slug
+    images: List[Path] = []
+    pending = []
+    # Las reservas que no acaben en una imagen escrita se borran al salir, también si hay un error
+    with ExitStack() as reservations:
+        for mime, data in blobs:
+            if isinstance(data, str):
+                with telemetry.span("decode"):
+                    raw = base64.b64decode(data)
+            else:
+                raw = data
+            with telemetry.span("image_dedup"):
+                existing, info = image_dedup.find_existing(raw)
+            if existing is not None:
+                print(f"[SKIP] Imagen ya existente, se reutiliza: {existing.relative_to(IMAGES_DIR)}")
+                telemetry.count("images_reused")
+                images.append(existing)
+                continue
+            stem = reservations.enter_context(reserved_image_path(target_dir, slug, stem="hero"))
+            pending.append((stem, mime, raw, info, webp_encoder.submit(raw, stem.with_suffix(".webp"))))
+
+        for stem, mime, raw, info, fut in pending:
+            try:
+                # Mide la espera por el pool: la codificación va en paralelo entre imágenes
+                with telemetry.span("encode") as span:
+                    out_path = fut.result()
+                    span["bytes_in"] = len(raw)
+            except ImportError:
+                out_path = save_inline_image(stem, mime, raw)
+            except Exception as e:
+                # Puede quedar un .webp a medio escribir: la reserva ya no está vacía
+                stem.with_suffix(".webp").unlink(missing_ok=True)
+                print(f"[WARN] Imagen inválida descartada ({stem.name}): {e}")
+                continue
+            # Verificar que la imagen se guardó correctamente
+            if out_path.exists() and out_path.stat().st_size > 1000:
+                image_dedup.register(out_path, info)
+                images.append(out_path)
+                size = out_path.stat().st_size
+                telemetry.count("bytes_written", size, kind="image")
+                print(f"[INFO] Imagen generada: {out_path.name} ({size} bytes)")
+            else:
+                print(f"[WARN] Imagen inválida generada: {out_path}")
+    return images
+
+
+def convert_to_webp(src: Path, quality: int = 85) -> Path | None:
+    """Convierte una imagen a WEBP y devuelve la ruta nueva. Si falla, devuelve None.
+    Mantiene el nombre base y cambia la extensión a .webp. Elimina el original si la conversión tiene éxito.
+    """
+    try:
+        dst = src.with_suffix(".webp")
+        # Evitar reconvertir si ya es .webp
+        if src.suffix.lower() == ".webp":
+            return src
+        webp_encoder.encode(src.read_bytes(), dst, quality=quality)
+        try:
+            src.unlink(missing_ok=True)
+        except Exception:
+            pass
+        return dst
+    except Exception as e:
+        print(f"[WARN] Conversión a WEBP falló para {src.name}: {e}")
+        return None
+
+
+def _extract_gemini_text(resp) -> str:
+    try:
+        # Muchos SDK exponen resp.text directo
+        if getattr(resp, "text", None):
+            return resp.text
+        # Alternativamente, a través de candidates/parts
+        cand = resp.candidates[0]
+        parts = getattr(cand.content, "parts", [])
+        buf = []
+        for p in parts:
+            t = getattr(p, "text", None)
+            if t:
+                buf.append(t)
+        return "".join(buf)
+    except Exception:
+        return ""
+
+
+# Algunos tenants no tienen habilitado el modelo de preview; probamos con ambos
+GEMINI_IMAGE_MODELS = [
+    "gemini-2.5-flash-image-preview",
+    "gemini-1.5-flash",
+]
+OPENAI_IMAGE_MODEL = "gpt-image-1"
+OPENAI_TEXT_MODEL = "gpt-4o-mini"
+GEMINI_TEXT_MODEL = "gemini-1.5-flash"
+# Una respuesta sin ningún encabezado en sus primeros caracteres no es un artículo
+HEADING_WITHIN_CHARS = 2000
+MIN_ARTICLE_CHARS = 200
+
+
+async def fetch_gemini_images(client, model: str, prompt: str, how_many: int = 1) -> List[Tuple[str, bytes]]:
+    """Pide imágenes a un modelo Gemini y devuelve [(mime, bytes)] sin tocar el disco."""
+    _, gem_types = gemini_sdk()
+    contents = [
+        gem_types.Content(
+            role="user",
+            parts=[gem_types.Part.from_text(text=prompt)],
+        )
+    ]
+    config = gem_types.GenerateContentConfig(response_modalities=["IMAGE", "TEXT"])
+
+    blobs: List[Tuple[str, bytes]] = []
+    stream = await client.models.generate_content_stream(model=model, contents=contents, config=config)
+    async for chunk in stream:
+        if not chunk.candidates or not chunk.candidates[0].content:
+            continue
+        for part in (chunk.candidates[0].content.parts or []):
+            inline = getattr(part, "inline_data", None)
+            if inline and getattr(inline, "data", None) and len(inline.data) > 1000:
+                blobs.append((inline.mime_type, inline.data))
+                if len(blobs) >= how_many:
+                    break
+        if len(blobs) >= how_many:
+            break
+    telemetry.count("images", len(blobs), provider="gemini", model=model)
+    return blobs
+
+
+async def fetch_openai_images(client, prompt: str, how_many: int = 1) -> List[Tuple[str, bytes]]:
+    """Pide imágenes a OpenAI y devuelve [(mime, bytes)] sin tocar el disco."""
+    n = max(1, how_many)
+    print(f"[INFO] Generando {n} imagen(es) con OpenAI...")
+    # gpt-image-1 acepta size tipo 1920x1080 para 16:9
+    res = await client.images.generate(
+        model=OPENAI_IMAGE_MODEL,
+        prompt=prompt,
+        size="1920x1080",
+        n=n,
+    )
+    blobs: List[Tuple[str, bytes]] = []
+    with telemetry.span("decode", provider="openai", model=OPENAI_IMAGE_MODEL):
+        for i, d in enumerate(res.data):
+            b64 = getattr(d, "b64_json", None)
+            if not b64:
+                print(f"[WARN] Imagen {i+1} sin datos base64")
+                continue
+            blobs.append(("image/png", base64.b64decode(b64)))
+    telemetry.count("images", len(blobs), provider="openai", model=OPENAI_IMAGE_MODEL)
+    return blobs
+
+
+async def gen_images_with_gemini(prompt: str, slug: str, how_many: int = 1,
+                                 clients: ProviderClients | None = None) -> List[Path]:
+    clients = clients or ProviderClients()
+    client = clients.gemini()
+    for m in GEMINI_IMAGE_MODELS:
+        try:
+            print(f"[INFO] Intentando con modelo: {m}")
+            blobs = await clients.governor.call(
+                "gemini", m, lambda m=m: fetch_gemini_images(client, m, prompt, how_many))
+        except Exception as e:
+            print(f"[WARN] Error con modelo {m}: {e}")
+            continue
+        images = await asyncio.to_thread(write_images, slug, blobs)
+        if images:
+            return images
+    return []
+
+
+async def gen_images_with_openai(prompt: str, slug: str, how_many: int = 1,
+                                 clients: ProviderClients | None = None) -> List[Path]:
+    if not os.environ.get("OPENAI_API_KEY") or openai_sdk() is None:
+        return []
+    try:
+        clients = clients or ProviderClients()
+        client = clients.openai()
+        blobs = await clients.governor.call(
+            "openai", OPENAI_IMAGE_MODEL, lambda: fetch_openai_images(client, prompt, how_many))
+        return await asyncio.to_thread(write_images, slug, blobs)
+    except Exception as e:
+        print(f"[WARN] OpenAI imágenes falló: {e}")
+        return []
+
+
+def mdx_frontmatter(**kwargs) -> Dict:
+    return {k: v for k, v in kwargs.items() if v is not None}
+
+
+def openai_text_messages(topic: str, category: str | None) -> List[Dict]:
+    system = (
+        "Eres un redactor técnico senior. Escribe artículos con estructura SEO,"
+        " tono claro, E-E-A-T, listas, subtítulos H2/H3, y ejemplos prácticos."
+        " Salida en Markdown puro, sin frontmatter. No inventes datos sensibles."
+    )
+
+    user = (
+        f"Tema: {topic}. Categoría sugerida: {category or 'General'}."
+        " Público objetivo: empresas y ayuntamientos en Burgos."
+        " Incluye una introducción breve, 4-6 secciones con H2, y un cierre con CTA suave."
+    )
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
+
+
+def gemini_text_prompt(topic: str, category: str | None) -> str:
+    return (
+        "Eres redactor técnico senior. Escribe en Markdown un artículo optimizado para SEO,"
+        " con H2/H3, listas y tono profesional. No añadas frontmatter.\n\n"
+        f"Tema: {topic}. Categoría sugerida: {category or 'General'}."
+    )
+
+
+class MalformedText(RuntimeError):
+    """La respuesta del proveedor no es un artículo (vacía o sin estructura Markdown)."""
+
+
+class StreamedText(tuple):
+    """(título, cuerpo) con ``spool``: el temporal en el que se fue escribiendo el cuerpo."""
+
+    spool: Path | None
+
+    def __new__(cls, title: str, body: str, spool: Path | None = None):
+        obj = super().__new__(cls, (title, body))
+        obj.spool = spool
+        return obj
+
+
+def _spool_pattern(slug: str) -> str:
+    return f".{slug}.*.part"
+
+
+class TextStream:
+    """Texto de un proveedor recibido por fragmentos (deltas).
+
+    Cada fragmento se escribe en cuanto llega en un temporal de SPOOL_DIR
+    (``.<slug>.*.part``), del que luego se copia el cuerpo al .mdx. El título
+    se toma de la primera línea "# " en cuanto se completa, y la respuesta se
+    corta con MalformedText si pasan HEADING_WITHIN_CHARS caracteres sin ningún
+    encabezado Markdown (no es un artículo: negativa, texto plano...), en vez de
+    esperar al final; ``race`` pasa entonces al siguiente proveedor.
+    """
+
+    def __init__(self, topic: str, provider: str, model: str):
+        self.topic = topic
+        self.labels = {"provider": provider, "model": model}
+        self.title: str | None = None
+        self._parts: List[str] = []
+        self._size = 0
+        self._line = ""
+        self._has_heading = False
+        self._first_at: float | None = None
+        self._start = time.perf_counter()
+        SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f".{canonical_slug(topic)}.", suffix=".part", dir=SPOOL_DIR)
+        self.spool = Path(tmp)
+        self._fh = os.fdopen(fd, "w", encoding="utf-8")
+
+    def feed(self, delta: str | None) -> None:
+        if not delta:
+            return
+        if self._first_at is None:
+            self._first_at = time.perf_counter()
+            telemetry.observe("text_first_token", self._first_at - self._start, **self.labels)
+        self._fh.write(delta)
+        self._parts.append(delta)
+        self._size += len(delta)
+        if self.title is None:
+            *lines, self._line = (self._line + delta).split("\n")
+            for line in lines:
+                self._scan(line)
+        if not self._has_heading and self._size > HEADING_WITHIN_CHARS:
+            raise MalformedText(f"{self._size} caracteres sin encabezados Markdown")
+
+    def _scan(self, line: str) -> None:
+        line = line.strip()
+        if line.startswith("#"):
+            self._has_heading = True
+        if line.startswith("# "):
+            self.title = line.lstrip("# ").strip()
+            telemetry.observe("text_title", time.perf_counter() - self._start, **self.labels)
+            print(f"[INFO] Título recibido ({self.labels['provider']}): {self.title}")
+
+    def close(self) -> StreamedText:
+        """Cierra el temporal y valida el texto completo; lanza MalformedText si no sirve."""
+        if self.title is None and self._line:
+            self._scan(self._line)
+        self._fh.close()
+        text = "".join(self._parts)
+        if not text.strip():
+            raise MalformedText("texto vacío")
+        if not self._has_heading:
+            raise MalformedText("el texto no tiene encabezados Markdown")
+        if len(text.strip()) < MIN_ARTICLE_CHARS:
+            raise MalformedText(f"texto demasiado corto ({len(text.strip())} caracteres)")
+        return StreamedText(self.title or self.topic, text, self.spool)
+
+    def discard(self) -> None:
+        self._fh.close()
+        self.spool.unlink(missing_ok=True)
+
+
+async def gen_article_with_openai(topic: str, category: str | None,
+                                  clients: ProviderClients | None = None) -> Tuple[str, str]:
+    """Devuelve (title, mdx_body) sin frontmatter."""
+    clients = clients or ProviderClients()
+    client = clients.openai()
+    text = TextStream(topic, "openai", OPENAI_TEXT_MODEL)
+    try:
+        request = {"model": OPENAI_TEXT_MODEL, "messages": openai_text_messages(topic, category),
+                   "temperature": 0.7}
+        if clients.stream:
+            usage = None
+            chunks = await client.chat.completions.create(
+                **request, stream=True, stream_options={"include_usage": True})
+            # Al salir del bloque (también si se corta por MalformedText) se cierra la conexión
+            async with chunks:
+                async for chunk in chunks:
+                    if chunk.choices:
+                        text.feed(chunk.choices[0].delta.content)
+                    usage = chunk.usage or usage
+        else:
+            completion = await client.chat.completions.create(**request)
+            text.feed(completion.choices[0].message.content)
+            usage = getattr(completion, "usage", None)
+        result = text.close()
+    except BaseException:
+        text.discard()
+        raise
+    if usage is not None:
+        telemetry.count("tokens", usage.prompt_tokens or 0, provider="openai", model=OPENAI_TEXT_MODEL, kind="input")
+        telemetry.count("tokens", usage.completion_tokens or 0, provider="openai", model=OPENAI_TEXT_MODEL,
+                        kind="output")
+    return result
+
+
+async def gen_article_with_gemini(topic: str, category: str | None,
+                                  clients: ProviderClients | None = None) -> Tuple[str, str]:
+    clients = clients or ProviderClients()
+    client = clients.gemini()
+    model = GEMINI_TEXT_MODEL
+    _, gem_types = gemini_sdk()
+    contents = [
+        gem_types.Content(
+            role="user",
+            parts=[gem_types.Part.from_text(text=gemini_text_prompt(topic, category))],
+        )
+    ]
+    config = gem_types.GenerateContentConfig(response_modalities=["TEXT"])
+    text = TextStream(topic, "gemini", model)
+    try:
+        if clients.stream:
+            usage = None
+            stream = await client.models.generate_content_stream(model=model, contents=contents, config=config)
+            try:
+                async for chunk in stream:
+                    text.feed(_extract_gemini_text(chunk))
+                    usage = getattr(chunk, "usage_metadata", None) or usage
+            finally:
+                await stream.aclose()
+        else:
+            resp = await client.models.generate_content(model=model, contents=contents, config=config)
+            text.feed(_extract_gemini_text(resp))
+            usage = getattr(resp, "usage_metadata", None)
+        result = text.close()
+    except BaseException:
+        text.discard()
+        raise
+    if usage is not None:
+        telemetry.count("tokens", usage.prompt_token_count or 0, provider="gemini", model=model, kind="input")
+        telemetry.count("tokens", usage.candidates_token_count or 0, provider="gemini", model=model, kind="output")
+    return result
+
+
+def build_image_prompt(topic: str, style: str, accent: str, details: str) -> str:
+    return (
+        f"Genera una ilustración/fotografía digital para un artículo web sobre {topic}.\n"
+        f"- Estilo: {style}\n"
+        "- Formato: 16:9, pensado para encabezado de blog\n"
+        "- Fondo: limpio, profesional, sin texto ni marcas de agua\n"
+        f"- Paleta: colores neutros con acento en {accent}\n"
+        f"- Elementos clave: {details or 'elementos del tema de forma clara y profesional'}\n"
+        "- Uso final: imagen hero para web, debe ser clara y atractiva"
+    )
+
+
+def _provider_client(clients: ProviderClients, provider: str):
+    """Cliente del proveedor o None si no está configurado (sin clave/SDK)."""
+    try:
+        return getattr(clients, provider)()
+    except RuntimeError as e:
+        print(f"[WARN] {provider} no disponible: {e}")
+        return None
+
+
+def _governed_attempt(clients: ProviderClients, policy: HedgePolicy, provider: str, model: str, factory):
+    """Intento para ``race`` regulado por el governor; None si el carril está en pausa."""
+    if not clients.governor.available(provider, model):
+        print(f"[SKIP] {provider}:{model} en pausa tras fallos recientes")
+        return None
+    return (provider, f"{provider}:{model}",
+            clients.governor.wrap(provider, model, factory, timeout=policy.timeouts.get(provider)))
+
+
+def _cached_attempt(cache: ResponseCache, key: str, kind: str, factory):
+    """Envuelve un intento para guardar su resultado en la caché al completarse.
+
+    La escritura (y la expulsión que pueda disparar) va en un hilo para no
+    bloquear el event loop que comparten todos los temas del lote.
+    """
+    async def run():
+        result = await factory()
+        if result:
+            if kind == "text":
+                await asyncio.to_thread(cache.put_text, key, *result)
+            else:
+                await asyncio.to_thread(cache.put_images, key, result)
+        return result
+    return run
+
+
+async def generate_text(topic: str, category: str | None, clients: ProviderClients,
+                        policy: HedgePolicy | None = None,
+                        cache: ResponseCache | None = None) -> Tuple[str, str] | None:
+    """Texto del artículo: OpenAI y Gemini con cobertura. None si ambos fallan."""
+    policy = policy or HedgePolicy()
+    candidates = [
+        ("openai", OPENAI_TEXT_MODEL, openai_text_messages(topic, category), {"temperature": 0.7},
+         lambda: gen_article_with_openai(topic, category, clients)),
+        ("gemini", GEMINI_TEXT_MODEL, gemini_text_prompt(topic, category), {},
+         lambda: gen_article_with_gemini(topic, category, clients)),
+    ]
+    attempts = []
+    for provider, model, prompt, params, factory in candidates:
+        if cache is not None:
+            key = cache_key(provider, model, prompt, **params)
+            hit = await asyncio.to_thread(cache.get_text, key)
+            if hit and hit[1].strip():
+                print(f"[INFO] Texto servido desde caché ({provider}:{model})")
+                telemetry.count("cache_hits", stage="text", provider=provider, model=model)
+                return hit
+            factory = _cached_attempt(cache, key, "text", factory)
+        if _provider_client(clients, provider) is not None:
+            attempts.append(_governed_attempt(clients, policy, provider, model, factory))
+    try:
+        # El governor aplica el timeout a cada intento y reintenta; race no pone otro encima
+        return await race([a for a in attempts if a], hedge_after=policy.text_after,
+                          is_valid=lambda r: bool(r and r[1].strip()))
+    except Exception as e:
+        print(f"[WARN] Generación de texto falló: {e}. Uso plantilla local.")
+        return None
+
+
+def template_article(topic: str) -> Tuple[str, str]:
+    """Plantilla local cuando ningún proveedor devuelve texto."""
+    body_md = (
+        f"# {topic}\n\n"
+        "## Introducción\n\nResumen del tema con enfoque práctico y profesional.\n\n"
+        "## Puntos clave\n\n- Requisito 1\n- Requisito 2\n- Requisito 3\n\n"
+        "## Implantación\n\nPasos recomendados.\n\n"
+        "## Mantenimiento\n\nBuenas prácticas y periodicidad.\n\n"
+        "## Conclusión\n\nCTA suave orientado a contacto profesional.\n"
+    )
+    return topic, body_md
+
+
+async def generate_images(prompt: str, slug: str, how_many: int, clients: ProviderClients,
+                          policy: HedgePolicy | None = None,
+                          cache: ResponseCache | None = None) -> List[Path]:
+    """Imágenes con cobertura Gemini (modelos en orden) -> OpenAI, escritas en disco.
+
+    Los intentos no escriben en disco: solo se guardan las imágenes del ganador.
+    """
+    policy = policy or HedgePolicy()
+    how_many = max(1, how_many)
+    gemini = _provider_client(clients, "gemini")
+    openai_client = _provider_client(clients, "openai")
+    candidates = [
+        ("gemini", m, {"n": how_many}, gemini,
+         lambda m=m: fetch_gemini_images(gemini, m, prompt, how_many))
+        for m in GEMINI_IMAGE_MODELS
+    ]
+    candidates.append(("openai", OPENAI_IMAGE_MODEL, {"n": how_many, "size": "1920x1080"}, openai_client,
+                       lambda: fetch_openai_images(openai_client, prompt, how_many)))
+
+    blobs = None
+    attempts = []
+    for provider, model, params, client, factory in candidates:
+        if cache is not None:
+            key = cache_key(provider, model, prompt, **params)
+            blobs = await asyncio.to_thread(cache.get_images, key)
+            if blobs:
+                print(f"[INFO] Imágenes servidas desde caché ({provider}:{model})")
+                telemetry.count("cache_hits", stage="images", provider=provider, model=model)
+                break
+            factory = _cached_attempt(cache, key, "images", factory)
+        if client is not None:
+            attempts.append(_governed_attempt(clients, policy, provider, model, factory))
+    if not blobs:
+        try:
+            blobs = await race([a for a in attempts if a], hedge_after=policy.images_after)
+        except Exception as e:
+            print(f"[WARN] Generación de imágenes falló: {e}")
+            return []
+    return await asyncio.to_thread(write_images, slug, blobs)
+
+
+async def _in_span(stage: str, coro):
+    with telemetry.span(stage):
+        return await coro
+
+
+def _journal_paths(progress: TopicProgress | None, stage: str) -> List[Path] | None:
+    """Rutas registradas en el diario para una etapa, si siguen existiendo en disco."""
+    done = progress.get(stage) if progress else None
+    if not done:
+        return None
+    paths = [ROOT / p for p in done.get("paths", [])]
+    if paths and all(p.exists() for p in paths):
+        return paths
+    return None
+
+
+async def _text_stage(topic: str, category: str | None, clients: ProviderClients,
+                      policy: HedgePolicy | None, cache: ResponseCache | None,
+                      progress: TopicProgress | None) -> Tuple[str, str]:
+    done = progress.get("text") if progress else None
+    if done and done.get("body"):
+        print(f"[INFO] Texto recuperado del diario: {topic}")
+        return done.get("title") or topic, done["body"]
+    result = await generate_text(topic, category, clients, policy, cache)
+    if result is None:
+        return template_article(topic)
+    if progress:
+        progress.mark("text", title=result[0], body=result[1])
+    return result
+
+
+async def _images_stage(prompt: str, slug: str, how_many: int, clients: ProviderClients,
+                        policy: HedgePolicy | None, cache: ResponseCache | None,
+                        progress: TopicProgress | None) -> List[Path]:
+    webp = _journal_paths(progress, "webp")
+    if webp:
+        print(f"[INFO] Imágenes WEBP recuperadas del diario: {slug}")
+        return webp
+
+    images = _journal_paths(progress, "images")
+    if images:
+        print(f"[INFO] Imágenes recuperadas del diario: {slug}")
+    else:
+        images = await generate_images(prompt, slug, how_many, clients, policy, cache)
+        if images and progress:
+            progress.mark("images", paths=[str(p.relative_to(ROOT)) for p in images])
+
+    # Las imágenes nuevas ya llegan en WEBP; esto solo convierte restos de diarios antiguos
+    out_images: List[Path] = []
+    for p in images:
+        wp = await asyncio.to_thread(convert_to_webp, p)
+        out_images.append(wp or p)
+    if out_images and progress:
+        progress.mark("webp", paths=[str(p.relative_to(ROOT)) for p in out_images])
+    return out_images
+
+
+async def generate_post(topic: str, style: str = "fotográfico", accent: str = "azul", details: str = "",
+                        category: str | None = None, how_many: int = 1,
+                        clients: ProviderClients | None = None,
+                        policy: HedgePolicy | None = None,
+                        cache: ResponseCache | None = None,
+                        progress: TopicProgress | None = None) -> Path:
+    """Genera un artículo completo (texto + imágenes + MDX) y devuelve la ruta del .mdx.
+
+    El texto y las imágenes son independientes, así que se piden en paralelo
+    (la imagen parte del tema, no espera al título). Con ``progress`` cada etapa
+    terminada se registra en el diario del lote y las ya registradas se
+    reutilizan en lugar de volver a generarse.
+    """
+    clients = clients or ProviderClients()
+    topic = topic.strip()
+    slug = canonical_slug(topic)
+
+    with telemetry.article(topic, slug):
+        try:
+            return await _build_post(topic, slug, style, accent, details, category, how_many,
+                                     clients, policy, cache, progress)
+        finally:
+            # Temporales del streaming que no llegaron a usarse (intentos perdedores o cortados)
+            for spool in SPOOL_DIR.glob(_spool_pattern(slug)):
+                spool.unlink(missing_ok=True)
+
+
+async def _build_post(topic: str, slug: str, style: str, accent: str, details: str, category: str | None,
+                      how_many: int, clients: ProviderClients, policy: HedgePolicy | None,
+                      cache: ResponseCache | None, progress: TopicProgress | None) -> Path:
+    """Cuerpo de ``generate_post``, ya dentro de la medición del artículo."""
+    today = dt.date.today().isoformat()
+    prompt = build_image_prompt(topic, style, accent, details)
+    text, images = await asyncio.gather(
+        _in_span("text", _text_stage(topic, category, clients, policy, cache, progress)),
+        _in_span("images", _images_stage(prompt, slug, how_many, clients, policy, cache, progress)),
+    )
+    title, body_md = text
+    # Sin texto en el diario tras la etapa = plantilla local (fallaron todos los proveedores)
+    fallbacks = ["text"] if progress and not progress.get("text") else []
+
+    # Generar ruta de imagen para el frontmatter
+    image_path = None
+    if images:
+        # Usar la primera imagen válida
+        first_image = images[0]
+        if first_image.exists() and first_image.stat().st_size > 1000:
+            # Puede ser una imagen reutilizada de otro artículo
+            from image_dedup import public_url
+            image_path = public_url(first_image)
+            print(f"✅ Imagen principal: {image_path}")
+        else:
+            print(f"⚠️  Imagen principal inválida: {first_image}")
+
+    if not image_path:
+        fallbacks.append("image")
+        print("⚠️  No se pudo generar una imagen válida")
+        print("🖼️  Generando imagen de placeholder...")
+        try:
+            # El nombre se reserva aquí: el placeholder puede dibujarse en otro proceso
+            with reserved_image_path(IMAGES_DIR / slug, slug, stem="hero") as stem:
+                from generate_placeholder_image import create_placeholder_image
+                with telemetry.span("placeholder"):
+                    placeholder_path = await asyncio.wrap_future(
+                        webp_encoder.run(create_placeholder_image, slug, topic, style, accent,
+                                         stem.with_suffix(".webp")))
+                if not placeholder_path.exists() or placeholder_path.stat().st_size <= 1000:
+                    raise ValueError(f"imagen inválida {placeholder_path.name}")
+            telemetry.count("bytes_written", placeholder_path.stat().st_size, kind="placeholder")
+            image_path = f"/images/blog/{slug}/{placeholder_path.name}"
+            print(f"✅ Imagen de placeholder generada: {image_path}")
+        except Exception as e:
+            print(f"❌ Error generando placeholder: {e}")
+
+    # 3) Crear MDX con frontmatter + cuerpo
+    post_path = CONTENT_DIR / f"{slug}.mdx"
+    fm = mdx_frontmatter(
+        title=title,
+        description=f"{title} — artículo técnico",  # se puede editar
+        date=today,
+        slug=slug,
+        category=category or "General",
+        image=image_path,
+    )
+    spool = getattr(text, "spool", None)
+    with telemetry.span("mdx"):
+        post_path.parent.mkdir(parents=True, exist_ok=True)
+        if spool is not None and spool.exists():
+            # El cuerpo ya se escribió en disco durante el streaming: se copia tras la cabecera
+            frontmatter.write_from(post_path, fm, spool, separator="\n")
+        else:
+            frontmatter.write(post_path, fm, "\n" + body_md)
+    telemetry.count("bytes_written", post_path.stat().st_size, kind="mdx")
+    print(f"Artículo guardado en: {post_path}")
+    if progress:
+        if fallbacks:
+            # Queda registrado, pero el lote lo volverá a intentar en la siguiente ejecución
+            labels = {"text": "texto de plantilla", "image": "imagen placeholder"}
+            print(f"[WARN] {slug}: guardado con {' e '.join(labels[f] for f in fallbacks)}; "
+                  "se reintentará en la próxima ejecución del lote")
+        progress.mark("mdx", path=str(post_path.relative_to(ROOT)), fallback=fallbacks)
+    if images:
+        print("Imágenes:")
+        for p in images:
+            print(" -", p)
+    return post_path
+
+
+def load_topics(path: Path) -> List[Dict]:
+    """Lee el YAML de tópicos (lista de dicts con topic/style/accent/details/category)."""
+    data = frontmatter.safe_load(Path(path).read_text(encoding="utf-8")) or []
+    return [item for item in data if isinstance(item, dict) and (item.get("topic") or "").strip()]
+
+
+def _post_key(topic: str) -> str:
+    # Misma clave que el índice de contenido: ruta del .mdx relativa a la raíz
+    return (CONTENT_DIR / f"{canonical_slug(topic.strip())}.mdx").relative_to(ROOT).as_posix()
+
+
+def find_duplicate(dupes: DuplicateIndex, topic: str, threshold: float = 0.5) -> Tuple[str, float] | None:
+    """Post existente (o tema ya aceptado en el lote) casi igual a ``topic``.
+
+    Se ignora el propio post del tema (mismo slug, aunque el fichero se llame
+    distinto), que simplemente se reescribe: regenerar un tema no es duplicarlo.
+    """
+    own = dupes.keys_for_slug(canonical_slug(topic.strip()))
+    matches = dupes.similar_to_topic(topic, threshold, exclude=[_post_key(topic), *own])
+    return matches[0] if matches else None
+
+
+def check_duplicate(dupes: DuplicateIndex | None, topic: str, on_duplicate: str = "skip",
+                    threshold: float = 0.5) -> bool:
+    """Consulta el índice de casi duplicados antes de gastar llamadas a la API.
+
+    Devuelve False si el tema debe saltarse. Los temas aceptados se registran en
+    el índice para detectar también duplicados dentro del mismo lote.
+    """
+    if dupes is None or on_duplicate == "off":
+        return True
+    match = find_duplicate(dupes, topic, threshold)
+    if match:
+        key, score = match
+        print(f"[DUP] {topic} ~ {key} ({score:.2f})")
+        if on_duplicate == "skip":
+            return False
+    dupes.add_topic(_post_key(topic), topic)
+    return True
+
+
+async def run_batch(path: Path, workers: int = 4, how_many: int = 1,
+                    policy: HedgePolicy | None = None, cache: ResponseCache | None = None,
+                    journal: BatchJournal | None = None,
+                    dupes: DuplicateIndex | None = None, on_duplicate: str = "skip",
+                    dup_threshold: float = 0.5, governor: ProviderGovernor | None = None,
+                    stream: bool = True) -> int:
+    """Genera todos los tópicos de un YAML en este mismo proceso.
+
+    Reutiliza un cliente por proveedor y procesa hasta ``workers`` temas a la vez
+    sobre un único event loop. Con ``journal`` se saltan los temas ya completados
+    y se retoman los parciales; con ``dupes``, los que casi duplican un post
+    existente. Todos los temas comparten ``governor``; ``stream=False`` pide el
+    texto en una sola respuesta. Devuelve el número de temas que fallaron.
+    """
+    topics = load_topics(path)
+    clients = ProviderClients(governor, stream=stream)
+    sem = asyncio.Semaphore(max(1, workers))
+    print(f"[INFO] Lote: {len(topics)} tema(s) desde {path} con {workers} worker(s)")
+
+    async def one(item: Dict) -> bool:
+        topic = item["topic"]
+        progress = journal.topic({**item, "images": how_many}) if journal else None
+        done = progress.get("mdx") if progress else None
+        # Los temas guardados con plantilla o placeholder (p. ej. durante una caída) no cuentan
+        if done and not done.get("fallback") and (ROOT / done["path"]).exists():
+            print(f"[SKIP] {topic} (completado en una ejecución anterior)")
+            return True
+        if not check_duplicate(dupes, topic, on_duplicate, dup_threshold):
+            return True
+        async with sem:
+            try:
+                post_path = await generate_post(
+                    topic,
+                    style=item.get("style") or "fotográfico",
+                    accent=item.get("accent") or "azul",
+                    details=item.get("details") or "",
+                    category=item.get("category"),
+                    how_many=how_many,
+                    clients=clients,
+                    policy=policy,
+                    cache=cache,
+                    progress=progress,
+                )
+            except Exception as e:
+                print(f"[ERROR] {topic}: {e}")
+                return False
+        print(f"[OK] {topic} -> {post_path.name}")
+        return True
+
+    try:
+        results = await asyncio.gather(*(one(item) for item in topics))
+    finally:
+        await clients.aclose()
+    failed = results.count(False)
+    print(f"Hecho. Temas generados: {len(topics) - failed}/{len(topics)}")
+    return failed
+
+
+async def _generate_single(args, policy: HedgePolicy, cache: ResponseCache | None,
+                           dupes: DuplicateIndex | None = None,
+                           governor: ProviderGovernor | None = None,
+                           on_duplicate: str = "warn") -> Path | None:
+    if not check_duplicate(dupes, args.topic, on_duplicate, args.dup_threshold):
+        return None
+    clients = ProviderClients(governor, stream=not args.no_stream)
+    try:
+        return await generate_post(
+            args.topic,
+            style=args.style,
+            accent=args.accent,
+            details=args.details,
+            category=args.category,
+            how_many=args.images,
+            clients=clients,
+            policy=policy,
+            cache=cache,
+        )
+    finally:
+        await clients.aclose()
+
+
+def providers_configured() -> bool:
+    """True si hay clave de al menos un proveedor (OpenAI o Gemini) en el entorno."""
+    return bool(os.environ.get("OPENAI_API_KEY") or os.environ.get("GEMINI_API_KEY"))
+
+
+def run(args) -> None:
+    """Ejecuta el pipeline con las opciones ya leídas por generate_article.py."""
+    from provider_governor import ProviderGovernor
+
+    policy = HedgePolicy(
+        text_after=args.hedge_text_after if args.hedge_text_after >= 0 else None,
+        images_after=args.hedge_images_after if args.hedge_images_after >= 0 else None,
+        timeouts={"openai": args.timeout_openai, "gemini": args.timeout_gemini},
+    )
+    # Sin claves solo sale texto de plantilla y un placeholder: no hay llamadas que
+    # ahorrar con los índices de duplicados ni imágenes que repartir en un pool
+    online = providers_configured()
+    if not online:
+        print("[INFO] Sin OPENAI_API_KEY ni GEMINI_API_KEY: plantilla y placeholder, "
+              "sin comprobar duplicados")
+    webp_encoder.configure(workers=args.encode_workers if online else 0, method=args.webp_method)
+    if online or args.no_image_dedup:
+        # Sin claves solo llegan imágenes de la caché: si hay alguna, el índice se abre entonces
+        import image_dedup
+        image_dedup.configure(enabled=not args.no_image_dedup)
+    telemetry.configure(None if args.no_metrics else args.metrics_dir or telemetry.DEFAULT_DIR,
+                        run="generate_article")
+    cache = None if args.no_cache else ResponseCache(
+        args.cache_dir or DEFAULT_CACHE_DIR,
+        max_bytes=args.cache_max_mb * 1024 * 1024,
+        ttl=args.cache_ttl_days * 24 * 3600,
+    )
+
+    # Un tema pedido a mano se genera aunque se parezca a otro (solo avisa); en lote se salta
+    on_duplicate = args.on_duplicate or ("skip" if args.batch else "warn")
+    dupes = None
+    if online and on_duplicate != "off":
+        from near_duplicates import DuplicateIndex
+        dupes = DuplicateIndex.load()
+    governor = ProviderGovernor(max_retries=args.max_retries, threshold=args.breaker_failures,
+                                cooldown=args.breaker_cooldown)
+
+    try:
+        if args.batch:
+            journal = BatchJournal(args.journal) if args.journal else BatchJournal.for_topics_file(args.batch)
+            if args.fresh:
+                journal.reset()
+            failed = asyncio.run(run_batch(args.batch, workers=args.workers, how_many=args.images,
+                                           policy=policy, cache=cache, journal=journal, dupes=dupes,
+                                           on_duplicate=on_duplicate, dup_threshold=args.dup_threshold,
+                                           governor=governor, stream=not args.no_stream))
+            raise SystemExit(1 if failed else 0)
+
+        post = asyncio.run(_generate_single(args, policy, cache, dupes, governor, on_duplicate))
+        if post is None:
+            print(f"[SKIP] No se ha generado '{args.topic}': casi duplica un post existente "
+                  "(usa --on-duplicate warn para generarlo igualmente)")
+            raise SystemExit(1)
+    finally:
+        webp_encoder.shutdown()
+        prom = telemetry.finish()
+        if prom:
+            print(f"[INFO] Métricas: {telemetry.get().jsonl_path} y {prom}")
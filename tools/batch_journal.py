@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Diario (journal) de progreso por tema para la generación en lote.
+
+Cada etapa completada de un tema se añade como una línea JSON al fichero del
+diario (append + fsync), de modo que si el proceso muere a mitad de lote, al
+relanzarlo se saltan los temas terminados y se retoman los parciales:
+
+  text    -> título y cuerpo ya generados
+  images  -> imágenes originales escritas en disco
+  webp    -> imágenes convertidas a WEBP
+  mdx     -> artículo escrito; completo salvo que lleve ``fallback`` (texto de
+             plantilla o imagen placeholder), en cuyo caso se regenera
+
+El identificador de cada tema es un hash de sus parámetros (topic, style,
+accent, details, category, imágenes), así que editar un tema en topics.yml
+invalida su progreso previo.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict
+
+ROOT = Path(__file__).resolve().parents[1]
+JOURNAL_DIR = ROOT / ".cache" / "journal"
+
+STAGES = ("text", "images", "webp", "mdx")
+
+
+def topic_key(spec: Dict) -> str:
+    fields = {k: spec.get(k) for k in ("topic", "style", "accent", "details", "category", "images")}
+    payload = json.dumps(fields, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class TopicProgress:
+    """Vista del progreso de un tema; ``mark`` persiste la etapa en el diario."""
+
+    def __init__(self, journal: "BatchJournal", key: str, stages: Dict[str, Dict]):
+        self.journal = journal
+        self.key = key
+        self.stages = stages
+
+    def get(self, stage: str) -> Dict | None:
+        return self.stages.get(stage)
+
+    def mark(self, stage: str, **data) -> None:
+        self.stages[stage] = data
+        self.journal.record(self.key, stage, data)
+
+
+class BatchJournal:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._topics: Dict[str, Dict[str, Dict]] = {}
+        self._load()
+
+    @classmethod
+    def for_topics_file(cls, topics_path: Path) -> "BatchJournal":
+        return cls(JOURNAL_DIR / f"{Path(topics_path).stem}.jsonl")
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Última línea truncada por un corte: se ignora
+                    continue
+                if entry.get("stage") in STAGES:
+                    self._topics.setdefault(entry["key"], {})[entry["stage"]] = entry.get("data") or {}
+
+    def topic(self, spec: Dict) -> TopicProgress:
+        key = topic_key(spec)
+        return TopicProgress(self, key, self._topics.setdefault(key, {}))
+
+    def record(self, key: str, stage: str, data: Dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps({"key": key, "stage": stage, "data": data}, ensure_ascii=False)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def reset(self) -> None:
+        self._topics.clear()
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Banco de pruebas de rendimiento del pipeline, sin red ni claves reales.
+
+Arranca los servidores simulados de tools/stub_servers.py (OpenAI, Gemini y
+Commons, con latencia, errores y tamaños configurables), prepara un árbol de
+trabajo temporal con una copia de tools/ y ejecuta contra ellos:
+
+  - generate_article.py --batch con ``--articles`` temas
+  - fill_images_commons.py sobre ``--articles`` artículos sin imagen
+
+De cada herramienta informa artículos/minuto (reloj de pared del proceso
+completo), latencia por artículo p50/p95 (de las métricas de tools/telemetry.py)
+y RSS máximo del proceso. Cada resultado se añade a
+.cache/bench/history.jsonl y se compara con la última ejecución con la misma
+configuración para detectar regresiones.
+
+Uso:
+  python tools/benchmark.py                       # 20 artículos, 4 workers
+  python tools/benchmark.py --articles 50 --workers 8 --latency 1.0
+  python tools/benchmark.py --only commons --error-rate 0.1 --error-status 429
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import yaml
+
+import frontmatter
+from stub_servers import StubServers, add_config_arguments, config_from_args
+from telemetry import quantile
+
+ROOT = Path(__file__).resolve().parents[1]
+TOOLS_DIR = ROOT / "tools"
+HISTORY = ROOT / ".cache" / "bench" / "history.jsonl"
+TOOLS = ("generate", "commons")
+CATEGORIES = ("Seguridad", "Informática", "Sonido", "Electricidad")
+SUBJECTS = ("cámaras IP", "control de accesos", "cableado estructurado", "megafonía", "cuadro eléctrico",
+            "red wifi", "videoportero", "sistema de alarma", "iluminación LED", "rack de servidores")
+PLACES = ("un comercio", "una nave industrial", "una comunidad de vecinos", "un restaurante",
+          "una oficina", "un colegio", "un hotel", "un gimnasio")
+
+
+def topics(n: int) -> List[Dict]:
+    """Temas distintos entre sí (el índice de duplicados se desactiva igualmente)."""
+    out = []
+    for i in range(n):
+        subject = SUBJECTS[i % len(SUBJECTS)]
+        place = PLACES[(i // len(SUBJECTS)) % len(PLACES)]
+        out.append({"topic": f"Instalación de {subject} en {place} {i + 1}",
+                    "category": CATEGORIES[i % len(CATEGORIES)]})
+    return out
+
+
+def make_workspace() -> Path:
+    """Árbol temporal con la misma estructura que el repositorio y una copia de tools/."""
+    ws = Path(tempfile.mkdtemp(prefix="genart-bench-"))
+    (ws / "tools").mkdir()
+    for src in TOOLS_DIR.glob("*.py"):
+        shutil.copy2(src, ws / "tools" / src.name)
+    (ws / "content" / "blog").mkdir(parents=True)
+    (ws / "public" / "images" / "blog").mkdir(parents=True)
+    return ws
+
+
+def run_tool(cmd: List[str], cwd: Path, env: Dict[str, str], log: Path, timeout: float) -> Dict:
+    """Ejecuta ``cmd`` y devuelve su duración, código de salida y RSS máximo (MB).
+
+    ``os.wait4`` da el uso de recursos de ese hijo concreto (incluidos los
+    procesos de codificación que él mismo recoge), no el acumulado de la sesión.
+    """
+    with open(log, "w", encoding="utf-8") as out:
+        start = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=out, stderr=subprocess.STDOUT)
+        killer = threading.Timer(timeout, proc.kill)
+        killer.start()
+        try:
+            _, status, usage = os.wait4(proc.pid, 0)
+        finally:
+            killer.cancel()
+        elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    rss = usage.ru_maxrss / (1024 * 1024) if sys.platform == "darwin" else usage.ru_maxrss / 1024
+    return {"seconds": elapsed, "returncode": proc.returncode, "peak_rss_mb": rss}
+
+
+def article_events(path: Path) -> List[Dict]:
+    if not path.exists():
+        return []
+    events = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if event.get("type") == "article":
+            events.append(event)
+    return events
+
+
+def bench_generate(ws: Path, env: Dict[str, str], args) -> Dict:
+    topics_file = ws / "topics.yml"
+    topics_file.write_text(yaml.safe_dump(topics(args.articles), allow_unicode=True), encoding="utf-8")
+    cmd = [sys.executable, "tools/generate_article.py", "--batch", str(topics_file),
+           "--workers", str(args.workers), "--images", "1", "--no-cache", "--fresh",
+           "--on-duplicate", "off", "--journal", str(ws / ".cache" / "journal.jsonl"),
+           "--metrics-dir", str(ws / ".cache" / "metrics")]
+    cmd += common_args(args)
+    result = run_tool(cmd, ws, env, ws / "generate_article.log", args.timeout)
+    events = article_events(ws / ".cache" / "metrics" / "generate_article.jsonl")
+    return summarize(result, events, [e for e in events if e.get("status") == "ok"])
+
+
+def bench_commons(ws: Path, env: Dict[str, str], args) -> Dict:
+    for i, item in enumerate(topics(args.articles)):
+        slug = f"bench-{i + 1:04d}"
+        frontmatter.write(ws / "content" / "blog" / f"{slug}.mdx",
+                          {"title": item["topic"], "slug": slug, "category": item["category"]},
+                          f"\n# {item['topic']}\n\nTexto de prueba.\n")
+    cmd = [sys.executable, "tools/fill_images_commons.py", "--workers", str(args.workers),
+           "--rps", "0", "--no-cache", "--metrics-dir", str(ws / ".cache" / "metrics")]
+    cmd += common_args(args)
+    result = run_tool(cmd, ws, env, ws / "fill_images_commons.log", args.timeout)
+    events = article_events(ws / ".cache" / "metrics" / "fill_images_commons.jsonl")
+    return summarize(result, events, [e for e in events if e.get("status") == "ok" and e.get("images")])
+
+
+def common_args(args) -> List[str]:
+    extra = []
+    if args.encode_workers is not None:
+        extra += ["--encode-workers", str(args.encode_workers)]
+    return extra
+
+
+def summarize(result: Dict, events: List[Dict], ok: List[Dict]) -> Dict:
+    latencies = [e["seconds"] for e in ok]
+    return {
+        **result,
+        "articles": len(events),
+        "ok": len(ok),
+        "articles_per_min": len(ok) / result["seconds"] * 60 if result["seconds"] else 0.0,
+        "p50": quantile(latencies, 0.5),
+        "p95": quantile(latencies, 0.95),
+    }
+
+
+def config_key(args, tool: str) -> Dict:
+    return {"tool": tool, "articles": args.articles, "workers": args.workers, "latency": args.latency,
+            "jitter": args.jitter, "error_rate": args.error_rate, "error_status": args.error_status,
+            "text_words": args.text_words, "image_size": list(args.image_size), "chunk_delay": args.chunk_delay,
+            "encode_workers": args.encode_workers}
+
+
+def previous_result(config: Dict) -> Dict | None:
+    if not HISTORY.exists():
+        return None
+    last = None
+    for line in HISTORY.read_text(encoding="utf-8").splitlines():
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if entry.get("config") == config:
+            last = entry
+    return last
+
+
+def save_result(config: Dict, summary: Dict) -> None:
+    HISTORY.parent.mkdir(parents=True, exist_ok=True)
+    entry = {"ts": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0],
+             "config": config, "result": summary}
+    with open(HISTORY, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def report(tool: str, summary: Dict, stats: Dict, previous: Dict | None) -> None:
+    tag = "[OK]" if summary["returncode"] == 0 and summary["ok"] else "[WARN]"
+    print(f"{tag} {tool}: {summary['ok']}/{summary['articles']} artículos en {summary['seconds']:.1f} s "
+          f"-> {summary['articles_per_min']:.1f} artículos/min; "
+          f"latencia p50 {summary['p50']:.2f} s, p95 {summary['p95']:.2f} s; "
+          f"RSS máx. {summary['peak_rss_mb']:.0f} MB (salida {summary['returncode']})")
+    print("       peticiones: " + ", ".join(f"{name} {s['requests']} ({s['errors']} errores)"
+                                            for name, s in stats.items() if s["requests"]))
+    if previous:
+        before = previous["result"]
+        print(f"       frente a {previous['ts']}: "
+              f"{delta(summary['articles_per_min'], before['articles_per_min'])} artículos/min, "
+              f"{delta(summary['p95'], before['p95'])} p95, "
+              f"{delta(summary['peak_rss_mb'], before['peak_rss_mb'])} RSS")
+
+
+def delta(now: float, before: float) -> str:
+    if not before:
+        return "n/d"
+    return f"{(now - before) / before * 100:+.1f}%"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Mide el pipeline contra servidores simulados locales")
+    ap.add_argument("--only", choices=TOOLS, default=None, help="Ejecuta solo una de las herramientas")
+    ap.add_argument("--articles", type=int, default=20, help="Artículos por herramienta")
+    ap.add_argument("--workers", type=int, default=4, help="Temas/artículos en paralelo")
+    ap.add_argument("--encode-workers", type=int, default=None,
+                    help="Procesos de codificación WEBP que se pasan a las herramientas")
+    ap.add_argument("--timeout", type=float, default=900, help="Tiempo máximo por herramienta (s)")
+    ap.add_argument("--keep", action="store_true", help="No borrar el árbol de trabajo temporal")
+    ap.add_argument("--no-history", action="store_true", help=f"No guardar el resultado en {HISTORY.relative_to(ROOT)}")
+    add_config_arguments(ap)
+    args = ap.parse_args()
+    config = config_from_args(args)
+
+    env = {k: v for k, v in os.environ.items() if not k.endswith("_API_KEY")}
+    env.update(NO_PROXY="127.0.0.1,localhost", no_proxy="127.0.0.1,localhost", PYTHONUNBUFFERED="1")
+    runners = {"generate": bench_generate, "commons": bench_commons}
+    for tool in ([args.only] if args.only else TOOLS):
+        ws = make_workspace()
+        summary = None
+        try:
+            # Servidores nuevos por herramienta: los contadores de peticiones son solo suyos
+            with StubServers(config, config, config) as servers:
+                summary = runners[tool](ws, {**env, **servers.env()}, args)
+                stats = servers.stats()
+            key = config_key(args, tool)
+            report(tool, summary, stats, previous_result(key))
+            if not args.no_history:
+                save_result(key, {**summary, "requests": stats})
+        finally:
+            if args.keep or summary_failed(summary):
+                print(f"[INFO] Árbol de trabajo (con el registro de la ejecución) conservado en {ws}")
+            else:
+                shutil.rmtree(ws, ignore_errors=True)
+
+
+def summary_failed(summary: Dict | None) -> bool:
+    return summary is None or summary["returncode"] != 0 or not summary["ok"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Índice persistente del front matter de los artículos de content/blog.
+
+Guarda en SQLite, por ruta, el mtime, tamaño y hash de cada .mdx junto con los
+campos que consultan las herramientas (slug, título, categoría, imagen y
+créditos). ``refresh`` solo relee los ficheros cuyo mtime o tamaño han
+cambiado (y solo reparsea el YAML si además cambia el hash), de modo que
+consultas como "artículos sin imagen" o "artículos de la categoría X" no
+necesitan abrir todos los .mdx:
+
+  python tools/content_index.py --without-image
+  python tools/content_index.py --category Seguridad --json
+
+El índice vive en .cache/content_index.sqlite y puede borrarse sin riesgo.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import yaml
+
+import frontmatter
+
+ROOT = Path(__file__).resolve().parents[1]
+BLOG_DIR = ROOT / "content" / "blog"
+DEFAULT_INDEX = ROOT / ".cache" / "content_index.sqlite"
+
+# Versión del esquema: si cambia, el índice se reconstruye
+SCHEMA_VERSION = 1
+FIELDS = {
+    "slug": "slug",
+    "title": "title",
+    "category": "category",
+    "date": "date",
+    "image": "image",
+    "image_alt": "imageAlt",
+    "credit_text": "imageCreditText",
+    "credit_url": "imageCreditUrl",
+}
+
+
+class ContentIndex:
+    def __init__(self, path: Path = DEFAULT_INDEX, content_dir: Path = BLOG_DIR):
+        self.path = Path(path)
+        self.content_dir = Path(content_dir)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.row_factory = sqlite3.Row
+        self._migrate()
+
+    def _migrate(self) -> None:
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self.db.execute("DROP TABLE IF EXISTS articles")
+        columns = ", ".join(f"{col} TEXT" for col in FIELDS)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, sha256 TEXT, "
+            f"{columns}, frontmatter TEXT)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS articles_category ON articles (lower(category))")
+        self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.db.commit()
+
+    def _key(self, path: Path) -> str:
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(ROOT).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def refresh(self) -> Tuple[int, int]:
+        """Sincroniza el índice con el disco. Devuelve (reparseados, eliminados)."""
+        known = {
+            row["path"]: (row["mtime_ns"], row["size"], row["sha256"])
+            for row in self.db.execute("SELECT path, mtime_ns, size, sha256 FROM articles")
+        }
+        seen = set()
+        parsed = 0
+        with self.db:
+            for entry in os.scandir(self.content_dir):
+                if not entry.name.endswith(".mdx") or not entry.is_file():
+                    continue
+                key = self._key(Path(entry.path))
+                seen.add(key)
+                st = entry.stat()
+                old = known.get(key)
+                if old and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+                    continue
+                data = Path(entry.path).read_bytes()
+                digest = hashlib.sha256(data).hexdigest()
+                if old and old[2] == digest:
+                    # Solo ha cambiado el mtime (checkout, touch): no hace falta reparsear
+                    self.db.execute("UPDATE articles SET mtime_ns = ?, size = ? WHERE path = ?",
+                                    (st.st_mtime_ns, st.st_size, key))
+                    continue
+                self._upsert(key, st, digest, data.decode("utf-8"))
+                parsed += 1
+            removed = [k for k in known if k not in seen]
+            self.db.executemany("DELETE FROM articles WHERE path = ?", [(k,) for k in removed])
+        return parsed, len(removed)
+
+    def _upsert(self, key: str, st: os.stat_result, digest: str, text: str) -> None:
+        try:
+            fm, _ = frontmatter.parse(text)
+        except yaml.YAMLError as e:
+            print(f"[WARN] Front matter inválido en {key}: {e}")
+            fm = {}
+        values = [None if fm.get(name) is None else str(fm.get(name)) for name in FIELDS.values()]
+        self.db.execute(
+            f"INSERT OR REPLACE INTO articles (path, mtime_ns, size, sha256, {', '.join(FIELDS)}, frontmatter) "
+            f"VALUES (?, ?, ?, ?, {', '.join('?' for _ in FIELDS)}, ?)",
+            [key, st.st_mtime_ns, st.st_size, digest, *values, json.dumps(fm, ensure_ascii=False, default=str)],
+        )
+
+    def _query(self, where: str = "", params: Tuple = ()) -> List[Dict]:
+        rows = self.db.execute(f"SELECT * FROM articles {where} ORDER BY path", params)
+        return [self._row(r) for r in rows]
+
+    def _row(self, row: sqlite3.Row) -> Dict:
+        out = {k: row[k] for k in row.keys() if k != "frontmatter"}
+        out["abspath"] = ROOT / row["path"]
+        return out
+
+    def articles(self) -> List[Dict]:
+        return self._query()
+
+    def without_image(self) -> List[Dict]:
+        return self._query("WHERE image IS NULL OR image = ''")
+
+    def in_category(self, category: str) -> List[Dict]:
+        return self._query("WHERE lower(category) = lower(?)", (category,))
+
+    def frontmatter(self, path: Path) -> Dict | None:
+        row = self.db.execute("SELECT frontmatter FROM articles WHERE path = ?", (self._key(path),)).fetchone()
+        return json.loads(row["frontmatter"]) if row else None
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_index(path: Path = DEFAULT_INDEX, content_dir: Path = BLOG_DIR) -> ContentIndex:
+    """Abre el índice y lo pone al día con los cambios en disco."""
+    index = ContentIndex(path, content_dir)
+    index.refresh()
+    return index
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Consulta el índice de front matter de content/blog")
+    query = ap.add_mutually_exclusive_group()
+    query.add_argument("--without-image", action="store_true", help="Artículos sin imagen")
+    query.add_argument("--category", help="Artículos de una categoría (sin distinguir mayúsculas)")
+    ap.add_argument("--index", type=Path, default=DEFAULT_INDEX, help="Fichero SQLite del índice")
+    ap.add_argument("--rebuild", action="store_true", help="Descarta el índice y lo reconstruye")
+    ap.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = ap.parse_args()
+
+    if args.rebuild:
+        args.index.unlink(missing_ok=True)
+    with ContentIndex(args.index) as index:
+        parsed, removed = index.refresh()
+        if args.without_image:
+            rows = index.without_image()
+        elif args.category:
+            rows = index.in_category(args.category)
+        else:
+            rows = index.articles()
+        if args.json:
+            print(json.dumps([{k: v for k, v in r.items() if k != "abspath"} for r in rows],
+                             ensure_ascii=False, indent=2))
+        else:
+            for r in rows:
+                print(f"{r['path']}\t{r['category'] or '-'}\t{r['image'] or '(sin imagen)'}")
+            print(f"Total: {len(rows)} (reparseados {parsed}, eliminados {removed})")
+
+
+if __name__ == "__main__":
+    main()
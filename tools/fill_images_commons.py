@@ -6,27 +6,42 @@ y actualiza el frontmatter con la ruta local, alt y créditos.
 Uso:
   python tools/fill_images_commons.py --force   # reemplaza imágenes existentes
   python tools/fill_images_commons.py --limit 5 # procesa solo 5 artículos
+  python tools/fill_images_commons.py --workers 8 --rps 5  # en paralelo, máx. 5 peticiones/s
+  python tools/fill_images_commons.py --offline # solo con la caché grabada en .cache/commons
 
 Requisitos: requests, pyyaml, Pillow
 """
 from __future__ import annotations
 
 import argparse
-import io
 import json
+import math
 import mimetypes
-import re
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, Iterable, List, Tuple
 
 import requests
-import yaml
-from PIL import Image, ImageOps
+from requests.adapters import HTTPAdapter
+
+import frontmatter
+import image_dedup
+import webp_encoder
+from content_index import open_index
+from http_cache import DEFAULT_CACHE_DIR, CacheMiss, HttpCache
+from slugs import canonical_slug
+import telemetry
 
 ROOT = Path(__file__).resolve().parents[1]
 BLOG_DIR = ROOT / "content" / "blog"
 IMG_BASE = ROOT / "public" / "images" / "blog"
-API = "https://commons.wikimedia.org/w/api.php"
+# COMMONS_API_URL permite apuntar a otro servidor (p. ej. los simulados de tools/stub_servers.py)
+API = os.environ.get("COMMONS_API_URL", "https://commons.wikimedia.org/w/api.php")
+# La política de Wikimedia pide un User-Agent identificable
+USER_AGENT = "cursor-blog-tools/1.0 (tools/fill_images_commons.py)"
 
 ALLOWED_LICENSES = {
     "cc-zero",
@@ -36,100 +51,391 @@ ALLOWED_LICENSES = {
 }
 
 
-def parse_frontmatter(text: str) -> Tuple[Dict, str]:
-    if not text.startswith("---\n"):
-        return {}, text
-    parts = text.split("\n---\n", 1)
-    if len(parts) != 2:
-        return {}, text
-    fm_text = parts[0].replace("---\n", "", 1)
-    body = parts[1]
-    data = yaml.safe_load(fm_text) or {}
-    return data, body
+def normalize_slug(name: str) -> str:
+    # Mismo slug que generate_article.py (repara el mojibake antes de slugify)
+    return canonical_slug(name)
+
+
+class RateLimiter:
+    """Espaciado mínimo entre peticiones compartido por todos los hilos."""
+
+    def __init__(self, rps: float = 0):
+        self.interval = 1.0 / rps if rps > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_session: requests.Session | None = None
+_limiter = RateLimiter()
+_cache: HttpCache | None = None
+
+
+def configure_http(pool_size: int = 10, rps: float = 0, cache: HttpCache | None = None) -> requests.Session:
+    """Crea la sesión HTTP compartida (keep-alive, pool de conexiones), el limitador y la caché."""
+    global _session, _limiter, _cache
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, pool_size))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    _session = session
+    _limiter = RateLimiter(rps)
+    _cache = cache
+    return session
+
+
+def _network_get(url: str, **kwargs) -> requests.Response:
+    if _session is None:
+        configure_http(cache=_cache)
+    _limiter.wait()
+    return _session.get(url, **kwargs)
+
+
+def http_get(url: str, cache: bool = True, reader=None, **kwargs) -> requests.Response:
+    """GET compartido; ``reader(resp) -> bytes`` consume el cuerpo de las respuestas 200 en streaming."""
+    if cache and _cache is not None:
+        return _cache.get(_network_get, url, reader=reader, **kwargs)
+    resp = _network_get(url, **kwargs)
+    if reader is not None and resp.status_code == 200:
+        resp._content = reader(resp)
+    return resp
+
+
+SEARCH_LIMIT = 10
+# Máximo de títulos por petición que acepta la API para usuarios sin bot flag
+TITLES_PER_REQUEST = 50
+# Tamaño final de la imagen hero (recorte 16:9)
+TARGET_SIZE = (1920, 1080)
+# Límite de bytes por descarga (configurable con --max-mb)
+MAX_DOWNLOAD_BYTES = 25 * 1024 * 1024
+CANDIDATES_PER_QUERY = 3
+# Originales que Pillow decodifica tal cual; SVG, TIFF, PDF... se piden rasterizados (thumburl)
+DIRECT_MIMES = {"image/jpeg", "image/png", "image/webp"}
+IMAGE_MAGIC = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+    (b"BM", "bmp"),
+)
+IMAGEINFO_PARAMS = {
+    "prop": "imageinfo",
+    "iiprop": "url|size|mime|extmetadata",
+    "iiurlwidth": TARGET_SIZE[0],
+}
 
 
-def dump_frontmatter(data: Dict) -> str:
-    return "---\n" + yaml.safe_dump(data, allow_unicode=True, sort_keys=False) + "---\n\n"
+def api_query(params: Dict, follow: bool = True, cache: bool = True) -> Dict:
+    """Ejecuta una consulta ``action=query`` fusionando páginas.
+
+    Con ``follow`` se siguen las continuaciones (imageinfo demasiado grande para
+    una respuesta); las búsquedas no las siguen para no paginar resultados.
+    """
+    base = {"action": "query", "format": "json", "formatversion": 2, **params}
+    cont: Dict = {}
+    merged: Dict = {"query": {}}
+    while True:
+        r = http_get(API, cache=cache, params={**base, **cont}, timeout=20)
+        r.raise_for_status()
+        data = r.json()
+        q = data.get("query") or {}
+        for page in q.get("pages") or []:
+            merged["query"].setdefault("pages", {}).setdefault(page.get("title"), {}).update(
+                {k: v for k, v in page.items() if k != "imageinfo" or v}
+            )
+        for key in ("normalized", "search"):
+            merged["query"].setdefault(key, []).extend(q.get(key) or [])
+        if not follow or "continue" not in data:
+            return merged
+        cont = data["continue"]
+
+
+class CommonsLookup:
+    """Búsquedas e imageinfo de Commons compartidos entre artículos (y entre hilos).
+
+    En lugar de un ``generator=search`` con imageinfo por artículo y consulta,
+    cada consulta se resuelve a títulos con ``list=search`` (respuesta ligera) y
+    el imageinfo se pide una sola vez por título, en lotes de hasta 50 títulos.
+    Las consultas repetidas y los títulos que aparecen en varias búsquedas se
+    sirven de memoria, y si dos hilos piden lo mismo a la vez solo uno llama.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._titles: Dict[str, Future] = {}
+        self._info: Dict[str, Future] = {}
+
+    def _claim(self, table: Dict[str, Future], keys: Iterable[str]) -> Tuple[List[str], List[Future]]:
+        """Registra futuros para las claves que nadie ha pedido aún; devuelve las nuevas."""
+        mine: List[str] = []
+        with self._lock:
+            for k in keys:
+                if k not in table:
+                    table[k] = Future()
+                    mine.append(k)
+            futures = [table[k] for k in keys]
+        return mine, futures
+
+    def _resolve(self, table: Dict[str, Future], keys: List[str], fetch) -> None:
+        try:
+            results = fetch(keys)
+        except Exception as e:
+            with self._lock:
+                for k in keys:
+                    table.pop(k, None).set_exception(e)
+            raise
+        for k in keys:
+            table[k].set_result(results.get(k))
+
+    def _search_titles(self, queries: List[str]) -> Dict[str, List[str]]:
+        # list=search no admite varias consultas por petición: una por consulta única
+        out = {}
+        for query in queries:
+            data = api_query({"list": "search", "srsearch": query, "srnamespace": 6,
+                              "srlimit": SEARCH_LIMIT, "srprop": ""}, follow=False)
+            out[query] = [hit["title"] for hit in data["query"].get("search", [])]
+        return out
+
+    def _fetch_info(self, titles: List[str]) -> Dict[str, Dict]:
+        out: Dict[str, Dict] = {}
+        # En disco se guarda por título: los lotes cambian de una ejecución a otra
+        namespace = "imageinfo:" + json.dumps(IMAGEINFO_PARAMS, sort_keys=True)
+        if _cache is not None:
+            for title in titles:
+                record = _cache.get_record(namespace, title)
+                if record is not None:
+                    out[title] = record
+        missing = [t for t in titles if t not in out]
+        if missing and _cache is not None and _cache.offline:
+            # Estas peticiones no pasan por HttpCache.get: el modo offline se aplica aquí
+            raise CacheMiss(f"Sin imageinfo en caché (offline) para {len(missing)} título(s): {missing[0]}")
+        for i in range(0, len(missing), TITLES_PER_REQUEST):
+            chunk = missing[i:i + TITLES_PER_REQUEST]
+            data = api_query({"titles": "|".join(chunk), **IMAGEINFO_PARAMS}, cache=False)
+            pages = data["query"].get("pages", {})
+            aliases = {n["from"]: n["to"] for n in data["query"].get("normalized", [])}
+            for title in chunk:
+                out[title] = pages.get(aliases.get(title, title)) or {"title": title}
+                if _cache is not None:
+                    _cache.put_record(namespace, title, out[title])
+        return out
+
+    def titles(self, queries: Iterable[str]) -> Dict[str, List[str]]:
+        queries = list(dict.fromkeys(queries))
+        mine, futures = self._claim(self._titles, queries)
+        if mine:
+            self._resolve(self._titles, mine, self._search_titles)
+        return {q: f.result() or [] for q, f in zip(queries, futures)}
+
+    def imageinfo(self, titles: Iterable[str]) -> Dict[str, Dict]:
+        titles = list(dict.fromkeys(titles))
+        mine, futures = self._claim(self._info, titles)
+        if mine:
+            self._resolve(self._info, mine, self._fetch_info)
+        return {t: f.result() for t, f in zip(titles, futures)}
+
+    def prefetch(self, queries: Iterable[str], pool: Executor | None = None) -> None:
+        """Resuelve de una vez muchas consultas y agrupa su imageinfo en lotes de 50.
+
+        Con ``pool`` cada ``list=search`` va en su propia tarea (en paralelo, bajo
+        el límite de peticiones compartido); el imageinfo se pide al terminar con
+        los títulos de las que respondieron, y después se propaga el primer error.
+        """
+        queries = list(dict.fromkeys(queries))
+        if pool is None:
+            found = self.titles(queries)
+            errors: List[Exception] = []
+        else:
+            found, errors = {}, []
+            for fut in [pool.submit(self.titles, [q]) for q in queries]:
+                try:
+                    found.update(fut.result())
+                except Exception as e:
+                    errors.append(e)
+        self.imageinfo(t for titles in found.values() for t in titles)
+        if errors:
+            raise errors[0]
 
+    def search(self, query: str) -> Dict:
+        """Resultado con la forma de ``generator=search`` (páginas en orden de relevancia)."""
+        titles = self.titles([query])[query]
+        info = self.imageinfo(titles)
+        return {"query": {"pages": {t: {**info[t], "index": i + 1} for i, t in enumerate(titles)}}}
 
-def normalize_slug(name: str) -> str:
-    s = name.lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    s = s.strip("-")
-    return s[:80]
+
+_lookup = CommonsLookup()
 
 
 def search_commons(query: str) -> Dict:
-    params = {
-        "action": "query",
-        "format": "json",
-        "generator": "search",
-        "gsrsearch": query,
-        "gsrlimit": 10,
-        "prop": "imageinfo",
-        "iiprop": "url|mime|extmetadata",
-        "iiurlwidth": 1920,
-    }
-    r = requests.get(API, params=params, timeout=20)
-    r.raise_for_status()
-    return r.json()
+    return _lookup.search(query)
 
 
-def pick_image(resp: Dict) -> Dict | None:
+def _license_ok(extmeta: Dict) -> bool:
+    # Normaliza claves
+    def val(key):
+        v = extmeta.get(key, {}).get("value")
+        return (v or "").strip().lower()
+
+    license_code = val("LicenseShortName") or val("License")
+    usage_terms = val("UsageTerms")
+    # Excluir NC/ND
+    if "noncommercial" in usage_terms or "noderivatives" in usage_terms:
+        return False
+    return any(code in license_code for code in ALLOWED_LICENSES)
+
+
+def score_candidate(width: int, height: int, target: Tuple[int, int] = TARGET_SIZE) -> float:
+    """Puntuación en [0, 1]: resolución nativa suficiente y cercanía a 16:9.
+
+    Es el producto de la fracción del objetivo que se cubre sin ampliar y de la
+    fracción de píxeles que sobrevive al recorte a la proporción del objetivo.
+    """
+    if width <= 0 or height <= 0:
+        return 0.0
+    coverage = min(1.0, width / target[0], height / target[1])
+    aspect, target_aspect = width / height, target[0] / target[1]
+    kept = min(aspect, target_aspect) / max(aspect, target_aspect)
+    return coverage * kept
+
+
+def thumb_url(info: Dict, target: Tuple[int, int] = TARGET_SIZE) -> str:
+    """URL de una miniatura justo del ancho necesario para cubrir ``target`` tras el recorte.
+
+    Las miniaturas de Commons siguen el patrón ``.../<N>px-<nombre>``, así que se
+    ajusta ``N``: una imagen más panorámica que 16:9 necesita más ancho para
+    llegar al alto objetivo. Si el original no es mayor, se usa el original, salvo
+    que no sea un formato de ``DIRECT_MIMES``: entonces se queda la miniatura.
+    """
+    width, height = info.get("width") or 0, info.get("height") or 0
+    thumb = info.get("thumburl")
+    if not thumb or not width or not height:
+        return thumb or info.get("url")
+    wanted = max(target[0], math.ceil(target[1] * width / height))
+    if wanted >= width:
+        if info.get("mime") in DIRECT_MIMES:
+            return info.get("url") or thumb
+        return thumb
+    current = info.get("thumbwidth")
+    if current and f"/{current}px-" in thumb:
+        return thumb.replace(f"/{current}px-", f"/{wanted}px-")
+    return thumb
+
+
+def rank_candidates(resp: Dict) -> List[Dict]:
+    """Candidatos con licencia válida, del mejor al peor según ``score_candidate``.
+
+    A igual puntuación se respeta el orden de relevancia de la búsqueda.
+    """
     pages = (resp.get("query", {}).get("pages", {}) or {}).values()
-    for p in pages:
+    ranked = []
+    for order, p in enumerate(pages):
         infos = p.get("imageinfo") or []
         if not infos:
             continue
         info = infos[0]
-        extmeta = info.get("extmetadata") or {}
-        # Normaliza claves
-        def val(key):
-            v = extmeta.get(key, {}).get("value")
-            return (v or "").strip().lower()
-
-        license_code = val("LicenseShortName") or val("License")
-        usage_terms = val("UsageTerms")
-        # Excluir NC/ND
-        if "noncommercial" in usage_terms or "noderivatives" in usage_terms:
+        if not (info.get("mime") or "image/").startswith("image/"):
             continue
-        if not any(code in license_code for code in ALLOWED_LICENSES):
+        extmeta = info.get("extmetadata") or {}
+        if not _license_ok(extmeta):
             continue
-        return {
+        width, height = info.get("width") or 0, info.get("height") or 0
+        ranked.append((-score_candidate(width, height), p.get("index", order), {
             "title": p.get("title"),
-            "thumburl": info.get("thumburl") or info.get("url"),
+            "thumburl": thumb_url(info),
             "mime": info.get("mime"),
+            "width": width,
+            "height": height,
             "descriptionurl": info.get("descriptionurl") or info.get("url"),
             "artist": extmeta.get("Artist", {}).get("value"),
             "license": extmeta.get("LicenseShortName", {}).get("value"),
-        }
+        }))
+    ranked.sort(key=lambda c: c[:2])
+    return [c[2] for c in ranked]
+
+
+def pick_image(resp: Dict) -> Dict | None:
+    ranked = rank_candidates(resp)
+    return ranked[0] if ranked else None
+
+
+class ImageRejected(ValueError):
+    """La descarga no es una imagen aceptable (tipo, firma o tamaño)."""
+
+
+def sniff_image(head: bytes) -> str | None:
+    """Formato según los primeros bytes (firma), o None si no es una imagen conocida."""
+    for magic, fmt in IMAGE_MAGIC:
+        if head.startswith(magic):
+            return fmt
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis", b"heic", b"heix", b"mif1"):
+        return "avif"
     return None
 
 
-def download_to_webp(url: str, dst_base: Path) -> Path:
-    r = requests.get(url, timeout=30)
-    r.raise_for_status()
-    # Intentamos deducir formato
-    mime = r.headers.get("Content-Type", "image/jpeg")
-    if not mime.startswith("image/"):
-        mime = "image/jpeg"
-    # Convertimos a WEBP con recorte 16:9
-    im = Image.open(io.BytesIO(r.content))
-    fitted = ImageOps.fit(im, (1920, 1080), method=Image.LANCZOS, centering=(0.5, 0.5))
-    out = dst_base.with_suffix(".webp")
-    out.parent.mkdir(parents=True, exist_ok=True)
-    fitted.save(out, format="WEBP", quality=85, method=6)
+def read_image_body(resp: requests.Response, max_bytes: int = MAX_DOWNLOAD_BYTES) -> bytes:
+    """Lee en streaming el cuerpo de ``resp`` y corta en cuanto deja de parecer una imagen válida.
+
+    Se rechaza por cabeceras (Content-Type, Content-Length) antes de leer nada,
+    por firma con el primer bloque y por tamaño al superar ``max_bytes``.
+    """
+    try:
+        ctype = resp.headers.get("Content-Type", "")
+        if ctype and not ctype.startswith(("image/", "application/octet-stream")):
+            raise ImageRejected(f"tipo de contenido no admitido: {ctype}")
+        length = resp.headers.get("Content-Length")
+        if max_bytes and length and length.isdigit() and int(length) > max_bytes:
+            raise ImageRejected(f"{int(length)} bytes superan el límite de {max_bytes}")
+        buf = bytearray()
+        for chunk in resp.iter_content(chunk_size=64 * 1024):
+            if not buf and sniff_image(chunk[:16]) is None:
+                raise ImageRejected("los datos no tienen la firma de una imagen")
+            buf += chunk
+            if max_bytes and len(buf) > max_bytes:
+                raise ImageRejected(f"la descarga supera el límite de {max_bytes} bytes")
+        return bytes(buf)
+    finally:
+        resp.close()
+
+
+def download_to_webp(url: str, dst_base: Path, max_bytes: int = MAX_DOWNLOAD_BYTES) -> Path:
+    # Una respuesta en streaming que no llega a leerse (error HTTP) retiene su conexión
+    with http_get(url, timeout=30, stream=True, reader=lambda resp: read_image_body(resp, max_bytes)) as r:
+        r.raise_for_status()
+        data = r.content
+    # Una entrada de caché puede venir de una ejecución con otro límite
+    if max_bytes and len(data) > max_bytes:
+        raise ImageRejected(f"{len(data)} bytes superan el límite de {max_bytes}")
+    if sniff_image(data[:16]) is None:
+        raise ImageRejected("los datos no tienen la firma de una imagen")
+    # La misma foto de Commons suele servir para varios artículos: se reutiliza, pero
+    # solo si es el mismo fichero (mismos bytes), porque los créditos que se escriben
+    # son los de ``pick``; una foto parecida de otro autor se descarga aparte
+    existing, info = image_dedup.find_existing(data, fit=TARGET_SIZE, near=False)
+    if existing is not None:
+        print(f"[SKIP] Imagen ya existente, se reutiliza: {existing.relative_to(IMG_BASE)}")
+        return existing
+    # Convertimos a WEBP con recorte 16:9 en el pool de codificación
+    out = webp_encoder.encode(data, dst_base.with_suffix(".webp"), fit=TARGET_SIZE)
+    image_dedup.register(out, info)
     return out
 
 
-def process_article(path: Path, force: bool = False) -> bool:
-    text = path.read_text(encoding="utf-8")
-    fm, body = parse_frontmatter(text)
-    slug = fm.get("slug") or normalize_slug(path.stem)
-    img_rel = fm.get("image")
-    if img_rel and not force:
-        return False
-
+def article_queries(fm: Dict, slug: str) -> Tuple[str, List[str]]:
+    """Tema del artículo y consultas a probar en orden (con extra de categoría y sin él)."""
     topic = fm.get("title") or slug.replace("-", " ")
     # Consultas específicas por categoría para mejorar resultados
     cat = (fm.get("category") or "").lower()
@@ -144,47 +450,171 @@ def process_article(path: Path, force: bool = False) -> bool:
         extra = " electrical panel"
 
     query = f"{topic} {extra}".strip()
-    resp = search_commons(query)
-    pick = pick_image(resp)
-    if not pick:
-        # Segundo intento, sin extra
-        resp = search_commons(topic)
-        pick = pick_image(resp)
-    if not pick:
+    # Segundo intento, sin extra
+    return topic, list(dict.fromkeys([query, topic]))
+
+
+def process_article(path: Path, force: bool = False, max_bytes: int = MAX_DOWNLOAD_BYTES) -> bool:
+    fm = frontmatter.read(path)
+    slug = fm.get("slug") or normalize_slug(path.stem)
+    img_rel = fm.get("image")
+    if img_rel and not force:
         return False
 
+    topic, queries = article_queries(fm, slug)
     dst_dir = IMG_BASE / slug
     base = dst_dir / f"{slug}-hero-commons"
-    out = download_to_webp(pick["thumburl"], base)
-    rel = "/images/blog/{}/{}".format(slug, out.name)
+    pick = out = None
+    with telemetry.article(topic, slug):
+        for query in queries:
+            with telemetry.span("search", provider="commons"):
+                candidates = rank_candidates(search_commons(query))[:CANDIDATES_PER_QUERY]
+            # Si el mejor candidato se rechaza (demasiado grande, no es imagen) se prueba el siguiente
+            for pick in candidates:
+                try:
+                    with telemetry.span("download", provider="commons"):
+                        out = download_to_webp(pick["thumburl"], base, max_bytes=max_bytes)
+                    break
+                except ImageRejected as e:
+                    print(f"[WARN] {pick['title']}: {e}")
+            if out:
+                break
+        if not out:
+            return False
+        telemetry.count("images", provider="commons")
+        rel = image_dedup.public_url(out)
+
+        # Actualiza solo la cabecera (escritura atómica, el cuerpo se copia tal cual)
+        with telemetry.span("mdx"):
+            frontmatter.update(path, {
+                "image": rel,
+                "imageAlt": fm.get("imageAlt") or topic,
+                "imageCreditText": (pick.get("artist") or "Wikimedia Commons") + f" ({pick.get('license') or ''})",
+                "imageCreditUrl": pick.get("descriptionurl"),
+            })
+    return True
 
-    # Actualiza frontmatter
-    fm["image"] = rel
-    fm.setdefault("imageAlt", topic)
-    fm["imageCreditText"] = (pick.get("artist") or "Wikimedia Commons") + f" ({pick.get('license') or ''})"
-    fm["imageCreditUrl"] = pick.get("descriptionurl")
 
-    new_text = dump_frontmatter(fm) + body
-    path.write_text(new_text, encoding="utf-8")
-    return True
+def prefetch_searches(articles: Iterable[Dict], limit: int = 0, pool: Executor | None = None) -> None:
+    """Lanza por adelantado la consulta principal de cada artículo pendiente.
+
+    Así el imageinfo de todos los candidatos se pide en lotes de 50 títulos y
+    los títulos compartidos entre artículos se consultan una sola vez. Las
+    búsquedas se reparten en ``pool`` (el de los artículos) si se indica. Las
+    consultas de respaldo se resuelven bajo demanda en process_article.
+    ``articles`` son filas del índice de contenido (title, category, slug).
+    """
+    queries: List[str] = []
+    for row in articles:
+        _, article_qs = article_queries(row, row.get("slug") or normalize_slug(Path(row["path"]).stem))
+        queries.append(article_qs[0])
+        if limit and len(queries) >= limit:
+            break
+    if not queries:
+        return
+    try:
+        _lookup.prefetch(queries, pool=pool)
+    except (requests.RequestException, ValueError) as e:
+        # Cada artículo volverá a intentarlo (y a informar del error) por su cuenta
+        print(f"[WARN] Búsqueda agrupada fallida: {e}")
 
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--force", action="store_true", help="Reemplaza imágenes existentes")
     ap.add_argument("--limit", type=int, default=0, help="Máximo de artículos a procesar")
+    ap.add_argument("--workers", type=int, default=1, help="Artículos procesados en paralelo")
+    ap.add_argument("--rps", type=float, default=5.0,
+                    help="Máximo de peticiones por segundo a Commons entre todos los hilos (0 = sin límite)")
+    ap.add_argument("--encode-workers", type=int, default=None,
+                    help="Procesos para codificar WEBP (por defecto, núcleos de la CPU; 0 = en proceso)")
+    ap.add_argument("--webp-method", type=int, default=6, choices=range(7),
+                    help="Esfuerzo del codificador WEBP (0 rápido ... 6 más lento y compacto)")
+    ap.add_argument("--max-mb", type=float, default=MAX_DOWNLOAD_BYTES / (1024 * 1024),
+                    help="Tamaño máximo de cada imagen descargada (MB; 0 = sin límite)")
+    ap.add_argument("--no-prefetch", action="store_true",
+                    help="No agrupar por adelantado las búsquedas de todos los artículos")
+    ap.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR,
+                    help="Directorio de la caché de búsquedas y miniaturas")
+    ap.add_argument("--cache-ttl-days", type=float, default=7,
+                    help="Días que una entrada se usa sin revalidar (ETag/Last-Modified)")
+    ap.add_argument("--cache-max-mb", type=int, default=1024, help="Tamaño máximo de la caché (MB)")
+    ap.add_argument("--no-cache", action="store_true", help="No leer ni escribir la caché HTTP")
+    ap.add_argument("--offline", action="store_true",
+                    help="Usar solo la caché grabada, sin acceder a la red")
+    ap.add_argument("--no-image-dedup", action="store_true",
+                    help="Escribir siempre la imagen, aunque ya exista una igual en public/images/blog")
+    ap.add_argument("--metrics-dir", type=Path, default=telemetry.DEFAULT_DIR,
+                    help="Directorio de métricas (JSONL de eventos y resumen .prom para Prometheus)")
+    ap.add_argument("--no-metrics", action="store_true", help="No escribir métricas")
     args = ap.parse_args()
-
+    telemetry.configure(None if args.no_metrics else args.metrics_dir, run="fill_images_commons")
+    webp_encoder.configure(workers=args.encode_workers, method=args.webp_method)
+    image_dedup.configure(enabled=not args.no_image_dedup)
+    workers = max(1, args.workers)
+    if args.offline and args.no_cache:
+        ap.error("--offline necesita la caché (no se puede combinar con --no-cache)")
+    cache = None if args.no_cache else HttpCache(
+        args.cache_dir,
+        ttl=args.cache_ttl_days * 24 * 3600,
+        max_bytes=args.cache_max_mb * 1024 * 1024,
+        offline=args.offline,
+    )
+    configure_http(pool_size=workers, rps=args.rps, cache=cache)
+
+    # --limit cuenta artículos modificados: solo se arrancan tantos como huecos queden
     processed = 0
-    for mdx in sorted(BLOG_DIR.glob("*.mdx")):
-        if args.limit and processed >= args.limit:
-            break
-        changed = process_article(mdx, force=args.force)
-        if changed:
-            processed += 1
-            print(f"[OK] Imagen añadida: {mdx.name}")
-        else:
-            print(f"[SKIP] {mdx.name}")
+    in_flight = 0
+    cond = threading.Condition()
+
+    def run(mdx: Path) -> str:
+        nonlocal processed, in_flight
+        with cond:
+            while args.limit and processed < args.limit and processed + in_flight >= args.limit:
+                cond.wait()
+            if args.limit and processed >= args.limit:
+                return "limit"
+            in_flight += 1
+        changed = False
+        try:
+            changed = process_article(mdx, force=args.force, max_bytes=int(args.max_mb * 1024 * 1024))
+        finally:
+            with cond:
+                in_flight -= 1
+                if changed:
+                    processed += 1
+                cond.notify_all()
+        return "ok" if changed else "skip"
+
+    # El índice evita releer y parsear el front matter de todos los .mdx
+    with open_index(content_dir=BLOG_DIR) as index:
+        rows = index.articles() if args.force else index.without_image()
+        total = len(index.articles())
+    if total > len(rows):
+        print(f"[SKIP] {total - len(rows)} artículos ya tienen imagen")
+    articles = [row["abspath"] for row in rows]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if not args.no_prefetch:
+            prefetch_searches(rows, limit=args.limit, pool=pool)
+        futures = {pool.submit(run, mdx): mdx for mdx in articles}
+        for fut in as_completed(futures):
+            mdx = futures[fut]
+            try:
+                status = fut.result()
+            except Exception as e:
+                print(f"[ERROR] {mdx.name}: {e}")
+                continue
+            if status == "ok":
+                print(f"[OK] Imagen añadida: {mdx.name}")
+            elif status == "skip":
+                print(f"[SKIP] {mdx.name}")
+    webp_encoder.shutdown()
+    if cache is not None:
+        print(cache.summary())
+    prom = telemetry.finish()
+    if prom:
+        print(f"[INFO] Métricas: {telemetry.get().jsonl_path} y {prom}")
     print(f"Hecho. Artículos procesados: {processed}")
 
 
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Lectura y edición del front matter YAML de los .mdx del blog.
+
+- ``read`` lee el fichero línea a línea y se detiene en el ``---`` de cierre:
+  el cuerpo del artículo no se llega a leer.
+- Usa el cargador/volcador en C de libyaml (CSafeLoader/CSafeDumper) cuando
+  PyYAML se ha compilado con él, y los de Python puro si no. PyYAML se importa
+  en el primer uso, no al importar este módulo.
+- ``update`` sustituye solo la cabecera: escribe la nueva cabecera y copia el
+  cuerpo tal cual (en bloques, sin decodificarlo) a un temporal del mismo
+  directorio, hace fsync y lo renombra encima del original. Un corte a mitad
+  deja el artículo antiguo intacto, nunca uno a medias.
+
+  import frontmatter
+  fm = frontmatter.read(path)
+  frontmatter.update(path, {"image": "/images/blog/x/x.webp"})
+"""
+from __future__ import annotations
+
+import functools
+import io
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Tuple
+
+DELIMITER = b"---"
+
+
+@functools.lru_cache(maxsize=None)
+def _yaml():
+    """(yaml, cargador, volcador) más rápidos disponibles."""
+    import yaml
+
+    return (yaml, getattr(yaml, "CSafeLoader", yaml.SafeLoader),
+            getattr(yaml, "CSafeDumper", yaml.SafeDumper))
+
+
+def safe_load(text: str):
+    """Documento YAML completo (no solo una cabecera) con el cargador seguro."""
+    yaml, loader, _ = _yaml()
+    return yaml.load(text, Loader=loader)
+
+
+def loads(header: str) -> Dict:
+    return safe_load(header) or {}
+
+
+def dumps(data: Dict) -> str:
+    """Bloque de cabecera completo, con sus delimitadores."""
+    yaml, _, dumper = _yaml()
+    return "---\n" + yaml.dump(data, Dumper=dumper, allow_unicode=True, sort_keys=False) + "---\n"
+
+
+def _read_header(f: io.BufferedReader) -> Tuple[bytes | None, int]:
+    """Lee la cabecera de ``f``; devuelve (yaml, offset del cuerpo) o (None, 0) si no hay."""
+    if f.readline().rstrip(b"\r\n") != DELIMITER:
+        return None, 0
+    lines = []
+    for line in f:
+        if line.rstrip(b"\r\n") == DELIMITER:
+            return b"".join(lines), f.tell()
+        lines.append(line)
+    return None, 0
+
+
+def read(path: Path) -> Dict:
+    """Front matter de ``path`` ({} si no tiene), sin leer el cuerpo."""
+    with open(path, "rb") as f:
+        header, _ = _read_header(f)
+    return loads(header.decode("utf-8")) if header is not None else {}
+
+
+def parse(text: str) -> Tuple[Dict, str]:
+    """Separa un texto ya cargado en (front matter, cuerpo)."""
+    f = io.BytesIO(text.encode("utf-8"))
+    header, offset = _read_header(f)
+    if header is None:
+        return {}, text
+    return loads(header.decode("utf-8")), f.getvalue()[offset:].decode("utf-8")
+
+
+def update(path: Path, changes: Dict, remove: Iterable[str] = ()) -> Dict:
+    """Aplica ``changes`` (y borra las claves ``remove``) en la cabecera de ``path``.
+
+    Las claves existentes mantienen su posición y las nuevas se añaden al final.
+    Si el fichero no tenía cabecera, se crea. Devuelve el front matter resultante.
+    """
+    path = Path(path)
+    with open(path, "rb") as src:
+        header, offset = _read_header(src)
+        data = loads(header.decode("utf-8")) if header is not None else {}
+        data.update(changes)
+        for key in remove:
+            data.pop(key, None)
+        src.seek(offset)
+
+        def fill(dst: BinaryIO) -> None:
+            dst.write(dumps(data).encode("utf-8"))
+            shutil.copyfileobj(src, dst)
+
+        _atomic_write(path, fill)
+    return data
+
+
+def write(path: Path, data: Dict, body: str) -> None:
+    """Escribe un artículo completo (cabecera + cuerpo) con la misma escritura atómica."""
+    _atomic_write(Path(path), lambda dst: dst.write((dumps(data) + body).encode("utf-8")))
+
+
+def write_from(path: Path, data: Dict, body_file: Path, separator: str = "") -> None:
+    """Como ``write``, pero copiando el cuerpo en bloques desde ``body_file``."""
+    with open(body_file, "rb") as src:
+        def fill(dst: BinaryIO) -> None:
+            dst.write((dumps(data) + separator).encode("utf-8"))
+            shutil.copyfileobj(src, dst)
+
+        _atomic_write(Path(path), fill)
+
+
+def _atomic_write(path: Path, fill: Callable[[BinaryIO], None]) -> None:
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.stem}-", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as dst:
+            fill(dst)
+            dst.flush()
+            os.fsync(dst.fileno())
+        if path.exists():
+            shutil.copymode(path, tmp)
+        else:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
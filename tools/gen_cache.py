@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Caché en disco, direccionada por contenido, para respuestas de los proveedores.
+
+Cada entrada se identifica por el hash SHA-256 de (proveedor, modelo, prompt,
+parámetros) y guarda el markdown generado o los bytes de las imágenes. Así, al
+reintentar un lote o regenerar un tema sin cambios, las llamadas idénticas se
+sirven en local sin pagar ni esperar a la API.
+
+Estructura:
+  <root>/<kk>/<key>/meta.json   (tipo, fecha de creación, mimes)
+  <root>/<kk>/<key>/body.md     (texto)
+  <root>/<kk>/<key>/<n>.bin     (imágenes)
+
+Expulsión: entradas con más de ``ttl`` segundos se descartan al leerlas y, si el
+total supera ``max_bytes``, se borran las menos usadas recientemente (LRU por
+mtime del directorio, que se actualiza en cada acierto). El recuento recorre
+todo el directorio, así que no se hace en cada escritura: solo en la primera
+del proceso y después cada vez que se han escrito ``max_bytes / EVICT_FRACTION``
+bytes nuevos.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_CACHE_DIR = ROOT / ".cache" / "generate_article"
+# Se vuelve a recorrer la caché para expulsar tras escribir 1/EVICT_FRACTION de max_bytes
+EVICT_FRACTION = 20
+
+
+def cache_key(provider: str, model: str, prompt: str | List | Dict, **params) -> str:
+    payload = json.dumps(
+        {"provider": provider, "model": model, "prompt": prompt, "params": params},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR, max_bytes: int = 512 * 1024 * 1024,
+                 ttl: float = 30 * 24 * 3600):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._evict_lock = threading.Lock()
+        # Empieza lleno para que la primera escritura aplique el límite heredado de otras ejecuciones
+        self._evict_every = max(1, max_bytes // EVICT_FRACTION)
+        self._written = self._evict_every
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _load(self, key: str, kind: str) -> Tuple[Path, Dict] | None:
+        entry = self._entry(key)
+        try:
+            meta = json.loads((entry / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if meta.get("kind") != kind:
+            return None
+        if self.ttl and time.time() - meta.get("created", 0) > self.ttl:
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        # Marca de uso reciente para la política LRU
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return entry, meta
+
+    def _store(self, key: str, meta: Dict, files: Dict[str, bytes]) -> None:
+        entry = self._entry(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".{key[:8]}-", dir=entry.parent))
+        try:
+            for name, data in files.items():
+                (tmp / name).write_bytes(data)
+            (tmp / "meta.json").write_text(json.dumps({**meta, "created": time.time()}), encoding="utf-8")
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+        except OSError as e:
+            shutil.rmtree(tmp, ignore_errors=True)
+            print(f"[WARN] No se pudo guardar en caché {key[:12]}: {e}")
+            return
+        self._maybe_evict(sum(len(data) for data in files.values()))
+
+    def _maybe_evict(self, written: int) -> None:
+        with self._evict_lock:
+            self._written += written
+            if self._written < self._evict_every:
+                return
+            self._written = 0
+        self.evict()
+
+    def get_text(self, key: str) -> Tuple[str, str] | None:
+        found = self._load(key, "text")
+        if not found:
+            return None
+        entry, meta = found
+        try:
+            body = (entry / "body.md").read_text(encoding="utf-8")
+        except OSError:
+            return None
+        return meta.get("title") or "", body
+
+    def put_text(self, key: str, title: str, body: str) -> None:
+        self._store(key, {"kind": "text", "title": title}, {"body.md": body.encode("utf-8")})
+
+    def get_images(self, key: str) -> List[Tuple[str, bytes]] | None:
+        found = self._load(key, "images")
+        if not found:
+            return None
+        entry, meta = found
+        try:
+            return [(mime, (entry / f"{i}.bin").read_bytes()) for i, mime in enumerate(meta.get("mimes", []))] or None
+        except OSError:
+            return None
+
+    def put_images(self, key: str, blobs: List[Tuple[str, bytes]]) -> None:
+        self._store(
+            key,
+            {"kind": "images", "mimes": [mime for mime, _ in blobs]},
+            {f"{i}.bin": data for i, (_, data) in enumerate(blobs)},
+        )
+
+    def evict(self) -> None:
+        """Borra entradas (LRU) hasta quedar por debajo de ``max_bytes``."""
+        if not self.max_bytes or not self.root.exists():
+            return
+        entries = []
+        total = 0
+        for entry in self.root.glob("*/*"):
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            try:
+                size = sum(f.stat().st_size for f in entry.iterdir())
+                entries.append((entry.stat().st_mtime, size, entry))
+            except OSError:
+                continue
+            total += size
+        if total <= self.max_bytes:
+            return
+        for _, size, entry in sorted(entries):
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            if total <= self.max_bytes:
+                break
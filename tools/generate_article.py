@@ -11,389 +11,197 @@ Uso rápido:
 Requisitos:
   pip install --upgrade google-genai openai pyyaml python-slugify
 
+Modo lote (un solo proceso, clientes compartidos y varios temas en paralelo):
+  python tools/generate_article.py --batch content/topics.yml --workers 4
+
+Este fichero es solo la línea de comandos: el pipeline (article_pipeline.py)
+se importa después de leer las opciones, y los SDK de OpenAI/Gemini cuando se
+crea el primer cliente. Así --help no carga nada y una ejecución sin claves
+(texto de plantilla + placeholder) no paga el medio segundo de cada SDK.
+``--startup-report`` mide ambos arranques frente a STARTUP_BUDGET_MS y una
+ejecución --topic sin claves completa (en una copia temporal del repositorio)
+frente a PLACEHOLDER_BUDGET_MS.
+
 Produce:
   - content/blog/<slug>.mdx
   - public/images/blog/<slug>/<slug>-hero-001.<ext> (y más si procede)
 """
 
 import argparse
-import base64
-import datetime as dt
-import json
-import mimetypes
-import os
 from pathlib import Path
-from typing import List, Tuple
-
-import yaml
-from slugify import slugify
-
-try:
-    from google import genai
-    from google.genai import types as gem_types
-except Exception as e:  # pragma: no cover
-    genai = None
-    gem_types = None
-
-try:
-    from openai import OpenAI
-except Exception:
-    OpenAI = None
-
-
-ROOT = Path(__file__).resolve().parents[1]
-CONTENT_DIR = ROOT / "content" / "blog"
-IMAGES_DIR = ROOT / "public" / "images" / "blog"
-CONTENT_DIR.mkdir(parents=True, exist_ok=True)
-IMAGES_DIR.mkdir(parents=True, exist_ok=True)
-
-
-def unique_image_path(base_dir: Path, slug: str, stem: str = "hero") -> Path:
-    base_dir.mkdir(parents=True, exist_ok=True)
-    idx = 1
-    while True:
-        candidate = base_dir / f"{slug}-{stem}-{idx:03d}"
-        # La extensión la añadimos después al conocer mime_type
-        # Para evitar colisiones cuando haya varios formatos, miramos cualquier ext conocida
-        if not any(candidate.with_suffix(ext).exists() for ext in [".png", ".jpg", ".jpeg", ".webp"]):
-            return candidate
-        idx += 1
-
-
-def save_inline_image(target_stem: Path, mime: str, data_b64: str) -> Path:
-    ext = mimetypes.guess_extension(mime or "") or ".png"
-    out_path = target_stem.with_suffix(ext)
-    out_path.write_bytes(base64.b64decode(data_b64))
-    return out_path
-
-
-def convert_to_webp(src: Path, quality: int = 85) -> Path | None:
-    """Convierte una imagen a WEBP y devuelve la ruta nueva. Si falla, devuelve None.
-    Mantiene el nombre base y cambia la extensión a .webp. Elimina el original si la conversión tiene éxito.
-    """
-    try:
-        from PIL import Image
-        dst = src.with_suffix(".webp")
-        # Evitar reconvertir si ya es .webp
-        if src.suffix.lower() == ".webp":
-            return src
-        with Image.open(src) as im:
-            im.save(dst, format="WEBP", quality=quality, method=6)
-        try:
-            src.unlink(missing_ok=True)
-        except Exception:
-            pass
-        return dst
-    except Exception as e:
-        print(f"[WARN] Conversión a WEBP falló para {src.name}: {e}")
-        return None
-
-
-def _extract_gemini_text(resp) -> str:
-    try:
-        # Muchos SDK exponen resp.text directo
-        if getattr(resp, "text", None):
-            return resp.text
-        # Alternativamente, a través de candidates/parts
-        cand = resp.candidates[0]
-        parts = getattr(cand.content, "parts", [])
-        buf = []
-        for p in parts:
-            t = getattr(p, "text", None)
-            if t:
-                buf.append(t)
-        return "".join(buf)
-    except Exception:
-        return ""
-
-
-def gen_images_with_gemini(prompt: str, slug: str, how_many: int = 1) -> List[Path]:
-    api = os.environ.get("GEMINI_API_KEY")
-    if not api:
-        raise RuntimeError("Falta GEMINI_API_KEY en el entorno")
-    if genai is None:
-        raise RuntimeError("Falta dependencia: google-genai. Ejecuta: pip install google-genai")
 
-    try:
-        client = genai.Client(api_key=api)
-        # Algunos tenants no tienen habilitado el modelo de preview; probamos con ambos
-        candidate_models = [
-            "gemini-2.5-flash-image-preview",
-            "gemini-1.5-flash",
-        ]
-
-        contents = [
-            gem_types.Content(
-                role="user",
-                parts=[gem_types.Part.from_text(text=prompt)],
-            )
-        ]
-        config = gem_types.GenerateContentConfig(response_modalities=["IMAGE", "TEXT"])
-
-        images: List[Path] = []
-        target_dir = IMAGES_DIR / slug
-        target_dir.mkdir(parents=True, exist_ok=True)
-
-        for m in candidate_models:
-            try:
-                print(f"[INFO] Intentando con modelo: {m}")
-                for chunk in client.models.generate_content_stream(model=m, contents=contents, config=config):
-                    if not chunk.candidates or not chunk.candidates[0].content:
-                        continue
-                    for part in (chunk.candidates[0].content.parts or []):
-                        inline = getattr(part, "inline_data", None)
-                        if inline and getattr(inline, "data", None):
-                            stem = unique_image_path(target_dir, slug, stem="hero")
-                            out_path = save_inline_image(stem, inline.mime_type, inline.data)
-                            
-                            # Verificar que la imagen se guardó correctamente
-                            if out_path.exists() and out_path.stat().st_size > 1000:
-                                images.append(out_path)
-                                print(f"[INFO] Imagen generada: {out_path.name} ({out_path.stat().st_size} bytes)")
-                                if len(images) >= how_many:
-                                    return images
-                            else:
-                                print(f"[WARN] Imagen inválida generada: {out_path}")
-            except Exception as e:
-                print(f"[WARN] Error con modelo {m}: {e}")
-                continue
-        return images
-    except Exception as e:
-        print(f"[WARN] Generación de imágenes falló: {e}")
-        return []
-
-
-def gen_images_with_openai(prompt: str, slug: str, how_many: int = 1) -> List[Path]:
-    api = os.environ.get("OPENAI_API_KEY")
-    if not api or OpenAI is None:
-        return []
-    try:
-        client = OpenAI(api_key=api)
-        images: List[Path] = []
-        target_dir = (IMAGES_DIR / slug)
-        target_dir.mkdir(parents=True, exist_ok=True)
-        n = max(1, how_many)
-        
-        print(f"[INFO] Generando {n} imagen(es) con OpenAI...")
-        # gpt-image-1 acepta size tipo 1920x1080 para 16:9
-        res = client.images.generate(
-            model="gpt-image-1",
-            prompt=prompt,
-            size="1920x1080",
-            n=n,
-        )
-        
-        for i, d in enumerate(res.data):
-            b64 = getattr(d, "b64_json", None)
-            if not b64:
-                print(f"[WARN] Imagen {i+1} sin datos base64")
-                continue
-            
-            try:
-                stem = unique_image_path(target_dir, slug, stem="hero")
-                out_path = stem.with_suffix(".png")
-                image_data = base64.b64decode(b64)
-                out_path.write_bytes(image_data)
-                
-                # Verificar que la imagen se guardó correctamente
-                if out_path.exists() and out_path.stat().st_size > 1000:
-                    images.append(out_path)
-                    print(f"[INFO] Imagen {i+1} generada: {out_path.name} ({out_path.stat().st_size} bytes)")
-                else:
-                    print(f"[WARN] Imagen {i+1} inválida: {out_path}")
-            except Exception as e:
-                print(f"[WARN] Error procesando imagen {i+1}: {e}")
-        
-        return images
-    except Exception as e:
-        print(f"[WARN] OpenAI imágenes falló: {e}")
-        return []
-
-
-def mdx_frontmatter(**kwargs) -> str:
-    data = {k: v for k, v in kwargs.items() if v is not None}
-    return "---\n" + yaml.safe_dump(data, allow_unicode=True, sort_keys=False) + "---\n\n"
-
-
-def gen_article_with_openai(topic: str, category: str | None) -> Tuple[str, str]:
-    """Devuelve (title, mdx_body) sin frontmatter."""
-    api = os.environ.get("OPENAI_API_KEY")
-    if not api:
-        raise RuntimeError("Falta OPENAI_API_KEY en el entorno")
-    if OpenAI is None:
-        raise RuntimeError("Falta dependencia: openai. Ejecuta: pip install openai")
-
-    client = OpenAI(api_key=api)
-
-    system = (
-        "Eres un redactor técnico senior. Escribe artículos con estructura SEO,"
-        " tono claro, E-E-A-T, listas, subtítulos H2/H3, y ejemplos prácticos."
-        " Salida en Markdown puro, sin frontmatter. No inventes datos sensibles."
-    )
-
-    user = (
-        f"Tema: {topic}. Categoría sugerida: {category or 'General'}."
-        " Público objetivo: empresas y ayuntamientos en Burgos."
-        " Incluye una introducción breve, 4-6 secciones con H2, y un cierre con CTA suave."
-    )
-
-    try:
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ],
-            temperature=0.7,
-        )
-        text = completion.choices[0].message.content or ""
-    except Exception as e:
-        raise
-
-    # Primer encabezado como título si existe
-    title = topic
-    for line in text.splitlines():
-        if line.strip().startswith("# "):
-            title = line.strip().lstrip("# ").strip()
-            break
-    return title, text
-
-
-def gen_article_with_gemini(topic: str, category: str | None) -> Tuple[str, str]:
-    api = os.environ.get("GEMINI_API_KEY")
-    if not api or genai is None:
-        raise RuntimeError("GEMINI_API_KEY no disponible")
-    client = genai.Client(api_key=api)
-    model = "gemini-1.5-flash"
-    contents = [
-        gem_types.Content(
-            role="user",
-            parts=[gem_types.Part.from_text(text=(
-                "Eres redactor técnico senior. Escribe en Markdown un artículo optimizado para SEO,"
-                " con H2/H3, listas y tono profesional. No añadas frontmatter.\n\n"
-                f"Tema: {topic}. Categoría sugerida: {category or 'General'}."
-            ))],
-        )
-    ]
-    config = gem_types.GenerateContentConfig(response_modalities=["TEXT"])
-    resp = client.models.generate_content(model=model, contents=contents, config=config)
-    text = _extract_gemini_text(resp)
-    if not text.strip():
-        raise RuntimeError("Gemini devolvió texto vacío")
-    title = topic
-    for line in text.splitlines():
-        if line.strip().startswith("# "):
-            title = line.strip().lstrip("# ").strip()
-            break
-    return title, text
+TOOLS_DIR = Path(__file__).resolve().parent
+# Arranque máximo (ms, descontado el del intérprete) de --help y del pipeline
+STARTUP_BUDGET_MS = 100
+# Ejecución --topic completa sin claves (plantilla + placeholder + .mdx), sin descontar nada
+PLACEHOLDER_BUDGET_MS = 600
 
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Genera un artículo y sus imágenes")
-    parser.add_argument("--topic", required=True, help="Tema del artículo")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--topic", help="Tema del artículo")
+    source.add_argument("--batch", type=Path, help="YAML con la lista de tópicos a generar en lote")
+    source.add_argument("--startup-report", action="store_true",
+                        help=f"Mide el tiempo de arranque y de importación (presupuesto {STARTUP_BUDGET_MS} ms)")
     parser.add_argument("--style", default="fotográfico", help="Estilo de la imagen (fotográfico/minimalista/...) ")
     parser.add_argument("--accent", default="azul", help="Color acento para la paleta")
     parser.add_argument("--details", default="", help="Detalles clave para la imagen")
     parser.add_argument("--category", default=None, help="Categoría del post")
     parser.add_argument("--images", type=int, default=1, help="Número de imágenes a generar")
+    parser.add_argument("--workers", type=int, default=4, help="Temas en paralelo en modo --batch")
+    parser.add_argument("--hedge-text-after", type=float, default=10.0,
+                        help="Segundos sin texto antes de lanzar el siguiente proveedor en paralelo (<0 desactiva)")
+    parser.add_argument("--hedge-images-after", type=float, default=25.0,
+                        help="Segundos sin imagen antes de lanzar el siguiente modelo en paralelo (<0 desactiva)")
+    parser.add_argument("--timeout-openai", type=float, default=120.0, help="Timeout máximo por llamada a OpenAI (s)")
+    parser.add_argument("--timeout-gemini", type=float, default=120.0, help="Timeout máximo por llamada a Gemini (s)")
+    parser.add_argument("--cache-dir", type=Path, default=None,
+                        help="Directorio de la caché de respuestas (por defecto .cache/generate_article)")
+    parser.add_argument("--cache-max-mb", type=int, default=512, help="Tamaño máximo de la caché (MB)")
+    parser.add_argument("--cache-ttl-days", type=float, default=30, help="Caducidad de las entradas de caché (días)")
+    parser.add_argument("--no-cache", action="store_true", help="No leer ni escribir la caché de respuestas")
+    parser.add_argument("--journal", type=Path, default=None,
+                        help="Diario de progreso del lote (por defecto .cache/journal/<nombre del YAML>.jsonl)")
+    parser.add_argument("--fresh", action="store_true", help="Ignora el diario y regenera todo el lote")
+    parser.add_argument("--encode-workers", type=int, default=None,
+                        help="Procesos para codificar WEBP (por defecto, núcleos de la CPU; 0 = en proceso)")
+    parser.add_argument("--webp-method", type=int, default=6, choices=range(7),
+                        help="Esfuerzo del codificador WEBP (0 rápido ... 6 más lento y compacto)")
+    parser.add_argument("--on-duplicate", choices=("skip", "warn", "off"), default=None,
+                        help="Qué hacer si el tema casi duplica un post existente (por defecto, saltarlo "
+                             "en --batch y solo avisar con --topic; con skip, un --topic saltado sale con error)")
+    parser.add_argument("--dup-threshold", type=float, default=0.5,
+                        help="Similitud de títulos (Jaccard estimado) a partir de la cual un tema es duplicado")
+    parser.add_argument("--max-retries", type=int, default=3,
+                        help="Reintentos por llamada ante 429, 5xx o timeouts (con backoff exponencial)")
+    parser.add_argument("--breaker-failures", type=int, default=3,
+                        help="Fallos seguidos de un proveedor/modelo antes de pausarlo")
+    parser.add_argument("--breaker-cooldown", type=float, default=120.0,
+                        help="Segundos que un proveedor/modelo caído se salta antes de volver a probarlo")
+    parser.add_argument("--metrics-dir", type=Path, default=None,
+                        help="Directorio de métricas (generate_article.jsonl histórico y .prom de la última "
+                             "ejecución; por defecto .cache/metrics)")
+    parser.add_argument("--no-metrics", action="store_true", help="No escribir métricas")
+    parser.add_argument("--no-stream", action="store_true",
+                        help="Pedir el texto en una sola respuesta en lugar de por fragmentos")
+    parser.add_argument("--no-image-dedup", action="store_true",
+                        help="Escribir siempre las imágenes, aunque ya exista una igual en public/images/blog")
+    return parser
+
+
+def _wall_ms(argv, repeat: int = 5, cwd: Path = TOOLS_DIR, env=None, check: bool = False) -> float:
+    """Mejor tiempo de reloj (ms) de ``python <argv>`` en un intérprete nuevo."""
+    import subprocess
+    import sys
+    import time
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *argv], cwd=cwd, env=env, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=check)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def _placeholder_run_ms(repeat: int = 3) -> float:
+    """Mejor tiempo (ms) de ``--topic`` sin claves sobre una copia temporal de tools/.
+
+    Es el camino real de una ejecución sin claves (texto de plantilla, imagen
+    placeholder, .mdx y métricas), no solo la importación; la copia evita
+    escribir en content/ y public/ del repositorio.
+    """
+    import os
+    import shutil
+    import tempfile
+
+    env = {k: v for k, v in os.environ.items() if k not in ("OPENAI_API_KEY", "GEMINI_API_KEY")}
+    with tempfile.TemporaryDirectory(prefix="startup-report-") as tmp:
+        tools = Path(tmp) / "tools"
+        shutil.copytree(TOOLS_DIR, tools, ignore=shutil.ignore_patterns("__pycache__"))
+        return _wall_ms([str(tools / "generate_article.py"), "--topic", "Informe de arranque"],
+                        repeat=repeat, cwd=Path(tmp), env=env, check=True)
+
+
+def _import_times(module: str):
+    """[(profundidad, módulo, ms acumulados)] según ``python -X importtime``."""
+    import subprocess
+    import sys
+
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=TOOLS_DIR, capture_output=True, text=True, check=False)
+    out = []
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        out.append((depth, name.strip(), int(parts[1]) / 1000))
+    return out
+
+
+def startup_report(budget_ms: float = STARTUP_BUDGET_MS,
+                   placeholder_budget_ms: float = PLACEHOLDER_BUDGET_MS) -> bool:
+    """Mide --help, la importación del pipeline y una ejecución sin claves completa.
+
+    True si las tres caben en su presupuesto. En --help y en la importación se
+    descuenta el arranque del propio intérprete (``python -c pass``), que no
+    depende de este código.
+    """
+    import subprocess
+
+    base = _wall_ms(["-c", "pass"])
+    help_ms = max(0.0, _wall_ms([__file__, "--help"]) - base)
+    pipeline_ms = max(0.0, _wall_ms(["-c", "import article_pipeline"]) - base)
+    try:
+        placeholder_ms = _placeholder_run_ms()
+    except subprocess.CalledProcessError as e:
+        print(f"[ERROR] La ejecución --topic sin claves terminó con código {e.returncode}")
+        placeholder_ms = float("inf")
+    times = _import_times("article_pipeline")
+    sdks = sorted({name for _, name, _ in times if name in ("openai", "google.genai")})
+
+    print(f"[INFO] Arranque del intérprete: {base:.0f} ms (descontado)")
+    for label, ms in (("--help", help_ms), ("Importar el pipeline (ejecución sin claves)", pipeline_ms)):
+        print(f"[{'OK' if ms <= budget_ms else 'WARN'}] {label}: {ms:.0f} ms (presupuesto {budget_ms:.0f} ms)")
+    print("       Dependencias directas más caras del pipeline:")
+    # Hijos directos de article_pipeline: los de profundidad 1 desde la entrada de nivel 0 anterior
+    end = next((i for i, (depth, name, _) in enumerate(times) if depth == 0 and name == "article_pipeline"), 0)
+    start = max((i + 1 for i, (depth, _, _) in enumerate(times[:end]) if depth == 0), default=0)
+    direct = sorted((t for t in times[start:end] if t[0] == 1), key=lambda t: t[2], reverse=True)
+    for _, name, ms in direct[:8]:
+        print(f"       {ms:7.1f} ms  {name}")
+    if sdks:
+        print(f"[WARN] SDK importados al cargar el pipeline: {', '.join(sdks)}")
+    else:
+        print("[OK] Ningún SDK de proveedor se importa al cargar el pipeline")
+    placeholder_ok = placeholder_ms <= placeholder_budget_ms
+    print(f"[{'OK' if placeholder_ok else 'WARN'}] --topic sin claves (plantilla + placeholder): "
+          f"{placeholder_ms:.0f} ms (presupuesto {placeholder_budget_ms:.0f} ms)")
+    return help_ms <= budget_ms and pipeline_ms <= budget_ms and not sdks and placeholder_ok
+
+
+def main():
+    parser = build_parser()
     args = parser.parse_args()
+    if args.startup_report:
+        raise SystemExit(0 if startup_report() else 1)
+    if not args.topic and not args.batch:
+        parser.error("indica --topic o --batch")
 
-    topic = args.topic.strip()
-    slug = slugify(topic)[:80]
-    today = dt.date.today().isoformat()
+    from article_pipeline import run
+    run(args)
 
-    # 1) Generar artículo (texto) con fallback OpenAI -> Gemini -> plantilla
-    try:
-        title, body_md = gen_article_with_openai(topic, args.category)
-    except Exception as e1:
-        print(f"[WARN] OpenAI texto falló: {e1}. Intento con Gemini...")
-        try:
-            title, body_md = gen_article_with_gemini(topic, args.category)
-        except Exception as e2:
-            print(f"[WARN] Gemini texto también falló: {e2}. Uso plantilla local.")
-            body_md = (
-                f"# {topic}\n\n"
-                "## Introducción\n\nResumen del tema con enfoque práctico y profesional.\n\n"
-                "## Puntos clave\n\n- Requisito 1\n- Requisito 2\n- Requisito 3\n\n"
-                "## Implantación\n\nPasos recomendados.\n\n"
-                "## Mantenimiento\n\nBuenas prácticas y periodicidad.\n\n"
-                "## Conclusión\n\nCTA suave orientado a contacto profesional.\n"
-            )
-            title = topic
-
-    # 2) Generar imágenes con Gemini y fallback a OpenAI
-    prompt = (
-        f"Genera una ilustración/fotografía digital para un artículo web sobre {topic}.\n"
-        f"- Estilo: {args.style}\n"
-        "- Formato: 16:9, pensado para encabezado de blog\n"
-        "- Fondo: limpio, profesional, sin texto ni marcas de agua\n"
-        f"- Paleta: colores neutros con acento en {args.accent}\n"
-        f"- Elementos clave: {args.details or 'elementos del tema de forma clara y profesional'}\n"
-        "- Uso final: imagen hero para web, debe ser clara y atractiva"
-    )
-
-    # Intentar generar imágenes con Gemini; si falla (p.ej. falta API key), hacer fallback a OpenAI
-    try:
-        images = gen_images_with_gemini(prompt, slug, how_many=max(1, args.images))
-    except Exception as e:
-        print(f"[WARN] Generación con Gemini falló: {e}. Intento fallback con OpenAI...")
-        images = []
-
-    if not images:
-        images = gen_images_with_openai(prompt, slug, how_many=max(1, args.images))
-    
-    # Convertir a WEBP para optimizar y verificar que las imágenes son válidas
-    out_images: List[Path] = []
-    for p in images:
-        if p.exists() and p.stat().st_size > 1000:  # Verificar que la imagen es válida (>1KB)
-            wp = convert_to_webp(p)
-            out_images.append(wp or p)
-        else:
-            print(f"[WARN] Imagen inválida o muy pequeña: {p}")
-    
-    images = out_images
-    
-    # Generar ruta de imagen para el frontmatter
-    image_path = None
-    if images:
-        # Usar la primera imagen válida
-        first_image = images[0]
-        if first_image.exists() and first_image.stat().st_size > 1000:
-            image_path = f"/images/blog/{slug}/{first_image.name}"
-            print(f"✅ Imagen principal: {image_path}")
-        else:
-            print(f"⚠️  Imagen principal inválida: {first_image}")
-    
-    if not image_path:
-        print("⚠️  No se pudo generar una imagen válida")
-        print("🖼️  Generando imagen de placeholder...")
-        try:
-            from generate_placeholder_image import create_placeholder_image
-            placeholder_path = create_placeholder_image(slug, topic, args.style, args.accent)
-            if placeholder_path.exists() and placeholder_path.stat().st_size > 1000:
-                image_path = f"/images/blog/{slug}/{placeholder_path.name}"
-                print(f"✅ Imagen de placeholder generada: {image_path}")
-            else:
-                print("❌ Error generando imagen de placeholder")
-        except Exception as e:
-            print(f"❌ Error generando placeholder: {e}")
-
-    # 3) Crear MDX con frontmatter + cuerpo
-    post_path = CONTENT_DIR / f"{slug}.mdx"
-    fm = mdx_frontmatter(
-        title=title,
-        description=f"{title} — artículo técnico",  # se puede editar
-        date=today,
-        slug=slug,
-        category=args.category or "General",
-        image=image_path,
-    )
-    post_path.write_text(fm + body_md, encoding="utf-8")
-    print(f"Artículo guardado en: {post_path}")
-    if images:
-        print("Imágenes:")
-        for p in images:
-            print(" -", p)
+
+def __getattr__(name):
+    # Compatibilidad: `from generate_article import gen_images_with_openai` (debug_images.py...)
+    if name.startswith("__"):
+        raise AttributeError(name)
+    import article_pipeline
+
+    return getattr(article_pipeline, name)
 
 
 if __name__ == "__main__":
@@ -1,17 +1,72 @@
 #!/usr/bin/env python3
 """
 Generador de imágenes de placeholder para artículos cuando las APIs de IA fallan.
+
+El fondo (degradado del color de acento) y las fuentes se construyen una vez por
+proceso y se reutilizan entre placeholders; ``create_placeholder_images`` genera
+muchos slugs a la vez repartiendo el dibujo en el pool de webp_encoder.
 """
 
 import os
+from contextlib import ExitStack
+from functools import lru_cache
 from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont
+from typing import Dict, Iterable, List, Tuple
+from PIL import Image, ImageDraw, ImageFont, ImageOps
 import textwrap
 
+try:
+    import webp_encoder
+    from image_names import reserved_image_path
+except ImportError:  # importado como tools.generate_placeholder_image
+    from tools import webp_encoder
+    from tools.image_names import reserved_image_path
+
 ROOT = Path(__file__).resolve().parents[1]
 IMAGES_DIR = ROOT / "public" / "images" / "blog"
 
-def create_placeholder_image(slug: str, topic: str, style: str = "fotográfico", accent_color: str = "azul") -> Path:
+WIDTH, HEIGHT = 1920, 1080
+BASE_COLOR = "#f8fafc"
+
+# Configurar colores según el acento
+COLOR_MAP = {
+    "azul": "#2563eb",
+    "verde": "#059669",
+    "rojo": "#dc2626",
+    "amarillo": "#d97706",
+    "morado": "#7c3aed",
+    "rosa": "#db2777"
+}
+
+@lru_cache(maxsize=None)
+def _background(accent: str, size: Tuple[int, int] = (WIDTH, HEIGHT)) -> Image.Image:
+    """Fondo con degradado vertical sutil del acento (10% arriba -> 0% abajo).
+
+    Se compone en una sola operación a partir de Image.linear_gradient en lugar
+    de dibujar una línea por fila.
+    """
+    # linear_gradient va de 0 (arriba) a 255 (abajo); lo invertimos y escalamos al 10%
+    mask = ImageOps.invert(Image.linear_gradient("L")).resize(size).point(lambda v: v // 10)
+    base = Image.new("RGB", size, color=BASE_COLOR)
+    tint = Image.new("RGB", size, color=accent)
+    return Image.composite(tint, base, mask)
+
+@lru_cache(maxsize=None)
+def _fonts() -> Tuple:
+    try:
+        # Intentar usar una fuente del sistema
+        return (
+            ImageFont.truetype("arial.ttf", 72),
+            ImageFont.truetype("arial.ttf", 48),
+            ImageFont.truetype("arial.ttf", 32),
+        )
+    except OSError:
+        # Fallback a fuente por defecto
+        default = ImageFont.load_default()
+        return default, default, default
+
+def create_placeholder_image(slug: str, topic: str, style: str = "fotográfico", accent_color: str = "azul",
+                             image_path: Path | None = None) -> Path:
     """
     Crea una imagen de placeholder para un artículo.
     
@@ -20,46 +75,20 @@ def create_placeholder_image(slug: str, topic: str, style: str = "fotográfico",
         topic: Título del artículo
         style: Estilo de la imagen
         accent_color: Color de acento
+        image_path: Ruta .webp ya reservada; si falta, se reserva el siguiente
+            <slug>-hero-NNN libre del directorio del artículo
     
     Returns:
         Path a la imagen generada
     """
     
-    # Configurar colores según el acento
-    color_map = {
-        "azul": "#2563eb",
-        "verde": "#059669", 
-        "rojo": "#dc2626",
-        "amarillo": "#d97706",
-        "morado": "#7c3aed",
-        "rosa": "#db2777"
-    }
-    
-    accent = color_map.get(accent_color.lower(), "#2563eb")
-    
-    # Crear imagen
-    width, height = 1920, 1080
-    img = Image.new('RGB', (width, height), color='#f8fafc')
-    draw = ImageDraw.Draw(img)
+    accent = COLOR_MAP.get(accent_color.lower(), "#2563eb")
     
-    # Añadir gradiente de fondo
-    for y in range(height):
-        # Gradiente sutil del color de acento
-        alpha = int(255 * (1 - y / height) * 0.1)  # Muy sutil
-        color = tuple(int(accent[i:i+2], 16) for i in (1, 3, 5)) + (alpha,)
-        draw.line([(0, y), (width, y)], fill=color)
-    
-    # Configurar fuente
-    try:
-        # Intentar usar una fuente del sistema
-        font_large = ImageFont.truetype("arial.ttf", 72)
-        font_medium = ImageFont.truetype("arial.ttf", 48)
-        font_small = ImageFont.truetype("arial.ttf", 32)
-    except:
-        # Fallback a fuente por defecto
-        font_large = ImageFont.load_default()
-        font_medium = ImageFont.load_default()
-        font_small = ImageFont.load_default()
+    # Crear imagen a partir del fondo cacheado
+    width, height = WIDTH, HEIGHT
+    img = _background(accent).copy()
+    draw = ImageDraw.Draw(img)
+    font_large, font_medium, font_small = _fonts()
     
     # Dividir el título en líneas
     lines = textwrap.wrap(topic, width=30)
@@ -86,28 +115,98 @@ def create_placeholder_image(slug: str, topic: str, style: str = "fotográfico",
     watermark = "Imagen generada automáticamente"
     draw.text((width - 20, height - 20), watermark, font=font_small, fill='#94a3b8', anchor='rb')
     
+    # Mismo reparto de nombres que las imágenes generadas: no pisa un hero existente
+    if image_path is None:
+        with reserved_image_path(IMAGES_DIR / slug, slug, "hero") as stem:
+            return _save(img, stem.with_suffix(".webp"))
+    return _save(img, image_path)
+
+def _save(img: Image.Image, image_path: Path) -> Path:
     # Crear directorio si no existe
-    target_dir = IMAGES_DIR / slug
-    target_dir.mkdir(parents=True, exist_ok=True)
+    image_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Guardar imagen
-    image_path = target_dir / f"{slug}-hero-001.webp"
-    img.save(image_path, format="WEBP", quality=85, method=6)
+    # Guardar imagen (fondo plano + texto: method=4 comprime casi igual y mucho más rápido)
+    img.save(image_path, format="WEBP", quality=85, method=4)
     
     return image_path
 
+def create_placeholder_images(items: Iterable[Dict], base_dir: Path = IMAGES_DIR) -> List[Path]:
+    """
+    Crea los placeholders de muchos artículos a la vez.
+    
+    Primero se reservan todos los nombres <slug>-hero-NNN (en este proceso) y
+    después cada imagen se dibuja en el pool de webp_encoder. Si una falla se
+    borra su reserva y se sigue con las demás.
+    
+    Args:
+        items: Dicts con slug y topic (y, opcionalmente, style y accent)
+        base_dir: Directorio con una carpeta de imágenes por slug
+    
+    Returns:
+        Paths de las imágenes generadas
+    """
+    items = list(items)
+    paths: List[Path] = []
+    with ExitStack() as reservations:
+        stems = [reservations.enter_context(reserved_image_path(base_dir / item["slug"], item["slug"], "hero"))
+                 for item in items]
+        futures = [
+            (stem, webp_encoder.run(
+                create_placeholder_image,
+                item["slug"],
+                item["topic"],
+                item.get("style") or "fotográfico",
+                item.get("accent") or "azul",
+                stem.with_suffix(".webp"),
+            ))
+            for item, stem in zip(items, stems)
+        ]
+        
+        for stem, fut in futures:
+            try:
+                paths.append(fut.result())
+            except Exception as e:
+                stem.with_suffix(".webp").unlink(missing_ok=True)
+                print(f"[WARN] Placeholder falló para {stem.parent.name}: {e}")
+    return paths
+
 def main():
     """Función principal para pruebas."""
     import argparse
     
     parser = argparse.ArgumentParser(description="Genera imagen de placeholder")
-    parser.add_argument("--slug", required=True, help="Slug del artículo")
-    parser.add_argument("--topic", required=True, help="Título del artículo")
+    parser.add_argument("--slug", help="Slug del artículo")
+    parser.add_argument("--topic", help="Título del artículo")
     parser.add_argument("--style", default="fotográfico", help="Estilo de la imagen")
     parser.add_argument("--accent", default="azul", help="Color de acento")
+    parser.add_argument("--batch", type=Path,
+                        help="YAML de tópicos (como el de generate_article.py --batch): un placeholder por tema")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos para dibujar en lote (por defecto, núcleos de la CPU; 0 = en proceso)")
     
     args = parser.parse_args()
     
+    if args.batch:
+        import frontmatter
+        from slugs import canonical_slug
+        
+        topics = frontmatter.safe_load(args.batch.read_text(encoding="utf-8")) or []
+        items = [{**item, "topic": item["topic"].strip(),
+                  "slug": item.get("slug") or canonical_slug(item["topic"].strip())}
+                 for item in topics if isinstance(item, dict) and (item.get("topic") or "").strip()]
+        webp_encoder.configure(workers=args.workers)
+        try:
+            paths = create_placeholder_images(items)
+        finally:
+            webp_encoder.shutdown()
+        for path in paths:
+            print(f"✅ Imagen de placeholder generada: {path}")
+        print(f"Hecho. Placeholders: {len(paths)}/{len(items)}")
+        raise SystemExit(0 if len(paths) == len(items) else 1)
+    
+    if not args.slug or not args.topic:
+        parser.error("--slug y --topic son obligatorios sin --batch")
+    
     image_path = create_placeholder_image(
         args.slug, 
         args.topic, 
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Fallback "con cobertura" (hedging) entre proveedores/modelos.
+
+En lugar de esperar a que falle (o agote su timeout) cada proveedor antes de
+probar el siguiente, se lanza el primero y, si no ha respondido pasado un
+umbral de latencia, se lanza también el siguiente en paralelo. Gana el primer
+resultado válido y el resto de intentos se cancelan.
+
+Uso:
+  policy = HedgePolicy(text_after=10, images_after=25, timeouts={"openai": 90})
+  result = await race(
+      [("openai", "openai:gpt-4o-mini", lambda: gen_openai(...)),
+       ("gemini", "gemini:gemini-1.5-flash", lambda: gen_gemini(...))],
+      hedge_after=policy.text_after,
+      timeouts=policy.timeouts,
+  )
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+# (proveedor, etiqueta para logs, fábrica de la corrutina)
+Attempt = Tuple[str, str, Callable[[], Awaitable[Any]]]
+
+DEFAULT_TIMEOUTS = {
+    "openai": 120.0,
+    "gemini": 120.0,
+}
+
+
+class HedgePolicy:
+    """Umbrales de cobertura por etapa y timeout máximo por proveedor (segundos).
+
+    ``text_after``/``images_after`` a ``None`` desactivan la cobertura: se vuelve
+    al fallback secuencial clásico (solo se pasa al siguiente cuando uno falla).
+    """
+
+    def __init__(self, text_after: float | None = 10.0, images_after: float | None = 25.0,
+                 timeouts: Dict[str, float] | None = None):
+        self.text_after = text_after
+        self.images_after = images_after
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+
+
+async def race(attempts: Sequence[Attempt], hedge_after: float | None = None,
+               timeouts: Dict[str, float] | None = None,
+               is_valid: Callable[[Any], bool] = bool) -> Any:
+    """Ejecuta los intentos con cobertura y devuelve el primer resultado válido.
+
+    - Un intento que falla o devuelve algo no válido lanza el siguiente al momento.
+    - Si ningún intento en vuelo responde en ``hedge_after`` segundos, se lanza
+      el siguiente sin cancelar los anteriores.
+    - Al obtener un resultado válido se cancelan los intentos restantes.
+
+    Lanza RuntimeError con el detalle de todos los fallos si ninguno es válido.
+    """
+    queue: List[Attempt] = list(attempts)
+    if not queue:
+        raise RuntimeError("No hay proveedores disponibles")
+    timeouts = timeouts or {}
+    labels: Dict[asyncio.Task, str] = {}
+    errors: List[str] = []
+
+    def launch() -> None:
+        provider, label, factory = queue.pop(0)
+        print(f"[INFO] Intentando con {label}")
+        task = asyncio.ensure_future(asyncio.wait_for(factory(), timeouts.get(provider)))
+        labels[task] = label
+
+    launch()
+    pending = set(labels)
+    try:
+        while pending:
+            wait_for = hedge_after if queue and hedge_after is not None else None
+            done, pending = await asyncio.wait(pending, timeout=wait_for,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # Umbral superado sin respuesta: cubrimos con el siguiente proveedor
+                print(f"[INFO] Sin respuesta en {hedge_after}s; lanzo cobertura")
+                launch()
+                pending = {t for t in labels if not t.done()}
+                continue
+            for task in done:
+                label = labels[task]
+                try:
+                    result = task.result()
+                except asyncio.TimeoutError:
+                    errors.append(f"{label}: timeout")
+                except Exception as e:
+                    errors.append(f"{label}: {e}")
+                else:
+                    if is_valid(result):
+                        return result
+                    errors.append(f"{label}: resultado vacío o no válido")
+                print(f"[WARN] {errors[-1]}")
+                if queue:
+                    launch()
+            pending = {t for t in labels if not t.done()}
+        raise RuntimeError("; ".join(errors))
+    finally:
+        losers = [t for t in labels if not t.done()]
+        for t in losers:
+            t.cancel()
+        if losers:
+            await asyncio.gather(*losers, return_exceptions=True)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Caché HTTP en disco para las peticiones a Wikimedia Commons.
+
+Guarda las respuestas 200 de la API (clave: URL completa con su query string,
+es decir, la consulta de búsqueda) y de las miniaturas (clave: URL de la
+miniatura), además de registros JSON sueltos (p. ej. el imageinfo de cada
+título). Reutiliza el formato y la expulsión LRU de gen_cache.ResponseCache:
+
+  <root>/<kk>/<key>/meta.json   (url, cabeceras, ETag/Last-Modified, fecha)
+  <root>/<kk>/<key>/body.bin    (cuerpo de la respuesta)
+
+Política:
+  - Entrada con menos de ``ttl`` segundos: se sirve sin tocar la red.
+  - Entrada caducada con ETag o Last-Modified: petición condicional; un 304
+    renueva la entrada sin volver a descargar el cuerpo.
+  - Modo ``offline``: solo se sirve la caché (sin mirar la caducidad) y un
+    fallo lanza CacheMiss. Permite probar la herramienta contra una caché
+    grabada previamente sin acceso a la red.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from gen_cache import ResponseCache
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_CACHE_DIR = ROOT / ".cache" / "commons"
+
+# Cabeceras de la respuesta que merece la pena conservar
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class CacheMiss(requests.RequestException):
+    """No hay entrada en caché y el modo offline impide ir a la red."""
+
+
+def request_key(url: str, params: Dict | None = None) -> str:
+    prepared = requests.Request("GET", url, params=params).prepare().url
+    return hashlib.sha256(prepared.encode("utf-8")).hexdigest()
+
+
+def record_key(namespace: str, name: str) -> str:
+    return hashlib.sha256(f"{namespace}\0{name}".encode("utf-8")).hexdigest()
+
+
+def _response(url: str, meta: Dict, body: bytes) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.url = url
+    resp.headers = CaseInsensitiveDict(meta.get("headers") or {})
+    resp._content = body
+    resp._content_consumed = True  # sin conexión detrás: close() no tiene nada que liberar
+    resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+    return resp
+
+
+class HttpCache(ResponseCache):
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR, ttl: float = 7 * 24 * 3600,
+                 max_bytes: int = 1024 * 1024 * 1024, offline: bool = False):
+        # ResponseCache borra al leer lo caducado; aquí se conserva para revalidarlo
+        super().__init__(root, max_bytes=max_bytes, ttl=0)
+        self.fresh_for = ttl
+        self.offline = offline
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _is_fresh(self, meta: Dict) -> bool:
+        return self.offline or not self.fresh_for or time.time() - meta.get("created", 0) <= self.fresh_for
+
+    def _renew(self, key: str, meta: Dict) -> None:
+        # Como en _store: se escribe aparte y se sustituye de golpe, un lector
+        # concurrente nunca ve un meta.json a medias
+        entry = self._entry(key)
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(prefix=".meta-", suffix=".json", dir=entry)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({**meta, "created": time.time()}, f)
+            os.replace(tmp, entry / "meta.json")
+        except OSError:
+            if tmp:
+                Path(tmp).unlink(missing_ok=True)
+
+    def _cached(self, key: str) -> tuple[Dict, bytes] | None:
+        found = self._load(key, "http")
+        if not found:
+            return None
+        entry, meta = found
+        try:
+            return meta, (entry / "body.bin").read_bytes()
+        except OSError:
+            return None
+
+    def get(self, fetch: Callable[..., requests.Response], url: str,
+            params: Dict | None = None, reader: Callable[[requests.Response], bytes] | None = None,
+            **kwargs) -> requests.Response:
+        """GET a través de la caché; ``fetch`` hace la petición real (sesión, limitador).
+
+        Si se indica ``reader``, es quien lee el cuerpo de una respuesta 200 nueva
+        (p. ej. en streaming y con límite de tamaño); si lanza, no se guarda nada.
+        """
+        key = request_key(url, params)
+        cached = self._cached(key)
+        if cached and self._is_fresh(cached[0]):
+            self.hits += 1
+            return _response(cached[0]["url"], *cached)
+        if self.offline:
+            raise CacheMiss(f"Sin entrada en caché (offline): {url}")
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if cached:
+            validators = cached[0].get("headers") or {}
+            if validators.get("ETag"):
+                headers["If-None-Match"] = validators["ETag"]
+            if validators.get("Last-Modified"):
+                headers["If-Modified-Since"] = validators["Last-Modified"]
+        resp = fetch(url, params=params, headers=headers, **kwargs)
+        if resp.status_code == 304 and cached:
+            resp.close()
+            self.revalidated += 1
+            self._renew(key, cached[0])
+            return _response(cached[0]["url"], *cached)
+        self.misses += 1
+        if resp.status_code == 200:
+            if reader is not None:
+                resp._content = reader(resp)
+            kept = {h: resp.headers[h] for h in KEPT_HEADERS if h in resp.headers}
+            self._store(key, {"kind": "http", "url": resp.url or url, "headers": kept},
+                        {"body.bin": resp.content})
+        return resp
+
+    def get_record(self, namespace: str, name: str) -> Dict | None:
+        """Registro JSON (p. ej. imageinfo de un título), si no ha caducado."""
+        found = self._load(record_key(namespace, name), "record")
+        if not found or not self._is_fresh(found[1]):
+            return None
+        self.hits += 1
+        return found[1].get("data")
+
+    def put_record(self, namespace: str, name: str, data: Dict) -> None:
+        self._store(record_key(namespace, name), {"kind": "record", "data": data}, {})
+
+    def summary(self) -> str:
+        return f"caché: {self.hits} aciertos, {self.revalidated} revalidados (304), {self.misses} descargas"
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+Índice de hashes perceptuales de public/images/blog y deduplicación de imágenes.
+
+Para cada imagen hero se guarda en .cache/image_index.sqlite:
+
+  - ``dhash``: hash de diferencias de 256 bits (16x16) de la imagen en grises;
+    dos imágenes son "parecidas" si difieren en pocos bits (distancia de Hamming)
+  - ``pixels``: sha256 de los píxeles decodificados; iguales en dos ficheros
+    con distinto contenedor o metadatos = imagen idéntica
+  - ``source``: sha256 de los bytes originales de los que salió el fichero
+    (lo registran los generadores al escribirlo)
+
+Los hashes se calculan en una sola pasada en paralelo en el pool de
+webp_encoder y, como en el índice de contenido, solo para ficheros nuevos o con
+mtime/tamaño distinto.
+
+``--collapse`` deja una sola copia de cada grupo: si todas están en el mismo
+directorio se conserva allí; si no, se mueve a public/images/blog/_shared/. Se
+reescriben las rutas de los .mdx y se borran los duplicados. Por defecto solo
+se unen imágenes idénticas; ``--near`` une también las parecidas (ojo: los placeholders
+del mismo color solo se distinguen por el texto y cuentan como parecidos).
+
+Los generadores (generate_article.py, fill_images_commons.py) consultan el
+índice con ``find_existing`` antes de codificar una imagen y reutilizan la
+existente en lugar de escribir otra copia (fill_images_commons solo si es el
+mismo fichero, porque escribe los créditos de la foto que eligió). Así un
+artículo puede enlazar el directorio de otro slug: ``referencing_posts`` dice
+quién lo usa antes de mover o borrar un directorio.
+
+Uso:
+  python tools/image_dedup.py --report
+  python tools/image_dedup.py --collapse            # simulación
+  python tools/image_dedup.py --collapse --apply
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import os
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import frontmatter
+import webp_encoder
+
+ROOT = Path(__file__).resolve().parents[1]
+IMG_BASE = ROOT / "public" / "images" / "blog"
+SHARED_DIR = IMG_BASE / "_shared"
+BLOG_DIR = ROOT / "content" / "blog"
+DEFAULT_INDEX = ROOT / ".cache" / "image_index.sqlite"
+
+SCHEMA_VERSION = 1
+IMAGE_EXTS = {".webp", ".png", ".jpg", ".jpeg", ".avif", ".gif"}
+HASH_SIZE = 16  # dHash de 16x16 = 256 bits
+BAND_BITS = 16  # 16 bandas: toda pareja a distancia <= 15 comparte al menos una
+DEFAULT_DISTANCE = 8  # "parecidas" en el informe y en --near
+GENERATOR_DISTANCE = 4  # más estricto al decidir no escribir una imagen nueva
+
+
+def _dhash(im, fit: Tuple[int, int] | None = None) -> str:
+    from PIL import Image, ImageOps
+
+    gray = im.convert("L")
+    if fit:
+        # Mismo encuadre que el recorte de webp_encoder, a baja resolución
+        scale = max(1, fit[0] // 160)
+        gray = ImageOps.fit(gray, (fit[0] // scale, fit[1] // scale), method=Image.BILINEAR)
+    small = gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS).tobytes()
+    bits = 0
+    for row in range(HASH_SIZE):
+        line = small[row * (HASH_SIZE + 1):(row + 1) * (HASH_SIZE + 1)]
+        for left, right in zip(line, line[1:]):
+            bits = (bits << 1) | (left < right)
+    return f"{bits:0{HASH_SIZE * HASH_SIZE // 4}x}"
+
+
+def hash_file(path: str) -> Dict:
+    """dhash, huella de píxeles y tamaño de una imagen en disco (se ejecuta en el pool)."""
+    from PIL import Image
+
+    with Image.open(path) as im:
+        im.load()
+        rgb = im.convert("RGB")
+        pixels = hashlib.sha256(f"{rgb.width}x{rgb.height}".encode() + rgb.tobytes()).hexdigest()
+        return {"dhash": _dhash(rgb), "pixels": pixels, "width": im.width, "height": im.height}
+
+
+def hash_bytes(data: bytes, fit: Tuple[int, int] | None = None) -> str:
+    """dhash de una imagen en memoria tal como quedará tras recortarla a ``fit``."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as im:
+        if im.format == "JPEG":
+            im.draft("RGB", (320, 180))
+        return _dhash(im, fit)
+
+
+def distance(a: str, b: str) -> int:
+    return (int(a, 16) ^ int(b, 16)).bit_count()
+
+
+def _bands(dhash: str) -> List[Tuple[int, str]]:
+    step = BAND_BITS // 4
+    return [(i, dhash[i * step:(i + 1) * step]) for i in range(len(dhash) // step)]
+
+
+def is_hero(path: Path) -> bool:
+    return path.suffix.lower() in IMAGE_EXTS and not path.name.startswith(".")
+
+
+class ImageIndex:
+    def __init__(self, path: Path = DEFAULT_INDEX, image_dir: Path = IMG_BASE):
+        self.path = Path(path)
+        self.image_dir = Path(image_dir)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        self._buckets: Dict[Tuple[int, str], set] | None = None
+        self._migrate()
+
+    def _migrate(self) -> None:
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self.db.execute("DROP TABLE IF EXISTS images")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS images ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, dhash TEXT, pixels TEXT, "
+            "source TEXT, width INTEGER, height INTEGER)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS images_pixels ON images (pixels)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS images_source ON images (source)")
+        self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.db.commit()
+
+    def _key(self, path: Path) -> str:
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(ROOT).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def refresh(self) -> Tuple[int, int]:
+        """Sincroniza con el disco en una pasada paralela. Devuelve (hasheadas, eliminadas)."""
+        with self._lock:
+            known = {row["path"]: (row["mtime_ns"], row["size"])
+                     for row in self.db.execute("SELECT path, mtime_ns, size FROM images")}
+            seen = set()
+            jobs = []
+            for path in sorted(self.image_dir.rglob("*")):
+                if not path.is_file() or not is_hero(path):
+                    continue
+                key = self._key(path)
+                seen.add(key)
+                st = path.stat()
+                if known.get(key) == (st.st_mtime_ns, st.st_size):
+                    continue
+                jobs.append((key, st, webp_encoder.run(hash_file, str(path))))
+            hashed = 0
+            with self.db:
+                for key, st, fut in jobs:
+                    try:
+                        info = fut.result()
+                    except Exception as e:
+                        print(f"[WARN] {key}: no es una imagen válida ({e})")
+                        continue
+                    self.db.execute(
+                        "INSERT INTO images (path, mtime_ns, size, dhash, pixels, width, height) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(path) DO UPDATE SET "
+                        "mtime_ns = excluded.mtime_ns, size = excluded.size, dhash = excluded.dhash, "
+                        "pixels = excluded.pixels, width = excluded.width, height = excluded.height",
+                        (key, st.st_mtime_ns, st.st_size, info["dhash"], info["pixels"],
+                         info["width"], info["height"]),
+                    )
+                    hashed += 1
+                removed = [k for k in known if k not in seen]
+                self.db.executemany("DELETE FROM images WHERE path = ?", [(k,) for k in removed])
+            self._buckets = None
+        return hashed, len(removed)
+
+    def images(self) -> List[Dict]:
+        with self._lock:
+            rows = self.db.execute("SELECT * FROM images ORDER BY path").fetchall()
+        return [dict(r, abspath=ROOT / r["path"]) for r in rows]
+
+    def _candidates(self, dhash: str) -> set:
+        if self._buckets is None:
+            self._buckets = defaultdict(set)
+            for row in self.db.execute("SELECT path, dhash FROM images"):
+                for band in _bands(row["dhash"]):
+                    self._buckets[band].add(row["path"])
+        found = set()
+        for band in _bands(dhash):
+            found |= self._buckets.get(band, set())
+        return found
+
+    def find(self, dhash: str | None = None, source: str | None = None,
+             max_distance: int = GENERATOR_DISTANCE) -> Path | None:
+        """Imagen existente con el mismo origen o un dhash a <= ``max_distance`` bits."""
+        with self._lock:
+            keys = []
+            if source:
+                keys += [r["path"] for r in self.db.execute("SELECT path FROM images WHERE source = ?", (source,))]
+            if dhash:
+                scored = []
+                for key in self._candidates(dhash):
+                    row = self.db.execute("SELECT dhash FROM images WHERE path = ?", (key,)).fetchone()
+                    if row and distance(dhash, row["dhash"]) <= max_distance:
+                        scored.append((distance(dhash, row["dhash"]), key))
+                keys += [key for _, key in sorted(scored)]
+        for key in keys:
+            path = ROOT / key
+            if path.exists():
+                return path
+        return None
+
+    def add(self, path: Path, dhash: str | None = None, source: str | None = None) -> None:
+        """Registra una imagen recién escrita (sin esperar al próximo refresh)."""
+        path = Path(path)
+        info = hash_file(str(path))
+        st = path.stat()
+        with self._lock, self.db:
+            key = self._key(path)
+            self.db.execute(
+                "INSERT OR REPLACE INTO images (path, mtime_ns, size, dhash, pixels, source, width, height) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, st.st_mtime_ns, st.st_size, dhash or info["dhash"], info["pixels"], source,
+                 info["width"], info["height"]),
+            )
+            if self._buckets is not None:
+                for band in _bands(dhash or info["dhash"]):
+                    self._buckets[band].add(key)
+
+    def groups(self, near: bool = False, max_distance: int = DEFAULT_DISTANCE) -> List[List[Dict]]:
+        """Grupos de imágenes idénticas (o también parecidas con ``near``), de 2 o más."""
+        rows = {r["path"]: r for r in self.images()}
+        parent = {key: key for key in rows}
+
+        def find(k: str) -> str:
+            while parent[k] != k:
+                parent[k] = parent[parent[k]]
+                k = parent[k]
+            return k
+
+        by_pixels: Dict[str, List[str]] = defaultdict(list)
+        for key, row in rows.items():
+            by_pixels[row["pixels"]].append(key)
+        for keys in by_pixels.values():
+            for other in keys[1:]:
+                parent[find(other)] = find(keys[0])
+        if near:
+            for key, row in rows.items():
+                for other in self._candidates(row["dhash"]):
+                    if other in rows and other != key and distance(row["dhash"], rows[other]["dhash"]) <= max_distance:
+                        parent[find(other)] = find(key)
+        groups: Dict[str, List[Dict]] = defaultdict(list)
+        for key in rows:
+            groups[find(key)].append(rows[key])
+        return sorted((g for g in groups.values() if len(g) > 1), key=lambda g: g[0]["path"])
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- Consulta desde los generadores -------------------------------------------------
+
+_shared: ImageIndex | None = None
+_shared_lock = threading.Lock()
+_enabled = True
+
+
+def configure(enabled: bool = True) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def shared_index() -> ImageIndex:
+    """Índice compartido por los hilos del proceso, sincronizado una vez al abrirlo."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ImageIndex()
+            _shared.refresh()
+        return _shared
+
+
+def find_existing(data: bytes, fit: Tuple[int, int] | None = None,
+                  near: bool = True) -> Tuple[Path | None, Dict]:
+    """Imagen ya guardada equivalente a ``data`` y los hashes calculados para registrarla luego.
+
+    Primero se busca por el sha256 de los bytes (la misma respuesta servida dos
+    veces) y después, con ``near``, por dhash. Cualquier fallo (sin Pillow, datos
+    no válidos) se trata como "no existe": el generador seguirá su camino normal.
+    """
+    info: Dict = {"source": hashlib.sha256(data).hexdigest()}
+    if not _enabled:
+        return None, info
+    try:
+        index = shared_index()
+        existing = index.find(source=info["source"])
+        if existing is None and near:
+            info["dhash"] = webp_encoder.run(hash_bytes, data, fit).result()
+            existing = index.find(dhash=info["dhash"])
+        return existing, info
+    except Exception as e:
+        print(f"[WARN] Índice de imágenes no disponible: {e}")
+        return None, info
+
+
+def register(path: Path, info: Dict) -> None:
+    if not _enabled:
+        return
+    try:
+        shared_index().add(path, dhash=info.get("dhash"), source=info.get("source"))
+    except Exception as e:
+        print(f"[WARN] No se pudo registrar {Path(path).name} en el índice de imágenes: {e}")
+
+
+def public_url(path: Path) -> str:
+    return "/" + Path(path).resolve().relative_to(ROOT / "public").as_posix()
+
+
+# --- Referencias desde los artículos ----------------------------------------------
+
+def referenced_urls() -> Dict[str, List[Path]]:
+    """URL /images/blog/... -> artículos que la usan (cabecera o cuerpo)."""
+    refs: Dict[str, List[Path]] = defaultdict(list)
+    pattern = re.compile(r"/images/blog/[^\s\"')\]]+")
+    for path in BLOG_DIR.glob("*.mdx"):
+        for url in set(pattern.findall(path.read_text(encoding="utf-8"))):
+            refs[url].append(path)
+    return refs
+
+
+def referencing_posts(directory: Path, exclude: Iterable[Path] = ()) -> List[Path]:
+    """Artículos (salvo ``exclude``) que enlazan alguna imagen de ``directory``.
+
+    Con la reutilización de imágenes un artículo puede apuntar al directorio de
+    otro slug: las herramientas que mueven o borran directorios deben consultarlo.
+    """
+    prefix = public_url(directory) + "/"
+    skip = {Path(p).resolve() for p in exclude}
+    posts = {path for url, paths in referenced_urls().items() if url.startswith(prefix) for path in paths}
+    return sorted(p for p in posts if p.resolve() not in skip)
+
+
+# --- Colapsar duplicados ---------------------------------------------------------
+
+
+def _remove_image(path: Path) -> None:
+    path.unlink(missing_ok=True)
+    if path.parent != IMG_BASE and path.parent.exists() and not any(path.parent.iterdir()):
+        path.parent.rmdir()
+
+
+def plan_collapse(groups: List[List[Dict]], refs: Dict[str, List[Path]]) -> List[Dict]:
+    """Para cada grupo: qué fichero se conserva, dónde acaba y qué se borra."""
+    plan = []
+    for group in groups:
+        group = sorted(group, key=lambda r: (
+            not refs.get(public_url(r["abspath"])),  # mejor una ya enlazada
+            -(r["width"] * r["height"]),
+            r["size"],
+            r["path"],
+        ))
+        keep, drop = group[0], group[1:]
+        src = keep["abspath"]
+        if len({r["abspath"].parent for r in group}) == 1:
+            dst = src
+        else:
+            dst = SHARED_DIR / f"{keep['pixels'][:16]}{src.suffix.lower()}"
+        freed = sum(r["abspath"].stat().st_size for r in drop)
+        plan.append({"keep": keep, "dst": dst, "drop": drop, "freed": freed})
+    return plan
+
+
+def apply_collapse(plan: List[Dict], refs: Dict[str, List[Path]]) -> int:
+    """Ejecuta el plan; devuelve cuántos .mdx se han reescrito."""
+    rewrites: Dict[str, str] = {}
+    for step in plan:
+        src, dst = step["keep"]["abspath"], step["dst"]
+        new_url = public_url(dst)
+        if dst != src:
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(src, dst)
+            rewrites[public_url(src)] = new_url
+            _remove_image(src)
+        for row in step["drop"]:
+            rewrites[public_url(row["abspath"])] = new_url
+            _remove_image(row["abspath"])
+
+    touched = {p for url in rewrites for p in refs.get(url, [])}
+    for path in touched:
+        text = path.read_text(encoding="utf-8")
+        for old, new in rewrites.items():
+            text = text.replace(old, new)
+        fm, body = frontmatter.parse(text)
+        frontmatter.write(path, fm, body)
+    return len(touched)
+
+
+def _human(n: int) -> str:
+    return f"{n / 1024:.0f} KB" if n < 1 << 20 else f"{n / (1 << 20):.1f} MB"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Índice de hashes perceptuales y deduplicación de imágenes del blog")
+    mode = ap.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--report", action="store_true", help="Lista los grupos de imágenes duplicadas")
+    mode.add_argument("--collapse", action="store_true", help="Deja una sola copia de cada grupo")
+    ap.add_argument("--near", action="store_true", help="Incluye imágenes parecidas, no solo idénticas")
+    ap.add_argument("--distance", type=int, default=DEFAULT_DISTANCE,
+                    help="Bits de diferencia (de 256) para considerar dos imágenes parecidas")
+    ap.add_argument("--apply", action="store_true", help="Con --collapse, ejecuta el plan (por defecto simula)")
+    ap.add_argument("--workers", type=int, default=None, help="Procesos para calcular hashes (por defecto, núcleos)")
+    ap.add_argument("--index", type=Path, default=DEFAULT_INDEX, help="Fichero SQLite del índice")
+    args = ap.parse_args()
+
+    webp_encoder.configure(workers=args.workers)
+    with ImageIndex(args.index) as index:
+        hashed, removed = index.refresh()
+        print(f"[INFO] Índice de imágenes: {len(index.images())} (hasheadas {hashed}, eliminadas {removed})")
+        # En el informe se muestran siempre las parecidas; al colapsar solo con --near
+        groups = index.groups(near=args.near or args.report, max_distance=args.distance)
+        refs = referenced_urls()
+        plan = plan_collapse(groups, refs)
+        for i, step in enumerate(plan, 1):
+            members = [step["keep"], *step["drop"]]
+            identical = len({r["pixels"] for r in members}) == 1
+            print(f"Grupo {i} ({'idénticas' if identical else 'parecidas'}, libera {_human(step['freed'])}):")
+            for row in members:
+                mark = "=" if row is step["keep"] else "-"
+                print(f"  {mark} {row['path']} ({row['width']}x{row['height']}, {_human(row['size'])})")
+            if step["dst"] != step["keep"]["abspath"]:
+                print(f"    -> {step['dst'].relative_to(ROOT)}")
+        freed = sum(s["freed"] for s in plan)
+        print(f"Grupos: {len(plan)}, ficheros duplicados: {sum(len(s['drop']) for s in plan)}, "
+              f"espacio recuperable: {_human(freed)}")
+        if args.collapse:
+            if not args.apply:
+                print("(simulación: usa --apply para ejecutarlo)")
+            else:
+                touched = apply_collapse(plan, refs)
+                index.refresh()
+                print(f"Hecho. Artículos con rutas actualizadas: {touched}")
+    webp_encoder.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Nombres únicos para las imágenes hero del blog: <slug>-<stem>-NNN.<ext>.
+
+Lo comparten el pipeline de artículos y el generador de placeholders, así que
+no depende de ningún otro módulo del proyecto (solo de la biblioteca estándar)
+y se puede importar también como ``tools.image_names``.
+
+Reservar un nombre crea ya su fichero .webp vacío (así otro hilo o proceso no
+puede tomarlo). Quien reserva debe escribir en él o borrarlo; con
+``reserved_image_path`` el borrado es automático si algo falla.
+"""
+from __future__ import annotations
+
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+
+class ImageNameAllocator:
+    """Reparte índices únicos <slug>-<stem>-NNN sin sondear el disco índice a índice.
+
+    La primera vez que se pide un (directorio, slug, stem) se escanea el directorio
+    una sola vez para conocer el mayor índice usado (con cualquier extensión);
+    después se sirve desde un contador en memoria protegido por un lock. Cada
+    nombre se reserva creando el fichero con O_EXCL, lo que también evita
+    colisiones con otros procesos que escriban en el mismo directorio.
+    """
+
+    def __init__(self, reserve_ext: str = ".webp"):
+        self.reserve_ext = reserve_ext
+        self._lock = threading.Lock()
+        self._next: Dict[Tuple[Path, str, str], int] = {}
+
+    @staticmethod
+    def _scan(base_dir: Path, slug: str, stem: str) -> int:
+        pattern = re.compile(rf"^{re.escape(slug)}-{re.escape(stem)}-(\d+)\.")
+        highest = 0
+        with os.scandir(base_dir) as it:
+            for entry in it:
+                m = pattern.match(entry.name)
+                if m:
+                    highest = max(highest, int(m.group(1)))
+        return highest + 1
+
+    def reserve(self, base_dir: Path, slug: str, stem: str = "hero") -> Path:
+        """Devuelve la ruta base (sin extensión) y deja creado, vacío, su fichero ``reserve_ext``."""
+        base_dir.mkdir(parents=True, exist_ok=True)
+        key = (base_dir, slug, stem)
+        with self._lock:
+            idx = self._next.get(key) or self._scan(base_dir, slug, stem)
+            while True:
+                candidate = base_dir / f"{slug}-{stem}-{idx:03d}"
+                try:
+                    os.close(os.open(candidate.with_suffix(self.reserve_ext),
+                                     os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+                except FileExistsError:
+                    # Otro proceso se adelantó con este índice
+                    idx += 1
+                    continue
+                self._next[key] = idx + 1
+                return candidate
+
+
+_image_names = ImageNameAllocator()
+
+
+def unique_image_path(base_dir: Path, slug: str, stem: str = "hero") -> Path:
+    """Reserva el siguiente <slug>-<stem>-NNN libre de ``base_dir`` y devuelve su ruta sin extensión.
+
+    La reserva deja creado un ``<slug>-<stem>-NNN.webp`` vacío: si al final no
+    se escribe (la imagen es inválida, se guarda con otra extensión o hay un
+    error) hay que borrarlo, o usar ``reserved_image_path``.
+    """
+    # La extensión la añadimos después al conocer mime_type; el .webp queda reservado
+    return _image_names.reserve(base_dir, slug, stem)
+
+
+@contextmanager
+def reserved_image_path(base_dir: Path, slug: str, stem: str = "hero") -> Iterator[Path]:
+    """Como ``unique_image_path``, pero libera la reserva al salir del bloque.
+
+    Si el bloque lanza una excepción (también una cancelación) se borra el .webp
+    reservado, esté escrito o no; si termina bien y el .webp sigue vacío (la
+    imagen se descartó o se guardó con otra extensión) también se borra.
+    """
+    path = unique_image_path(base_dir, slug, stem)
+    reserved = path.with_suffix(_image_names.reserve_ext)
+    try:
+        yield path
+    except BaseException:
+        reserved.unlink(missing_ok=True)
+        raise
+    try:
+        if reserved.stat().st_size == 0:
+            reserved.unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Migración de slugs con mojibake ("ca3mo", "implementacia3n", "tecnologaas").
+
+Agrupa los artículos por el slug canónico de su título reparado
+(slugs.canonical_slug) y, en cada grupo:
+
+  - si hay varios artículos, se queda con uno (el que no tiene mojibake y,
+    entre esos, el de más contenido) y elimina el resto con sus imágenes (salvo
+    las que usa otro artículo); si el que se queda no tiene imagen, hereda la
+    del duplicado;
+  - repara el mojibake de la cabecera y el cuerpo del que queda (también en
+    artículos sin duplicados) y, si su slug estaba roto, lo renombra al
+    canónico, moviendo su directorio de imágenes y reescribiendo las rutas
+    (front matter, cuerpo y los demás artículos que reutilizan
+    esas imágenes). Un directorio no se mueve encima de ficheros que ya existen.
+
+Cada slug que desaparece se añade a content/redirects.json (que lee
+next.config.mjs) con una redirección permanente a su sustituto, y los enlaces
+internos /blog/<slug viejo> de los demás artículos se actualizan.
+
+Uso:
+  python tools/migrate_slugs.py            # muestra el plan sin tocar nada
+  python tools/migrate_slugs.py --apply    # lo ejecuta
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+import frontmatter
+import image_dedup
+from content_index import BLOG_DIR, open_index
+from slugs import canonical_slug, mojibake_slug, repair_mojibake
+
+ROOT = Path(__file__).resolve().parents[1]
+IMG_BASE = ROOT / "public" / "images" / "blog"
+REDIRECTS = ROOT / "content" / "redirects.json"
+
+
+def article_slug(row: Dict) -> str:
+    return row["slug"] or Path(row["path"]).stem
+
+
+def is_broken(row: Dict) -> bool:
+    """Mojibake en el título o en el slug (p. ej. "implementacia3n" con el título ya reparado).
+
+    Un slug que solo difiere del canónico por ser más corto o elegido a mano no
+    cuenta: únicamente el que coincide con el que produce el título con mojibake.
+    """
+    title = row["title"] or ""
+    if repair_mojibake(title) != title:
+        return True
+    slug = article_slug(row)
+    return repair_mojibake(slug) != slug or (slug != canonical_slug(title) and slug == mojibake_slug(title))
+
+
+def needs_repair(row: Dict) -> bool:
+    """Mojibake en cualquier parte del artículo (cabecera o cuerpo), no solo en el título."""
+    text = row["abspath"].read_text(encoding="utf-8")
+    return repair_mojibake(text) != text
+
+
+def build_plan(rows: List[Dict]) -> List[Dict]:
+    """Un paso por grupo con mojibake o duplicados: quién queda, con qué slug y quién se elimina."""
+    groups: Dict[str, List[Dict]] = defaultdict(list)
+    for row in rows:
+        groups[canonical_slug(row["title"] or article_slug(row))].append(row)
+    existing = {article_slug(r) for r in rows}
+    plan = []
+    for target, members in sorted(groups.items()):
+        if len(members) == 1 and not is_broken(members[0]) and not needs_repair(members[0]):
+            continue
+        members.sort(key=lambda r: (is_broken(r), -(r["size"] or 0), len(article_slug(r))))
+        keeper, dropped = members[0], members[1:]
+        new_slug = article_slug(keeper)
+        if is_broken(keeper):
+            new_slug = target
+            if new_slug in existing and new_slug not in {article_slug(m) for m in members}:
+                print(f"[WARN] {keeper['path']}: el slug {new_slug} ya lo usa otro artículo; se deja igual")
+                new_slug = article_slug(keeper)
+        plan.append({"keep": keeper, "slug": new_slug, "drop": dropped})
+    return plan
+
+
+def image_file(row: Dict) -> Path | None:
+    image = row["image"] or ""
+    if not image.startswith("/images/"):
+        return None
+    path = ROOT / "public" / image.lstrip("/")
+    return path if path.exists() else None
+
+
+def move_image_dir(old: str, new: str) -> bool:
+    """Mueve public/images/blog/<old> a <new> y renombra sus ficheros.
+
+    Devuelve True si las imágenes están ahora en <new>. Si alguno de los
+    ficheros ya existe en <new> no se mueve nada (las rutas deben quedarse en <old>).
+    """
+    src, dst = IMG_BASE / old, IMG_BASE / new
+    if old == new:
+        return True
+    if not src.is_dir():
+        return False
+    moves = [(f, dst / (new + f.name[len(old):] if f.name.startswith(old) else f.name)) for f in src.iterdir()]
+    clashes = [target.name for _, target in moves if target.exists()]
+    if clashes:
+        print(f"[WARN] No se mueve {src.relative_to(ROOT)}: ya existen en {dst.relative_to(ROOT)} "
+              f"{', '.join(clashes)}")
+        return False
+    dst.mkdir(parents=True, exist_ok=True)
+    for f, target in moves:
+        os.replace(f, target)
+    src.rmdir()
+    return True
+
+
+def remove_image_dir(slug: str, post: Path) -> None:
+    """Borra el directorio de imágenes de un artículo eliminado, si ningún otro lo usa."""
+    others = image_dedup.referencing_posts(IMG_BASE / slug, exclude=[post])
+    if others:
+        print(f"[WARN] Se conservan las imágenes de {slug}: las usa {', '.join(p.name for p in others)}")
+        return
+    shutil.rmtree(IMG_BASE / slug, ignore_errors=True)
+
+
+def rewrite_image_paths(text: str, old: str, new: str) -> str:
+    text = text.replace(f"/images/blog/{old}/", f"/images/blog/{new}/")
+    return text.replace(f"/images/blog/{new}/{old}", f"/images/blog/{new}/{new}")
+
+
+def repair_frontmatter(fm: Dict) -> Dict:
+    return {k: repair_mojibake(v) if isinstance(v, str) else v for k, v in fm.items()}
+
+
+def apply_step(step: Dict, redirects: Dict[str, str], moved: Dict[str, str]) -> None:
+    """Aplica un paso del plan; anota en ``moved`` los directorios de imágenes movidos."""
+    keeper, new_slug = step["keep"], step["slug"]
+    old_slug = article_slug(keeper)
+    src = keeper["abspath"]
+    fm, body = frontmatter.parse(src.read_text(encoding="utf-8"))
+
+    # Si el que queda no tiene imagen, hereda la primera disponible de sus duplicados
+    adopted = None
+    if image_file(keeper) is None:
+        adopted = next((r for r in step["drop"] if image_file(r) is not None), None)
+    for row in step["drop"]:
+        slug = article_slug(row)
+        if row is adopted:
+            if move_image_dir(slug, new_slug):
+                moved[slug] = new_slug
+                fm["image"] = rewrite_image_paths(row["image"], slug, new_slug)
+            else:
+                fm["image"] = row["image"]
+        elif slug not in (old_slug, new_slug):
+            # Con el mismo slug en la cabecera, el directorio es también el del que queda
+            remove_image_dir(slug, row["abspath"])
+        row["abspath"].unlink()
+        redirects[slug] = new_slug
+
+    fm, body = repair_frontmatter(fm), repair_mojibake(body)
+    if new_slug != old_slug:
+        fm["slug"] = new_slug
+        if move_image_dir(old_slug, new_slug):
+            moved[old_slug] = new_slug
+            fm = {k: rewrite_image_paths(v, old_slug, new_slug) if isinstance(v, str) else v for k, v in fm.items()}
+            body = rewrite_image_paths(body, old_slug, new_slug)
+        redirects[old_slug] = new_slug
+    dst = src.with_name(f"{new_slug}.mdx")
+    frontmatter.write(dst, fm, body)
+    if dst != src:
+        src.unlink()
+
+
+def rewrite_links(redirects: Dict[str, str], moved: Dict[str, str] | None = None) -> int:
+    """Actualiza los enlaces /blog/<slug viejo> y las imágenes movidas en el resto de artículos."""
+    moved = moved or {}
+    if not redirects and not moved:
+        return 0
+    # Solo enlaces a páginas: /images/blog/<slug>/ es un directorio de imágenes (ver ``moved``)
+    pattern = re.compile(r"(?<!/images)/blog/(" + "|".join(map(re.escape, sorted(redirects, key=len, reverse=True))) + r")(?![a-z0-9-])")
+    changed = 0
+    for path in BLOG_DIR.glob("*.mdx"):
+        text = path.read_text(encoding="utf-8")
+        new = pattern.sub(lambda m: "/blog/" + redirects[m.group(1)], text) if redirects else text
+        for old, slug in moved.items():
+            new = rewrite_image_paths(new, old, slug)
+        if new != text:
+            fm, body = frontmatter.parse(new)
+            frontmatter.write(path, fm, body)
+            changed += 1
+    return changed
+
+
+def save_redirects(redirects: Dict[str, str]) -> None:
+    try:
+        entries = json.loads(REDIRECTS.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        entries = []
+    current = {e["source"]: e["destination"] for e in entries}
+    current.update({f"/blog/{old}": f"/blog/{new}" for old, new in redirects.items()})
+    # Sin cadenas: una redirección antigua que apuntaba a un slug eliminado salta al destino final
+    for source, dest in current.items():
+        seen = {source}
+        while dest in current and dest not in seen:
+            seen.add(dest)
+            dest = current[dest]
+        current[source] = dest
+    out = [{"source": s, "destination": d, "permanent": True} for s, d in sorted(current.items()) if s != d]
+    fd, tmp = tempfile.mkstemp(prefix=".redirects-", dir=REDIRECTS.parent)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(out, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, REDIRECTS)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Repara slugs con mojibake y fusiona artículos duplicados")
+    ap.add_argument("--apply", action="store_true", help="Ejecuta el plan (por defecto solo lo muestra)")
+    args = ap.parse_args()
+
+    with open_index(content_dir=BLOG_DIR) as index:
+        rows = index.articles()
+    plan = build_plan(rows)
+    for step in plan:
+        keeper = step["keep"]
+        print(f"{article_slug(keeper)} -> {step['slug']}" + ("" if step["drop"] else " (repara texto)"))
+        for row in step["drop"]:
+            print(f"  - elimina {article_slug(row)} (duplicado)")
+    removed = sum(len(s["drop"]) for s in plan)
+    renamed = sum(article_slug(s["keep"]) != s["slug"] for s in plan)
+    print(f"Plan: {renamed} renombrados, {removed} duplicados eliminados, "
+          f"{len(rows)} -> {len(rows) - removed} artículos")
+    if not args.apply:
+        print("(simulación: usa --apply para ejecutarlo)")
+        return
+
+    redirects: Dict[str, str] = {}
+    moved: Dict[str, str] = {}
+    for step in plan:
+        apply_step(step, redirects, moved)
+    links = rewrite_links(redirects, moved)
+    save_redirects(redirects)
+    print(f"Hecho. Redirecciones nuevas: {len(redirects)}, artículos con enlaces actualizados: {links}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Índice MinHash/LSH de casi-duplicados entre los artículos de content/blog.
+
+Cada artículo se resume en dos firmas MinHash de ``NUM_PERM`` valores:
+
+  - cuerpo: 3-gramas de palabras del título + cuerpo (detecta posts reescritos)
+  - título: 4-gramas de caracteres del título (para comparar un tema aún no
+    generado con lo ya publicado)
+
+Las firmas se agrupan en bandas (LSH): dos documentos son candidatos si
+coinciden en alguna banda completa, así que una consulta solo compara contra
+los documentos de sus cubetas en lugar de contra todo el blog. La similitud de
+Jaccard se estima con la fracción de valores iguales de la firma.
+
+Las firmas se guardan en .cache/near_duplicates.json y solo se recalculan para
+los artículos cuyo hash ha cambiado según el índice de contenido.
+
+Uso:
+  python tools/near_duplicates.py --report               # grupos de posts casi iguales
+  python tools/near_duplicates.py --check "Tema nuevo"   # ¿ya hay un post parecido?
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import tempfile
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+import frontmatter
+from content_index import BLOG_DIR, DEFAULT_INDEX, ContentIndex
+from slugs import repair_mojibake
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_STORE = ROOT / ".cache" / "near_duplicates.json"
+
+NUM_PERM = 128
+BANDS = 32  # 32 bandas x 4 filas: umbral efectivo de LSH en torno a Jaccard 0.42
+ROWS = NUM_PERM // BANDS
+WORD_SHINGLE = 3
+CHAR_SHINGLE = 4
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+STORE_VERSION = 3
+
+
+def normalize(text: str) -> str:
+    """Minúsculas, sin acentos ni puntuación; repara el texto UTF-8 leído como cp1252."""
+    text = unicodedata.normalize("NFKD", repair_mojibake(text).lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+
+def word_shingles(text: str, k: int = WORD_SHINGLE) -> Set[str]:
+    words = normalize(text).split()
+    if len(words) <= k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def char_shingles(text: str, k: int = CHAR_SHINGLE) -> Set[str]:
+    s = normalize(text)
+    if len(s) <= k:
+        return {s} if s else set()
+    return {s[i:i + k] for i in range(len(s) - k + 1)}
+
+
+def minhash(shingles: Iterable[str]) -> List[int]:
+    values = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") % _PRIME
+              for s in shingles]
+    if not values:
+        return [_PRIME] * NUM_PERM
+    return [min((a * x + b) % _PRIME for x in values) for a, b in _PERMS]
+
+
+def similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    """Jaccard estimado entre dos firmas."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERM
+
+
+def _bands(sig: Sequence[int]) -> List[Tuple[int, int]]:
+    return [(i, hash(tuple(sig[i * ROWS:(i + 1) * ROWS]))) for i in range(BANDS)]
+
+
+class LSHIndex:
+    """Cubetas por banda de firmas MinHash: consultas sin recorrer todos los documentos."""
+
+    def __init__(self):
+        self.sigs: Dict[str, List[int]] = {}
+        self._buckets: Dict[Tuple[int, int], Set[str]] = defaultdict(set)
+
+    def add(self, key: str, sig: List[int]) -> None:
+        self.sigs[key] = sig
+        for band in _bands(sig):
+            self._buckets[band].add(key)
+
+    def query(self, sig: Sequence[int], threshold: float) -> List[Tuple[str, float]]:
+        candidates = set()
+        for band in _bands(sig):
+            candidates |= self._buckets.get(band, set())
+        scored = [(key, similarity(sig, self.sigs[key])) for key in candidates]
+        return sorted((m for m in scored if m[1] >= threshold), key=lambda m: -m[1])
+
+
+class DuplicateIndex:
+    def __init__(self, store: Path = DEFAULT_STORE):
+        self.store = Path(store)
+        self.docs: Dict[str, Dict] = {}
+        self.bodies = LSHIndex()
+        self.titles = LSHIndex()
+
+    @classmethod
+    def load(cls, store: Path = DEFAULT_STORE, index_path: Path = DEFAULT_INDEX,
+             content_dir: Path = BLOG_DIR) -> "DuplicateIndex":
+        """Carga las firmas guardadas y recalcula solo las de artículos nuevos o modificados."""
+        self = cls(store)
+        try:
+            saved = json.loads(self.store.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            saved = {}
+        old = saved.get("docs", {}) if saved.get("version") == STORE_VERSION else {}
+        changed = False
+        with ContentIndex(index_path, content_dir) as index:
+            index.refresh()
+            rows = index.articles()
+        for row in rows:
+            doc = old.get(row["path"])
+            if not doc or doc.get("sha256") != row["sha256"]:
+                _, body = frontmatter.parse(row["abspath"].read_text(encoding="utf-8"))
+                title = row["title"] or ""
+                doc = {
+                    "sha256": row["sha256"],
+                    "title": title,
+                    "slug": row["slug"] or Path(row["path"]).stem,
+                    "body_sig": minhash(word_shingles(f"{title}\n{body}")),
+                    "title_sig": minhash(char_shingles(title)),
+                }
+                changed = True
+            self._add(row["path"], doc)
+        if changed or len(old) != len(self.docs):
+            self.save()
+        return self
+
+    def _add(self, key: str, doc: Dict) -> None:
+        self.docs[key] = doc
+        self.bodies.add(key, doc["body_sig"])
+        self.titles.add(key, doc["title_sig"])
+
+    def save(self) -> None:
+        self.store.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".near-", dir=self.store.parent)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": STORE_VERSION, "docs": self.docs}, f)
+        os.replace(tmp, self.store)
+
+    def similar_to_topic(self, topic: str, threshold: float = 0.5,
+                         exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """Posts cuyo título se parece a ``topic`` (ordenados de más a menos parecido)."""
+        skip = set(exclude)
+        return [m for m in self.titles.query(minhash(char_shingles(topic)), threshold)
+                if m[0] not in skip]
+
+    def keys_for_slug(self, slug: str) -> List[str]:
+        """Posts publicados con ese slug (por nombre de fichero o por el de su cabecera)."""
+        return [key for key, doc in self.docs.items() if doc.get("slug") == slug or Path(key).stem == slug]
+
+    def add_topic(self, key: str, topic: str) -> None:
+        """Registra un tema en curso (solo en memoria) para detectar duplicados dentro del lote."""
+        sig = minhash(char_shingles(topic))
+        self.docs[key] = {"title": topic, "title_sig": sig, "body_sig": sig}
+        self.titles.add(key, sig)
+
+    def clusters(self, threshold: float = 0.8,
+                 title_threshold: float = 0.7) -> List[List[Tuple[str, float]]]:
+        """Grupos de posts casi iguales (unión-búsqueda).
+
+        Dos posts se unen si sus cuerpos superan ``threshold`` o sus títulos
+        ``title_threshold``; cada miembro lleva su mejor similitud en el grupo.
+        """
+        parent = {key: key for key in self.bodies.sigs}
+
+        def find(k: str) -> str:
+            while parent[k] != k:
+                parent[k] = parent[parent[k]]
+                k = parent[k]
+            return k
+
+        best: Dict[str, float] = defaultdict(float)
+        for lsh, limit in ((self.bodies, threshold), (self.titles, title_threshold)):
+            for key in parent:
+                for other, score in lsh.query(lsh.sigs[key], limit):
+                    if other == key or other not in parent:
+                        continue
+                    parent[find(key)] = find(other)
+                    best[key] = max(best[key], score)
+        groups: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+        for key in parent:
+            if key in best:
+                groups[find(key)].append((key, best[key]))
+        return sorted((sorted(g) for g in groups.values()), key=lambda g: g[0][0])
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Detecta artículos casi duplicados en content/blog")
+    mode = ap.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--report", action="store_true", help="Lista los grupos de posts casi duplicados")
+    mode.add_argument("--check", metavar="TEMA", help="Posts existentes con un título parecido a TEMA")
+    ap.add_argument("--threshold", type=float, default=None,
+                    help="Similitud mínima (Jaccard estimado; por defecto 0.8 en --report y 0.5 en --check)")
+    ap.add_argument("--title-threshold", type=float, default=0.7,
+                    help="Similitud mínima de títulos para agrupar en --report")
+    ap.add_argument("--store", type=Path, default=DEFAULT_STORE, help="Fichero con las firmas guardadas")
+    args = ap.parse_args()
+
+    index = DuplicateIndex.load(args.store)
+    if args.check:
+        matches = index.similar_to_topic(args.check, threshold=args.threshold or 0.5)
+        for key, score in matches:
+            print(f"{score:.2f}\t{key}\t{index.docs[key]['title']}")
+        print(f"Coincidencias: {len(matches)}")
+        return
+
+    groups = index.clusters(threshold=args.threshold or 0.8, title_threshold=args.title_threshold)
+    for i, group in enumerate(groups, 1):
+        print(f"Grupo {i}:")
+        for key, score in group:
+            print(f"  {score:.2f}  {key}  ({index.docs[key]['title']})")
+    print(f"Grupos de casi duplicados: {len(groups)} ({sum(len(g) for g in groups)} artículos)")
+
+
+if __name__ == "__main__":
+    main()
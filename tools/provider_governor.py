@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Regulador de llamadas a los proveedores de IA (OpenAI, Gemini) compartido por
+todos los temas de un lote.
+
+Cada pareja (proveedor, modelo) tiene su "carril" con:
+
+  - un limitador de cubeta de tokens cuyo ritmo se adapta (AIMD): cada 429 lo
+    reduce a la mitad y respeta el Retry-After del proveedor (la cubeta queda
+    en pausa para todos los temas, no solo para el que recibió el 429); cada
+    éxito lo sube un poco hasta el máximo configurado
+  - reintentos con backoff exponencial y jitter para 429, 5xx, timeouts y
+    errores de conexión
+  - un circuit breaker: tras varios fallos seguidos (o uno de autenticación o
+    de modelo inexistente) el carril se abre durante ``cooldown`` segundos y
+    las llamadas fallan al momento con CircuitOpen en lugar de esperar su
+    timeout; pasado ese tiempo se deja pasar una llamada de prueba
+
+Uso:
+  governor = ProviderGovernor(max_retries=3, cooldown=120)
+  result = await governor.call("openai", "gpt-4o-mini", lambda: client.chat..., timeout=120)
+"""
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+import telemetry
+
+# Peticiones por segundo de partida (y techo) por proveedor
+DEFAULT_RATES = {
+    "openai": 5.0,
+    "gemini": 5.0,
+}
+MIN_RATE = 0.05  # nunca por debajo de una petición cada 20 s
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+FAILURE_THRESHOLD = 3
+COOLDOWN = 120.0
+
+# Fallos que no se arreglan reintentando y dejan el carril inservible
+_DEAD_STATUS = {401, 403, 404}
+
+
+class CircuitOpen(RuntimeError):
+    """El carril está abierto: el proveedor/modelo se salta hasta que acabe la pausa."""
+
+
+def status_of(exc: BaseException) -> int | None:
+    """Código HTTP de un error del SDK de OpenAI (status_code) o de google-genai (code)."""
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int) and 100 <= value < 600:
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Segundos del Retry-After de la respuesta asociada al error, si lo trae."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        parsed = email.utils.parsedate_to_datetime(value)
+        return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+def classify(exc: BaseException) -> str:
+    """'rate_limit', 'transient' (se reintenta), 'dead' (abre el carril) o 'fatal'."""
+    if isinstance(exc, CircuitOpen):
+        return "fatal"
+    status = status_of(exc)
+    if status == 429:
+        return "rate_limit"
+    if status in _DEAD_STATUS:
+        return "dead"
+    if status is not None:
+        return "transient" if status >= 500 or status in (408, 409) else "fatal"
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError, OSError)):
+        return "transient"
+    # Errores de red de los SDK sin código HTTP (APIConnectionError, APITimeoutError...)
+    name = type(exc).__name__
+    return "transient" if "Timeout" in name or "Connection" in name else "fatal"
+
+
+def backoff(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """Espera antes del reintento ``attempt`` (0, 1, ...): exponencial con jitter completo."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class TokenBucket:
+    """Cubeta de tokens con ritmo adaptativo; segura dentro de un único event loop."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def penalize(self, pause: float | None = None) -> None:
+        """429: ritmo a la mitad y, con Retry-After, pausa para todos los que esperan."""
+        self.rate = max(MIN_RATE, self.rate / 2)
+        self.tokens = min(self.tokens, 0.0)
+        if pause:
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+
+    def reward(self) -> None:
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int = FAILURE_THRESHOLD, cooldown: float = COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    def allow(self) -> bool:
+        """¿Puede salir una llamada? Pasado el cooldown deja pasar una sola de prueba."""
+        if self.opened_at is None:
+            return True
+        if time.monotonic() - self.opened_at < self.cooldown or self._probing:
+            return False
+        self._probing = True
+        return True
+
+    @property
+    def probing(self) -> bool:
+        """¿Hay en vuelo una llamada de prueba (carril medio abierto)?"""
+        return self._probing
+
+    def is_open(self) -> bool:
+        return self.opened_at is not None and (
+            time.monotonic() - self.opened_at < self.cooldown or self._probing)
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def failure(self) -> bool:
+        """Registra un fallo; devuelve True si el carril acaba de abrirse."""
+        self.failures += 1
+        if self._probing or self.failures >= self.threshold:
+            return self.trip()
+        return False
+
+    def release(self) -> None:
+        """La llamada de prueba no llegó a terminar: se permitirá otra."""
+        self._probing = False
+
+    def trip(self) -> bool:
+        was_open = self.opened_at is not None and not self._probing
+        self.opened_at = time.monotonic()
+        self._probing = False
+        return not was_open
+
+
+class Lane:
+    def __init__(self, rate: float, threshold: int, cooldown: float):
+        self.bucket = TokenBucket(rate)
+        self.breaker = CircuitBreaker(threshold, cooldown)
+
+
+class ProviderGovernor:
+    """Carriles por (proveedor, modelo) compartidos por todas las llamadas del proceso."""
+
+    def __init__(self, rates: Dict[str, float] | None = None, max_retries: int = 3,
+                 threshold: int = FAILURE_THRESHOLD, cooldown: float = COOLDOWN):
+        self.rates = {**DEFAULT_RATES, **(rates or {})}
+        self.max_retries = max_retries
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lanes: Dict[Tuple[str, str], Lane] = {}
+        # Proveedor -> instante en que se deshabilitó entero (401/403)
+        self._tripped: Dict[str, float] = {}
+
+    def lane(self, provider: str, model: str) -> Lane:
+        key = (provider, model)
+        if key not in self._lanes:
+            lane = Lane(self.rates.get(provider, 1.0), self.threshold, self.cooldown)
+            tripped = self._tripped.get(provider)
+            if tripped is not None:
+                # Un modelo aún sin carril de un proveedor deshabilitado nace en pausa
+                lane.breaker.opened_at = tripped
+            self._lanes[key] = lane
+        return self._lanes[key]
+
+    def available(self, provider: str, model: str) -> bool:
+        return not self.lane(provider, model).breaker.is_open()
+
+    def _trip_provider(self, provider: str) -> None:
+        # Clave inválida o sin permisos: afecta a todos los modelos del proveedor,
+        # también a los que aún no tienen carril (se crean ya abiertos)
+        self._tripped[provider] = time.monotonic()
+        for (p, _), lane in self._lanes.items():
+            if p == provider:
+                lane.breaker.trip()
+
+    async def call(self, provider: str, model: str, factory: Callable[[], Awaitable[Any]],
+                   timeout: float | None = None) -> Any:
+        """Ejecuta ``factory()`` regulado; ``timeout`` limita cada intento, no el total.
+
+        Un intento que agota su timeout cuenta como fallo transitorio y se reintenta.
+        Si la llamada es la de prueba de un carril medio abierto no se reintenta:
+        su resultado cierra el carril o lo vuelve a abrir otro ``cooldown``.
+        """
+        label = f"{provider}:{model}"
+        lane = self.lane(provider, model)
+        attempt = 0
+        probe = False
+        try:
+            while True:
+                if not lane.breaker.allow():
+                    raise CircuitOpen(f"{label} en pausa tras fallos repetidos")
+                probe = lane.breaker.probing
+                with telemetry.span("throttle", provider=provider, model=model):
+                    await lane.bucket.acquire()
+                try:
+                    with telemetry.span("provider_call", provider=provider, model=model):
+                        result = await asyncio.wait_for(factory(), timeout)
+                except Exception as e:
+                    kind = classify(e)
+                    if kind == "dead":
+                        if status_of(e) in (401, 403):
+                            self._trip_provider(provider)
+                        lane.breaker.trip()
+                        telemetry.count("circuit_open", provider=provider, model=model, reason=kind)
+                        print(f"[WARN] {label} deshabilitado durante {self.cooldown:.0f}s: {e}")
+                        raise
+                    if kind == "fatal":
+                        # El proveedor respondió (p. ej. un 400): está vivo, el fallo es de la petición
+                        lane.breaker.success()
+                        raise
+                    if kind == "rate_limit":
+                        wait = retry_after(e)
+                        lane.bucket.penalize(wait)
+                        if probe:
+                            # La prueba no sale: el carril vuelve a pausa en vez de quedarse a medias
+                            lane.breaker.trip()
+                            telemetry.count("circuit_open", provider=provider, model=model, reason=kind)
+                            print(f"[WARN] {label} sigue limitado (429); en pausa {self.cooldown:.0f}s")
+                            raise CircuitOpen(f"{label}: {e}") from e
+                        delay = max(wait or 0.0, backoff(attempt))
+                        reason = f"límite de peticiones (429); ritmo {lane.bucket.rate:.2f}/s"
+                    elif lane.breaker.failure():
+                        telemetry.count("circuit_open", provider=provider, model=model, reason=kind)
+                        print(f"[WARN] {label} en pausa {self.cooldown:.0f}s tras {lane.breaker.failures} fallos")
+                        raise CircuitOpen(f"{label}: {e}") from e
+                    else:
+                        delay = backoff(attempt)
+                        reason = str(e) or type(e).__name__
+                    if attempt >= self.max_retries:
+                        print(f"[WARN] {label}: {reason}; sin más reintentos")
+                        raise
+                    print(f"[WARN] {label}: {reason}; reintento en {delay:.1f}s")
+                    telemetry.count("retries", provider=provider, model=model, reason=kind)
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                    continue
+                lane.bucket.reward()
+                lane.breaker.success()
+                self._tripped.pop(provider, None)
+                return result
+        finally:
+            if probe and lane.breaker.probing:
+                # Prueba cancelada desde fuera (p. ej. ganó otro proveedor): no cuenta como
+                # fallo ni como éxito, se permitirá otra
+                lane.breaker.release()
+
+    def wrap(self, provider: str, model: str, factory: Callable[[], Awaitable[Any]],
+             timeout: float | None = None) -> Callable[[], Awaitable[Any]]:
+        """Fábrica equivalente a ``factory`` pero regulada (para hedging.race)."""
+        return lambda: self.call(provider, model, factory, timeout=timeout)
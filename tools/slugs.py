@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Slug canónico de los artículos del blog.
+
+Los títulos que pasan por una herramienta que decodifica UTF-8 como cp1252
+llegan como "CÃ³mo" o "ImplementaciÃ³n", y al pasar por slugify producen
+slugs como "ca3mo" o "implementacia3n": el mismo artículo acaba con dos slugs,
+dos directorios de imágenes y dos páginas. ``canonical_slug`` repara primero
+ese mojibake y después aplica slugify, y es la única función de slug que deben
+usar generate_article.py y fill_images_commons.py.
+"""
+from __future__ import annotations
+
+import re
+
+from slugify import slugify
+
+MAX_LENGTH = 80
+
+# Caracteres de cp1252 en 0x80-0x9f (el resto del rango coincide con latin-1)
+_CP1252_HIGH = "€‚ƒ„…†‡ˆ‰Š‹ŒŽ‘’“”•–—˜™š›œžŸ"
+_CONT = "[\u0080-¿" + re.escape(_CP1252_HIGH) + "]"
+# Byte inicial de UTF-8 seguido del número de bytes de continuación que le corresponde
+_MOJIBAKE = re.compile(
+    f"[Â-ß]{_CONT}|[à-ï]{_CONT}{{2}}|[ð-ô]{_CONT}{{3}}"
+)
+
+
+def _as_bytes(text: str) -> bytes:
+    out = bytearray()
+    for ch in text:
+        try:
+            out += ch.encode("cp1252")
+        except UnicodeEncodeError:
+            # 0x81, 0x8d, 0x8f, 0x90 y 0x9d no existen en cp1252 y se cuelan tal cual
+            out += ch.encode("latin-1")
+    return bytes(out)
+
+
+def _fix(match: re.Match) -> str:
+    try:
+        return _as_bytes(match.group()).decode("utf-8")
+    except UnicodeError:
+        return match.group()
+
+
+def repair_mojibake(text: str) -> str:
+    """Deshace UTF-8 decodificado como cp1252/latin-1 ("CÃ³mo" -> "Cómo").
+
+    Solo toca secuencias que forman UTF-8 válido al volver a codificarlas, así
+    que el texto correcto no cambia. Se repite para textos codificados dos veces.
+    """
+    for _ in range(3):
+        fixed = _MOJIBAKE.sub(_fix, text)
+        if fixed == text:
+            break
+        text = fixed
+    return text
+
+
+def canonical_slug(text: str, max_length: int = MAX_LENGTH) -> str:
+    # Mismo recorte que el original (y que el `cut -c1-80` de generate-article.yml):
+    # sin quitar el guion final, para no cambiar slugs ya publicados
+    return slugify(repair_mojibake(text))[:max_length]
+
+
+def mojibake_slug(text: str, max_length: int = MAX_LENGTH) -> str:
+    """Slug que salía de ``text`` al decodificar su UTF-8 como cp1252 ("Cómo" -> "ca3mo").
+
+    Sirve para reconocer un slug roto aunque el título ya esté reparado.
+    """
+    broken = "".join(bytes([b]).decode("cp1252", errors="ignore") or chr(b) for b in text.encode("utf-8"))
+    return slugify(broken)[:max_length]
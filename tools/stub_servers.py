@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Servidores HTTP locales que imitan a OpenAI, Gemini y Wikimedia Commons para
+medir el pipeline sin red ni claves reales (los usa tools/benchmark.py).
+
+  - OpenAI: POST /v1/chat/completions (también con ``stream``, por SSE) y
+    /v1/images/generations
+  - Gemini: POST /v1beta/models/<modelo>:generateContent y
+    :streamGenerateContent?alt=sse (texto por fragmentos o imágenes en
+    inlineData, según responseModalities)
+  - Commons: GET /w/api.php (list=search y prop=imageinfo) y las miniaturas
+    /thumb/<N>px-<nombre>.jpg a las que apunta su imageinfo
+
+Cada servidor tiene su ``StubConfig``: latencia (media y jitter), proporción
+de errores (con su código HTTP y Retry-After para 429), palabras del texto y
+tamaño de las imágenes; las respuestas en streaming envían el texto en
+fragmentos de pocas palabras separados por ``chunk_delay``. Las imágenes son manchas aleatorias distintas en cada
+respuesta (en Commons, fijas por título) para que la deduplicación de
+imágenes no las reutilice.
+
+Los clientes se redirigen con variables de entorno (ver ``StubServers.env``):
+OPENAI_BASE_URL, GOOGLE_GEMINI_BASE_URL (las leen los SDK) y COMMONS_API_URL
+(la lee fill_images_commons.py).
+
+Uso manual:
+  python tools/stub_servers.py --latency 0.5 --error-rate 0.05
+  # imprime las variables a exportar y sirve hasta Ctrl+C
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import io
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from PIL import Image
+
+HOST = "127.0.0.1"
+WORDS = ("cámara", "red", "instalación", "vídeo", "seguridad", "sonido", "cableado", "equipo",
+         "proyecto", "cliente", "señal", "potencia", "sistema", "configuración", "mantenimiento")
+
+
+class StubConfig:
+    """Comportamiento de un servidor simulado.
+
+    ``latency`` es la espera media antes de responder (más un jitter uniforme
+    de ±``jitter``); ``error_rate`` la fracción de peticiones que fallan con
+    ``error_status``. ``image_size`` fija el tamaño de cada imagen servida y
+    ``text_words`` la longitud del artículo, que en streaming se envía por
+    fragmentos con ``chunk_delay`` segundos entre uno y otro.
+    """
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.1, error_rate: float = 0.0,
+                 error_status: int = 503, retry_after: float | None = 1.0,
+                 text_words: int = 900, image_size: Tuple[int, int] = (1920, 1080),
+                 chunk_delay: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.text_words = text_words
+        self.image_size = image_size
+        self.chunk_delay = chunk_delay
+
+    def delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+
+def blob_image(size: Tuple[int, int], seed: str | None = None, fmt: str = "PNG") -> bytes:
+    """Imagen de manchas suaves: barata de generar y con un dHash distinto por semilla."""
+    rnd = random.Random(seed) if seed is not None else random
+    small = Image.frombytes("RGB", (16, 9), bytes(rnd.randrange(256) for _ in range(16 * 9 * 3)))
+    im = small.resize(size, Image.BILINEAR)
+    buf = io.BytesIO()
+    if fmt == "PNG":
+        im.save(buf, "PNG", compress_level=1)
+    else:
+        im.save(buf, fmt, quality=85)
+    return buf.getvalue()
+
+
+def article_text(topic: str, words: int) -> str:
+    title = topic.strip() or "Artículo de prueba"
+    lines = [f"# {title}", ""]
+    written = 0
+    section = 1
+    while written < words:
+        lines += [f"## Sección {section}", ""]
+        for _ in range(3):
+            n = min(60, max(1, words - written))
+            lines += [" ".join(random.choice(WORDS) for _ in range(n)).capitalize() + ".", ""]
+            written += n
+            if written >= words:
+                break
+        section += 1
+    return "\n".join(lines)
+
+
+def text_chunks(text: str, words: int = 4) -> List[str]:
+    """Trocea ``text`` como los deltas de un streaming: unas pocas palabras por fragmento."""
+    tokens = re.findall(r"\S+\s*|\s+", text)
+    return ["".join(tokens[i:i + words]) for i in range(0, len(tokens), words)]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StubServer"
+
+    def log_message(self, format, *args):  # noqa: A002 - firma de BaseHTTPRequestHandler
+        pass
+
+    def _body(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(raw or b"{}")
+        except ValueError:
+            return {}
+
+    def _send(self, status: int, body: bytes, ctype: str = "application/json", headers: Dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, data: Dict, status: int = 200, headers: Dict | None = None):
+        self._send(status, json.dumps(data, ensure_ascii=False).encode("utf-8"), headers=headers)
+
+    def _sse(self, events: List, delay: float = 0.0):
+        """Envía ``events`` por SSE con transferencia chunked, uno a uno y separados por ``delay``."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, event in enumerate(events):
+            if i and delay:
+                time.sleep(delay)
+            data = event if isinstance(event, str) else json.dumps(event, ensure_ascii=False)
+            payload = b"data: " + data.encode("utf-8") + b"\r\n\r\n"
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(payload), payload))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _simulate(self) -> bool:
+        """Aplica la latencia y, si toca, responde con error; True si la petición sigue."""
+        config = self.server.config
+        self.server.record(self.path)
+        time.sleep(config.delay())
+        if config.error_rate and random.random() < config.error_rate:
+            headers = {}
+            if config.error_status == 429 and config.retry_after is not None:
+                headers["Retry-After"] = f"{config.retry_after:g}"
+            self.server.record_error()
+            self._json({"error": {"code": config.error_status, "message": "error simulado",
+                                  "status": "UNAVAILABLE"}}, status=config.error_status, headers=headers)
+            return False
+        return True
+
+    def do_POST(self):
+        body = self._body()
+        if not self._simulate():
+            return
+        self.route_post(urlparse(self.path).path, body)
+
+    def do_GET(self):
+        if not self._simulate():
+            return
+        url = urlparse(self.path)
+        self.route_get(url.path, {k: v[-1] for k, v in parse_qs(url.query).items()})
+
+    def route_post(self, path: str, body: Dict):
+        self._json({"error": {"message": f"ruta no simulada: {path}"}}, status=404)
+
+    def route_get(self, path: str, params: Dict):
+        self._json({"error": {"message": f"ruta no simulada: {path}"}}, status=404)
+
+
+class OpenAIHandler(StubHandler):
+    def route_post(self, path: str, body: Dict):
+        config = self.server.config
+        if path.endswith("/chat/completions"):
+            prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+            topic = re.search(r"Tema: (.+?)\.", prompt)
+            text = article_text(topic.group(1) if topic else "", config.text_words)
+            head = {"id": f"chatcmpl-{random.getrandbits(48):x}", "created": int(time.time()),
+                    "model": body.get("model", "stub")}
+            usage = {"prompt_tokens": len(prompt.split()), "completion_tokens": len(text.split()),
+                     "total_tokens": len(prompt.split()) + len(text.split())}
+            if not body.get("stream"):
+                self._json({**head, "object": "chat.completion",
+                            "choices": [{"index": 0, "finish_reason": "stop",
+                                         "message": {"role": "assistant", "content": text}}],
+                            "usage": usage})
+                return
+            head["object"] = "chat.completion.chunk"
+            events = [{**head, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""},
+                                            "finish_reason": None}]}]
+            events += [{**head, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                       for piece in text_chunks(text)]
+            events.append({**head, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            if (body.get("stream_options") or {}).get("include_usage"):
+                events.append({**head, "choices": [], "usage": usage})
+            self._sse(events + ["[DONE]"], config.chunk_delay)
+        elif path.endswith("/images/generations"):
+            n = int(body.get("n") or 1)
+            data = [{"b64_json": base64.b64encode(blob_image(config.image_size)).decode("ascii")}
+                    for _ in range(n)]
+            self._json({"created": int(time.time()), "data": data})
+        else:
+            super().route_post(path, body)
+
+
+class GeminiHandler(StubHandler):
+    def route_post(self, path: str, body: Dict):
+        config = self.server.config
+        prompt = " ".join(p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", []))
+        usage = {"promptTokenCount": len(prompt.split())}
+        if path.endswith(":generateContent"):
+            topic = re.search(r"Tema: (.+?)\.", prompt)
+            text = article_text(topic.group(1) if topic else "", config.text_words)
+            usage.update(candidatesTokenCount=len(text.split()),
+                         totalTokenCount=usage["promptTokenCount"] + len(text.split()))
+            self._json({"candidates": [{"content": {"role": "model", "parts": [{"text": text}]},
+                                        "finishReason": "STOP", "index": 0}],
+                        "usageMetadata": usage})
+        elif path.endswith(":streamGenerateContent") and "IMAGE" not in self._modalities(body):
+            topic = re.search(r"Tema: (.+?)\.", prompt)
+            pieces = text_chunks(article_text(topic.group(1) if topic else "", config.text_words))
+            events = [{"candidates": [{"content": {"role": "model", "parts": [{"text": piece}]}, "index": 0}]}
+                      for piece in pieces]
+            words = sum(len(piece.split()) for piece in pieces)
+            events[-1]["candidates"][0]["finishReason"] = "STOP"
+            events[-1]["usageMetadata"] = {**usage, "candidatesTokenCount": words,
+                                           "totalTokenCount": usage["promptTokenCount"] + words}
+            self._sse(events, config.chunk_delay)
+        elif path.endswith(":streamGenerateContent"):
+            # Como el servicio real: una parte de texto y después la imagen, cada una en su evento
+            events = [
+                {"candidates": [{"content": {"role": "model", "parts": [{"text": "Aquí tienes la imagen."}]},
+                                 "index": 0}]},
+                {"candidates": [{"content": {"role": "model", "parts": [{"inlineData": {
+                    "mimeType": "image/png",
+                    "data": base64.b64encode(blob_image(config.image_size)).decode("ascii")}}]},
+                    "finishReason": "STOP", "index": 0}], "usageMetadata": usage},
+            ]
+            self._sse(events)
+        else:
+            super().route_post(path, body)
+
+    @staticmethod
+    def _modalities(body: Dict) -> List[str]:
+        config = body.get("generationConfig") or body.get("generation_config") or {}
+        return [str(m).upper() for m in config.get("responseModalities") or config.get("response_modalities") or []]
+
+
+class CommonsHandler(StubHandler):
+    def _titles(self, query: str, limit: int) -> List[str]:
+        key = hashlib.sha1(query.encode("utf-8")).hexdigest()[:10]
+        return [f"File:Bench {key} {i}.jpg" for i in range(limit)]
+
+    def _imageinfo(self, title: str) -> Dict:
+        config = self.server.config
+        name = title.split(":", 1)[-1].replace(" ", "_")
+        width, height = config.image_size
+        base = f"http://{HOST}:{self.server.server_port}"
+        return {
+            "url": f"{base}/orig/{name}",
+            "thumburl": f"{base}/thumb/{width}px-{name}",
+            "thumbwidth": width,
+            "thumbheight": height,
+            "width": width * 2,
+            "height": height * 2,
+            "mime": "image/jpeg",
+            "descriptionurl": f"https://commons.wikimedia.org/wiki/{title.replace(' ', '_')}",
+            "extmetadata": {
+                "LicenseShortName": {"value": "Public domain"},
+                "License": {"value": "pd"},
+                "UsageTerms": {"value": "Public domain"},
+                "Artist": {"value": "Banco de pruebas"},
+            },
+        }
+
+    def route_get(self, path: str, params: Dict):
+        config = self.server.config
+        if path.endswith("/api.php"):
+            if params.get("list") == "search":
+                titles = self._titles(params.get("srsearch", ""), int(params.get("srlimit") or 10))
+                self._json({"batchcomplete": True,
+                            "query": {"search": [{"ns": 6, "title": t} for t in titles]}})
+            elif params.get("prop") == "imageinfo":
+                titles = [t for t in params.get("titles", "").split("|") if t]
+                pages = [{"ns": 6, "title": t, "imageinfo": [self._imageinfo(t)]} for t in titles]
+                self._json({"batchcomplete": True, "query": {"pages": pages}})
+            else:
+                self._json({"error": {"code": "badparams", "info": "consulta no simulada"}}, status=400)
+        elif path.startswith(("/thumb/", "/orig/")):
+            # La misma URL devuelve siempre la misma imagen, como un CDN real
+            self._send(200, blob_image(config.image_size, seed=path.rsplit("-", 1)[-1], fmt="JPEG"),
+                       ctype="image/jpeg")
+        else:
+            super().route_get(path, params)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, handler: type, config: StubConfig | None = None, port: int = 0):
+        super().__init__((HOST, port), handler)
+        self.config = config or StubConfig()
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{HOST}:{self.server_port}"
+
+    def record(self, path: str) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class StubServers:
+    """Los tres servidores simulados, arrancados juntos."""
+
+    def __init__(self, openai: StubConfig | None = None, gemini: StubConfig | None = None,
+                 commons: StubConfig | None = None):
+        self.openai = StubServer(OpenAIHandler, openai)
+        self.gemini = StubServer(GeminiHandler, gemini)
+        self.commons = StubServer(CommonsHandler, commons)
+
+    def __enter__(self) -> "StubServers":
+        for server in (self.openai, self.gemini, self.commons):
+            server.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for server in (self.openai, self.gemini, self.commons):
+            server.stop()
+
+    def env(self) -> Dict[str, str]:
+        """Variables de entorno que redirigen los clientes a los servidores simulados."""
+        return {
+            "OPENAI_API_KEY": "stub",
+            "GEMINI_API_KEY": "stub",
+            "OPENAI_BASE_URL": f"{self.openai.url}/v1",
+            "GOOGLE_GEMINI_BASE_URL": self.gemini.url,
+            "COMMONS_API_URL": f"{self.commons.url}/w/api.php",
+        }
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: {"requests": s.requests, "errors": s.errors}
+                for name, s in (("openai", self.openai), ("gemini", self.gemini), ("commons", self.commons))}
+
+
+def parse_size(value: str) -> Tuple[int, int]:
+    try:
+        w, h = value.lower().split("x")
+        return int(w), int(h)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tamaño no válido: {value} (usa ANCHOxALTO)")
+
+
+def add_config_arguments(ap: argparse.ArgumentParser) -> None:
+    """Opciones comunes para construir un StubConfig (las reutiliza benchmark.py)."""
+    ap.add_argument("--latency", type=float, default=0.2, help="Latencia media por respuesta (s)")
+    ap.add_argument("--jitter", type=float, default=0.1, help="Variación uniforme de la latencia (± s)")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Fracción de peticiones que fallan (0-1)")
+    ap.add_argument("--error-status", type=int, default=503, help="Código HTTP de los fallos simulados")
+    ap.add_argument("--text-words", type=int, default=900, help="Palabras de cada artículo generado")
+    ap.add_argument("--image-size", type=parse_size, default=(1920, 1080),
+                    help="Tamaño de las imágenes servidas (ANCHOxALTO)")
+    ap.add_argument("--chunk-delay", type=float, default=0.0,
+                    help="Espera entre fragmentos de texto en las respuestas en streaming (s)")
+
+
+def config_from_args(args) -> StubConfig:
+    return StubConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                      error_status=args.error_status, text_words=args.text_words, image_size=args.image_size,
+                      chunk_delay=args.chunk_delay)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Servidores locales que imitan OpenAI, Gemini y Commons")
+    add_config_arguments(ap)
+    args = ap.parse_args()
+    config = config_from_args(args)
+    with StubServers(config, config, config) as servers:
+        for k, v in servers.env().items():
+            print(f"export {k}={v}")
+        print("[INFO] Sirviendo; Ctrl+C para terminar")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        print(json.dumps(servers.stats()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Instrumentación del pipeline de generación: tiempos por etapa, tokens,
+imágenes, bytes escritos y reintentos.
+
+- ``span("etapa", provider=..., model=...)`` mide un bloque (también dentro de
+  corrutinas) y registra si acabó bien, con error o cancelado.
+- ``count("tokens", n, provider=..., model=..., kind="input")`` suma a un contador.
+- ``article(topic, slug)`` agrupa todo lo que ocurre mientras se genera un
+  artículo (también en las tareas e hilos que lanza) para dar su duración, sus
+  tokens/imágenes y un coste estimado.
+
+Cada evento se añade como una línea JSON a ``<dir>/<run>.jsonl`` (el histórico
+crece entre ejecuciones) y al terminar se escribe ``<dir>/<run>.prom`` en el
+formato textfile de Prometheus (node_exporter --collector.textfile), con
+percentiles de duración por etapa, contadores y coste por artículo.
+
+Uso:
+  import telemetry
+  telemetry.configure(Path(".cache/metrics"), run="generate_article")
+  with telemetry.article(topic, slug):
+      with telemetry.span("text", provider="openai", model="gpt-4o-mini"):
+          ...
+  telemetry.finish()
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DIR = ROOT / ".cache" / "metrics"
+PREFIX = "genart"
+QUANTILES = (0.5, 0.95, 0.99)
+# Etiquetas que pasan a Prometheus; el resto (tema, slug...) solo van al JSONL
+PROM_LABELS = ("stage", "provider", "model", "kind", "reason", "status")
+
+# Precios de referencia en USD (tokens: por token; imágenes: por imagen).
+# Son orientativos para seguir la tendencia del coste; ajústalos a la tarifa real.
+PRICES = {
+    ("openai", "gpt-4o-mini"): {"input": 0.15e-6, "output": 0.60e-6},
+    ("gemini", "gemini-1.5-flash"): {"input": 0.075e-6, "output": 0.30e-6},
+    ("openai", "gpt-image-1"): {"image": 0.167},
+    ("gemini", "gemini-2.5-flash-image-preview"): {"image": 0.039},
+}
+
+_article: contextvars.ContextVar[Dict | None] = contextvars.ContextVar("telemetry_article", default=None)
+
+
+def quantile(values: Sequence[float], q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    pos = q * (len(ordered) - 1)
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict, **extra) -> str:
+    items = [(k, labels[k]) for k in PROM_LABELS if labels.get(k) is not None] + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+class Telemetry:
+    def __init__(self, directory: Path | None = None, run: str = "run"):
+        self.directory = Path(directory) if directory else None
+        self.run = run
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._fh = None
+        self.durations: Dict[Tuple, List[float]] = defaultdict(list)
+        self.counters: Dict[Tuple, float] = defaultdict(float)
+        self.articles: List[Dict] = []
+
+    @property
+    def jsonl_path(self) -> Path | None:
+        return self.directory / f"{self.run}.jsonl" if self.directory else None
+
+    @property
+    def prom_path(self) -> Path | None:
+        return self.directory / f"{self.run}.prom" if self.directory else None
+
+    def emit(self, event: Dict) -> None:
+        if self.directory is None:
+            return
+        event = {"ts": round(time.time(), 3), "run": self.run_id, **event}
+        article = _article.get()
+        if article is not None and "slug" not in event:
+            event["slug"] = article["slug"]
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if self._fh is None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._fh = open(self.jsonl_path, "a", encoding="utf-8")
+            self._fh.write(line)
+            self._fh.flush()
+
+    @contextmanager
+    def span(self, stage: str, **labels) -> Iterator[Dict]:
+        """Mide el bloque; el dict que devuelve admite etiquetas extra (p. ej. ``bytes``)."""
+        extra: Dict = {}
+        status = "ok"
+        start = time.perf_counter()
+        try:
+            yield extra
+        except (asyncio.CancelledError, GeneratorExit):
+            status = "cancelled"
+            raise
+        except BaseException as e:
+            status = "error"
+            extra.setdefault("error", f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start, status=status, **labels, **extra)
+
+    def observe(self, stage: str, seconds: float, status: str = "ok", **labels) -> None:
+        """Registra una duración medida fuera de ``span`` (p. ej. hasta el primer token)."""
+        key = (("stage", stage), *sorted((k, v) for k, v in labels.items() if k in PROM_LABELS),
+               ("status", status))
+        with self._lock:
+            self.durations[key].append(seconds)
+        self.emit({"type": "span", "stage": stage, "status": status,
+                   "seconds": round(seconds, 4), **labels})
+
+    def count(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, *sorted((k, v) for k, v in labels.items() if k in PROM_LABELS))
+        with self._lock:
+            self.counters[key] += value
+        article = _article.get()
+        if article is not None:
+            with self._lock:
+                self._add_to_article(article, name, value, labels)
+        self.emit({"type": "count", "name": name, "value": value, **labels})
+
+    @staticmethod
+    def _add_to_article(article: Dict, name: str, value: float, labels: Dict) -> None:
+        kind = labels.get("kind")
+        field = f"{name}_{kind}" if kind else name
+        article["totals"][field] = article["totals"].get(field, 0) + value
+        price = PRICES.get((labels.get("provider"), labels.get("model")), {})
+        if name == "tokens" and kind in price:
+            article["cost_usd"] += value * price[kind]
+        elif name == "images" and "image" in price:
+            article["cost_usd"] += value * price["image"]
+
+    @contextmanager
+    def article(self, topic: str, slug: str) -> Iterator[Dict]:
+        record = {"topic": topic, "slug": slug, "totals": {}, "cost_usd": 0.0}
+        token = _article.set(record)
+        status = "ok"
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            _article.reset(token)
+            record["seconds"] = time.perf_counter() - start
+            record["status"] = status
+            with self._lock:
+                self.articles.append(record)
+            self.emit({"type": "article", "status": status, "topic": topic, "slug": slug,
+                       "seconds": round(record["seconds"], 4), "cost_usd": round(record["cost_usd"], 6),
+                       **record["totals"]})
+
+    def prometheus(self) -> str:
+        """Resumen de la ejecución en formato textfile de Prometheus."""
+        out: List[str] = []
+        with self._lock:
+            durations = dict(self.durations)
+            counters = dict(self.counters)
+            articles = list(self.articles)
+
+        name = f"{PREFIX}_stage_seconds"
+        out += [f"# HELP {name} Duración de cada etapa del pipeline", f"# TYPE {name} summary"]
+        for key, values in sorted(durations.items()):
+            labels = dict(key)
+            for q in QUANTILES:
+                out.append(f"{name}{_labels(labels, quantile=q)} {quantile(values, q):.6f}")
+            out.append(f"{name}_sum{_labels(labels)} {sum(values):.6f}")
+            out.append(f"{name}_count{_labels(labels)} {len(values)}")
+
+        by_name: Dict[str, List[Tuple[Dict, float]]] = defaultdict(list)
+        for key, value in counters.items():
+            by_name[key[0]].append((dict(key[1:]), value))
+        for metric, entries in sorted(by_name.items()):
+            name = f"{PREFIX}_{metric}_total"
+            out += [f"# HELP {name} Total de {metric} en la ejecución", f"# TYPE {name} counter"]
+            for labels, value in sorted(entries, key=lambda e: sorted(e[0].items())):
+                out.append(f"{name}{_labels(labels)} {value:g}")
+
+        for metric, field, help_text in (
+            ("article_seconds", "seconds", "Duración por artículo"),
+            ("article_cost_usd", "cost_usd", "Coste estimado por artículo (USD)"),
+        ):
+            name = f"{PREFIX}_{metric}"
+            values = [a[field] for a in articles]
+            out += [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+            for q in QUANTILES:
+                out.append(f"{name}{_labels({}, quantile=q)} {quantile(values, q):.6f}")
+            out.append(f"{name}_sum {sum(values):.6f}")
+            out.append(f"{name}_count {len(values)}")
+
+        name = f"{PREFIX}_articles_total"
+        out += [f"# HELP {name} Artículos procesados por resultado", f"# TYPE {name} counter"]
+        for status in ("ok", "error"):
+            out.append(f"{name}{_labels({'status': status})} {sum(a['status'] == status for a in articles)}")
+        name = f"{PREFIX}_run_seconds"
+        out += [f"# HELP {name} Duración total de la ejecución", f"# TYPE {name} gauge",
+                f"{name} {time.time() - self.started:.3f}"]
+        name = f"{PREFIX}_last_run_timestamp_seconds"
+        out += [f"# TYPE {name} gauge", f"{name} {time.time():.0f}"]
+        return "\n".join(out) + "\n"
+
+    def finish(self) -> Path | None:
+        """Cierra el JSONL y escribe el resumen .prom (escritura atómica, como exige el colector)."""
+        articles = len(self.articles)
+        self.emit({"type": "summary", "articles": articles,
+                   "seconds": round(time.time() - self.started, 3),
+                   "cost_usd": round(sum(a["cost_usd"] for a in self.articles), 6)})
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+        if self.directory is None:
+            return None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f".{self.run}-", suffix=".prom", dir=self.directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, self.prom_path)
+        return self.prom_path
+
+
+_default = Telemetry()
+
+
+def configure(directory: Path | None = DEFAULT_DIR, run: str = "run") -> Telemetry:
+    """Sustituye la instrumentación compartida; ``directory=None`` no escribe ficheros."""
+    global _default
+    _default = Telemetry(directory, run)
+    return _default
+
+
+def get() -> Telemetry:
+    return _default
+
+
+def span(stage: str, **labels):
+    return _default.span(stage, **labels)
+
+
+def observe(stage: str, seconds: float, **labels) -> None:
+    _default.observe(stage, seconds, **labels)
+
+
+def count(name: str, value: float = 1, **labels) -> None:
+    _default.count(name, value, **labels)
+
+
+def article(topic: str, slug: str):
+    return _default.article(topic, slug)
+
+
+def finish() -> Path | None:
+    return _default.finish()
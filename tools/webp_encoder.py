@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Etapa de codificación WEBP respaldada por un pool de procesos.
+
+La codificación WEBP (sobre todo con ``method=6``) es CPU pura y, cuando la red
+ya va en paralelo, domina el tiempo de un lote. Este módulo reparte las
+imágenes entre varios procesos para aprovechar todos los núcleos. Lo usan
+generate_article.py y fill_images_commons.py.
+
+Uso:
+  import webp_encoder
+  webp_encoder.configure(workers=4, method=4)
+  fut = webp_encoder.submit(raw_bytes, Path("out.webp"), fit=(1920, 1080))
+  path = fut.result()
+  webp_encoder.shutdown()
+
+Con ``workers=0`` se codifica en el propio proceso (sin pool). El pool se crea
+en el primer envío, que suele llegar desde un hilo de trabajo con otros hilos
+en marcha; por eso sus procesos salen de un forkserver (donde la plataforma lo
+tiene) y no de un fork del proceso con hilos y locks a medias.
+"""
+from __future__ import annotations
+
+import io
+import os
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Tuple
+
+
+def encode_to_webp(data: bytes, dst: str, quality: int = 85, method: int = 6,
+                   fit: Tuple[int, int] | None = None) -> str:
+    """Decodifica ``data``, la valida, opcionalmente recorta a ``fit`` y guarda WEBP en ``dst``.
+
+    Se ejecuta en los procesos del pool, por eso recibe y devuelve tipos simples.
+    Lanza una excepción si los datos no son una imagen válida.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as im:
+        if fit and im.format == "JPEG":
+            # El decodificador JPEG escala a 1/2, 1/4 u 1/8 sin bajar de ``fit``
+            im.draft("RGB", fit)
+        im.load()  # fuerza la decodificación completa: detecta datos truncados
+        if im.width < 2 or im.height < 2:
+            raise ValueError(f"dimensiones inválidas {im.size}")
+        out = im
+        if fit:
+            # Reducción entera (promedio por bloques, barata) antes del LANCZOS final
+            factor = min(im.width // fit[0], im.height // fit[1])
+            if factor >= 2:
+                out = im.reduce(factor)
+            out = ImageOps.fit(out, fit, method=Image.LANCZOS, centering=(0.5, 0.5))
+        Path(dst).parent.mkdir(parents=True, exist_ok=True)
+        out.save(dst, format="WEBP", quality=quality, method=method)
+    return dst
+
+
+def _process_pool(workers: int):
+    """ProcessPoolExecutor cuyos procesos no heredan los hilos ni los locks del padre."""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+class WebpEncoder:
+    def __init__(self, workers: int | None = None, quality: int = 85, method: int = 6):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.quality = quality
+        self.method = method
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def submit(self, data: bytes, dst: Path, fit: Tuple[int, int] | None = None,
+               quality: int | None = None) -> "Future[Path]":
+        args = (data, str(dst), self.quality if quality is None else quality, self.method, fit)
+        inner = self.run(encode_to_webp, *args)
+        outer: Future = Future()
+
+        def _done(f: Future) -> None:
+            if f.exception() is not None:
+                outer.set_exception(f.exception())
+            else:
+                outer.set_result(Path(f.result()))
+
+        inner.add_done_callback(_done)
+        return outer
+
+    def run(self, fn: Callable, *args) -> Future:
+        """Ejecuta ``fn(*args)`` en el pool (o en el proceso si ``workers=0``).
+
+        ``fn`` debe ser una función de nivel de módulo para poder enviarse al pool.
+        """
+        if self.workers <= 0:
+            fut: Future = Future()
+            try:
+                fut.set_result(fn(*args))
+            except Exception as e:
+                fut.set_exception(e)
+            return fut
+        with self._lock:
+            if self._pool is None:
+                self._pool = _process_pool(self.workers)
+            return self._pool.submit(fn, *args)
+
+    def encode(self, data: bytes, dst: Path, fit: Tuple[int, int] | None = None,
+               quality: int | None = None) -> Path:
+        return self.submit(data, dst, fit=fit, quality=quality).result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+_default: WebpEncoder | None = None
+
+
+def configure(workers: int | None = None, quality: int = 85, method: int = 6) -> WebpEncoder:
+    """Sustituye el codificador compartido por uno con esta configuración."""
+    global _default
+    if _default is not None:
+        _default.shutdown()
+    _default = WebpEncoder(workers=workers, quality=quality, method=method)
+    return _default
+
+
+def get_encoder() -> WebpEncoder:
+    global _default
+    if _default is None:
+        _default = WebpEncoder()
+    return _default
+
+
+def submit(data: bytes, dst: Path, fit: Tuple[int, int] | None = None,
+           quality: int | None = None) -> "Future[Path]":
+    return get_encoder().submit(data, dst, fit=fit, quality=quality)
+
+
+def encode(data: bytes, dst: Path, fit: Tuple[int, int] | None = None,
+           quality: int | None = None) -> Path:
+    return get_encoder().encode(data, dst, fit=fit, quality=quality)
+
+
+def run(fn: Callable, *args) -> Future:
+    return get_encoder().run(fn, *args)
+
+
+def shutdown() -> None:
+    if _default is not None:
+        _default.shutdown()